@@ -0,0 +1,204 @@
+"""
+Offline fixtures for the launcher benchmarks: a fake Megabonk install, synthetic
+BepInEx and GitHub source archives served from a local HTTP server, and a stub
+`dotnet` that prints a configurable amount of build output.
+"""
+
+import os
+import sys
+import stat
+import random
+import zipfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+SEED = 1234
+
+STUB_SDK_VERSION = "6.0.428"
+STUB_LINES_ENV = "MBMP_STUB_DOTNET_LINES"
+
+# Targets the stub reports in its performance summary, (name, ms, calls)
+STUB_TARGETS = [
+    ("ResolveAssemblyReferences", 1850, 1),
+    ("CoreCompile", 2400, 1),
+    ("_CopyFilesMarkedCopyLocal", 120, 1),
+    ("Restore", 640, 1),
+    ("ResolvePackageAssets", 210, 1),
+    ("GenerateAssemblyInfo", 35, 1),
+    ("IncrementalClean", 18, 1),
+]
+
+LOG_SOURCES = ["MegabonkMP", "BepInEx", "Il2CppInterop", "Unity Log"]
+LOG_LEVELS = ["Info   ", "Debug  ", "Warning", "Message"]
+LOG_MESSAGES = [
+    "[NET] Received PlayerPosition from client {n}",
+    "[SYNC] Enemy {n} position update",
+    "[NET] Sent EnemyPosition batch ({n} entities)",
+    "Player {n} joined the session",
+    "[SYNC] Applied snapshot tick {n}",
+]
+
+
+def random_bytes(rng, size):
+    """Incompressible filler, like the bulk of a .NET assembly"""
+    return rng.getrandbits(size * 8).to_bytes(size, "little") if size else b""
+
+
+def assembly_bytes(rng, size):
+    """Half random, half repetitive, so archives compress about like real DLLs do"""
+    half = size // 2
+    return b"MZ" + random_bytes(rng, half) + bytes(size - half - 2)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def write_bepinex_log(path, size_mb, seed=SEED):
+    """Write a LogOutput.log of about size_mb megabytes in BepInEx's format"""
+    rng = random.Random(seed)
+    target = int(size_mb * (1 << 20))
+    written = 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < target:
+            line = (f"[{rng.choice(LOG_LEVELS)}:{rng.choice(LOG_SOURCES):>10}] "
+                    f"{rng.choice(LOG_MESSAGES).format(n=rng.randrange(1000))}\n")
+            f.write(line)
+            written += len(line)
+    return path
+
+
+def make_game_tree(root, interop_assemblies=120, assembly_kb=256, log_mb=8, seed=SEED):
+    """Create a Megabonk folder with BepInEx, generated interop assemblies, the mod and a log"""
+    rng = random.Random(seed)
+    game = os.path.join(root, "Megabonk")
+    _write(os.path.join(game, "Megabonk.exe"), assembly_bytes(rng, 640 * 1024))
+    _write(os.path.join(game, "GameAssembly.dll"), assembly_bytes(rng, 8 << 20))
+    _write(os.path.join(game, "UnityPlayer.dll"), assembly_bytes(rng, 2 << 20))
+    _write(os.path.join(game, "Megabonk_Data", "il2cpp_data", "Metadata", "global-metadata.dat"),
+           assembly_bytes(rng, 4 << 20))
+
+    bepinex = os.path.join(game, "BepInEx")
+    _write(os.path.join(bepinex, "core", "BepInEx.Core.dll"), assembly_bytes(rng, 300 * 1024))
+    for name in ("Il2Cppmscorlib", "UnityEngine", "UnityEngine.CoreModule", "Assembly-CSharp"):
+        _write(os.path.join(bepinex, "interop", f"{name}.dll"), assembly_bytes(rng, assembly_kb * 1024))
+    for i in range(interop_assemblies):
+        _write(os.path.join(bepinex, "interop", f"Il2CppGenerated{i:03}.dll"),
+               assembly_bytes(rng, assembly_kb * 1024))
+    _write(os.path.join(bepinex, "plugins", "MegabonkMP", "MegabonkMP.dll"), assembly_bytes(rng, 180 * 1024))
+    write_bepinex_log(os.path.join(bepinex, "LogOutput.log"), log_mb, seed)
+    return game
+
+
+def make_bepinex_zip(path, files=250, total_mb=24, seed=SEED):
+    """Write a BepInEx-style release archive (BepInEx/core, dotnet runtime, doorstop)"""
+    rng = random.Random(seed)
+    file_size = max(1, int(total_mb * (1 << 20)) // files)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("doorstop_config.ini", "[General]\nenabled = true\ntarget_assembly = "
+                                           "BepInEx\\core\\BepInEx.Unity.IL2CPP.dll\n")
+        zf.writestr("winhttp.dll", assembly_bytes(rng, 32 * 1024))
+        zf.writestr("BepInEx/core/BepInEx.Core.dll", assembly_bytes(rng, 300 * 1024))
+        for i in range(files):
+            folder = "dotnet" if i % 3 else "BepInEx/core"
+            zf.writestr(f"{folder}/Library{i:03}.dll", assembly_bytes(rng, file_size))
+    return path
+
+
+def make_source_zip(path, source_files=80, seed=SEED):
+    """Write a GitHub 'archive/refs/heads/main.zip' style archive of the mod"""
+    rng = random.Random(seed)
+    prefix = "test123-main/megabonk-mp-mod/src/"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("test123-main/README.md", "# test123\n")
+        zf.writestr(prefix + "MegabonkMP.csproj",
+                    '<Project Sdk="Microsoft.NET.Sdk">\n  <PropertyGroup>\n'
+                    '    <TargetFramework>net6.0</TargetFramework>\n  </PropertyGroup>\n</Project>\n')
+        for i in range(source_files):
+            body = "\n".join(f"        public int Field{j} = {rng.randrange(1000)};" for j in range(200))
+            zf.writestr(f"{prefix}Generated/Type{i:03}.cs",
+                        f"namespace MegabonkMP.Generated\n{{\n    public class Type{i:03}\n    {{\n{body}\n    }}\n}}\n")
+    return path
+
+
+STUB_DOTNET = '''
+import os, sys, time
+
+args = sys.argv[1:]
+if args[:1] == ["--version"]:
+    print("{version}")
+elif args[:1] == ["--list-sdks"]:
+    print("{version} [" + os.path.dirname(os.path.abspath(__file__)) + "]")
+elif args[:1] == ["build"]:
+    lines = int(os.environ.get("{lines_env}", "{lines}"))
+    out = sys.stdout
+    out.write("MSBuild version 17.3.4+a400405ba for .NET\\n")
+    for i in range(lines):
+        out.write(f"  Task \\"Csc\\" (TaskId:{{i}})\\n    Generated/Type{{i % 80:03}}.cs(12,9): "
+                  f"warning CS0414: The field 'Type.Field{{i}}' is assigned but its value is never used\\n")
+    out.write("\\nProject Evaluation Performance Summary:\\n      210 ms  MegabonkMP.csproj   1 calls\\n")
+    out.write("\\nTarget Performance Summary:\\n")
+    for name, ms, calls in {targets!r}:
+        out.write(f"{{ms:>9}} ms  {{name:<40}} {{calls}} calls\\n")
+    out.write("\\nTask Performance Summary:\\n     2390 ms  Csc                                        1 calls\\n")
+    out.write("\\nBuild succeeded.\\n    0 Warning(s)\\n    0 Error(s)\\n")
+    dll = os.path.join(os.getcwd(), "bin", "Release", "MegabonkMP.dll")
+    os.makedirs(os.path.dirname(dll), exist_ok=True)
+    with open(dll, "wb") as f:
+        f.write(b"MZ" + bytes(180 * 1024))
+else:
+    sys.exit("stub dotnet: unsupported command " + " ".join(args))
+'''
+
+
+def make_stub_dotnet(bin_dir, output_lines=2000):
+    """Write a fake `dotnet` and return the path to run it by.
+
+    The amount of build output can also be changed per run with MBMP_STUB_DOTNET_LINES.
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    script = os.path.join(bin_dir, "stub_dotnet.py")
+    with open(script, "w", encoding="utf-8") as f:
+        f.write(STUB_DOTNET.format(version=STUB_SDK_VERSION, lines_env=STUB_LINES_ENV,
+                                   lines=output_lines, targets=STUB_TARGETS))
+
+    if sys.platform == "win32":
+        launcher = os.path.join(bin_dir, "dotnet.cmd")
+        with open(launcher, "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\r\n')
+    else:
+        launcher = os.path.join(bin_dir, "dotnet")
+        with open(launcher, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(launcher, os.stat(launcher).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return launcher
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve a directory over HTTP on a free localhost port"""
+
+    def __init__(self, directory):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/{name}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
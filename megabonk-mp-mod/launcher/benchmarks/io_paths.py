@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the launcher's heavy operations: BepInEx and source
+downloads, extraction, installation status checks, game fingerprinting,
+build-log ingestion, cfg updates and BepInEx log tailing. Everything runs
+against generated fixtures (see fixtures.py), so no network, game or .NET SDK
+is needed.
+
+Usage:
+    python benchmarks/io_paths.py
+    python benchmarks/io_paths.py --repeat 9 --log-mb 32 --build-lines 20000
+    python benchmarks/io_paths.py --compare previous.json --output current.json --fail-on-regression
+
+Each run is appended to a history file; medians are compared against the
+previous runs with the same parameters and regressions are flagged.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import launcher
+import buildstats
+import fixtures
+import gamefingerprint
+import modconfig
+
+HISTORY_LIMIT = 100
+BASELINE_WINDOW = 5
+
+
+class Benchmark:
+    """A timed operation; setup runs untimed before every repetition"""
+
+    def __init__(self, name, run, setup=None, number=1, size=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.number = number
+        self.size = size
+
+    def measure(self, repeat):
+        """Return per-call milliseconds for each repetition"""
+        samples = []
+        for _ in range(repeat):
+            if self.setup:
+                self.setup()
+            started = time.perf_counter()
+            for _ in range(self.number):
+                self.run()
+            samples.append((time.perf_counter() - started) * 1000 / self.number)
+        return samples
+
+
+def _reset_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def build_suite(workdir, server, args):
+    """Create the fixtures and the list of benchmarks that use them"""
+    served = os.path.join(workdir, "served")
+    bepinex_zip = fixtures.make_bepinex_zip(os.path.join(served, "BepInEx.zip"), total_mb=args.bepinex_mb)
+    source_zip = fixtures.make_source_zip(os.path.join(served, "main.zip"))
+    game = fixtures.make_game_tree(workdir, interop_assemblies=args.interop, log_mb=args.log_mb)
+    dotnet = fixtures.make_stub_dotnet(os.path.join(workdir, "bin"), output_lines=args.build_lines)
+
+    downloads = os.path.join(workdir, "downloads")
+    extract_dir = os.path.join(workdir, "extract")
+    mod_dir = os.path.join(workdir, "appdata")
+    mod_source = os.path.join(mod_dir, "src")
+    os.makedirs(downloads)
+
+    # Source tree for the build benchmarks
+    _reset_dir(mod_dir)
+    shutil.copy(source_zip, os.path.join(mod_dir, "source_temp.zip"))
+    launcher.extract_source_archive(os.path.join(mod_dir, "source_temp.zip"), mod_dir)
+
+    history = buildstats.BuildHistory(os.path.join(workdir, "build_history.json"))
+    build_output = []
+
+    def ingest_build():
+        result, _, _ = launcher.dotnet_build(mod_source, fixtures.STUB_SDK_VERSION, history, dotnet=dotnet)
+        if result.returncode != 0:
+            raise RuntimeError(f"Stub dotnet failed: {result.stderr}")
+        build_output[:] = result.stdout.splitlines()
+
+    def prepare_source_zip():
+        shutil.copy(source_zip, os.path.join(mod_dir, "source_temp.zip"))
+
+    values = modconfig.values_from_launcher(launcher.DEFAULT_CONFIG)
+    cfg_path = os.path.join(game, "BepInEx", "config", modconfig.CONFIG_FILE)
+
+    def remove_cfg():
+        if os.path.exists(cfg_path):
+            os.remove(cfg_path)
+
+    log_path = os.path.join(game, "BepInEx", "LogOutput.log")
+
+    fingerprint_state = os.path.join(workdir, "game_fingerprint.json")
+    fingerprints = []
+
+    def reset_fingerprints():
+        if os.path.exists(fingerprint_state):
+            os.remove(fingerprint_state)
+        fingerprints[:] = [gamefingerprint.GameFingerprints(fingerprint_state)]
+
+    def warm_fingerprints():
+        reset_fingerprints()
+        fingerprints[0].check(game)
+
+    game_files_size = sum(os.path.getsize(os.path.join(game, path)) for path in gamefingerprint.GAME_FILES.values())
+
+    return [
+        Benchmark("download_bepinex",
+                  lambda: launcher.download_file(server.url("BepInEx.zip"), os.path.join(downloads, "BepInEx.zip")),
+                  size=os.path.getsize(bepinex_zip)),
+        Benchmark("extract_bepinex", lambda: launcher.install_bepinex_archive(bepinex_zip, extract_dir),
+                  setup=lambda: _reset_dir(extract_dir), size=os.path.getsize(bepinex_zip)),
+        Benchmark("download_source",
+                  lambda: launcher.download_file(server.url("main.zip"), os.path.join(downloads, "main.zip")),
+                  size=os.path.getsize(source_zip)),
+        Benchmark("extract_source",
+                  lambda: launcher.extract_source_archive(os.path.join(mod_dir, "source_temp.zip"), mod_dir),
+                  setup=prepare_source_zip, size=os.path.getsize(source_zip)),
+        Benchmark("status_check", lambda: launcher.probe_installation(game, mod_source), number=200),
+        Benchmark("build_ingest", ingest_build),
+        Benchmark("build_parse", lambda: buildstats.parse_performance_summary(build_output), number=10,
+                  setup=lambda: build_output or ingest_build()),
+        Benchmark("cfg_create", lambda: modconfig.update_config(cfg_path, values), setup=remove_cfg),
+        Benchmark("cfg_update", lambda: modconfig.update_config(cfg_path, values), number=200),
+        Benchmark("fingerprint_cold", lambda: fingerprints[0].check(game), setup=reset_fingerprints,
+                  size=game_files_size),
+        Benchmark("fingerprint_warm", lambda: fingerprints[0].check(game), setup=warm_fingerprints, number=200),
+        Benchmark("log_tail", lambda: launcher.read_log_tail(log_path), number=20,
+                  size=min(os.path.getsize(log_path), launcher.LOG_TAIL_BYTES)),
+    ]
+
+
+def run_suite(args):
+    """Run every selected benchmark and return the result document"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="mbmp-bench-") as workdir:
+        os.makedirs(os.path.join(workdir, "served"))
+        with fixtures.FixtureServer(os.path.join(workdir, "served")) as server:
+            for benchmark in build_suite(workdir, server, args):
+                if args.only and benchmark.name not in args.only:
+                    continue
+                samples = benchmark.measure(args.repeat)
+                median = statistics.median(samples)
+                results[benchmark.name] = {"median_ms": round(median, 3), "min_ms": round(min(samples), 3),
+                                           "max_ms": round(max(samples), 3), "runs": len(samples)}
+                if benchmark.size:
+                    results[benchmark.name]["mb_per_s"] = round(benchmark.size / (1 << 20) / (median / 1000), 1)
+                print(f"  {benchmark.name:<18} {median:>10.3f} ms", flush=True)
+
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "params": {"bepinex_mb": args.bepinex_mb, "interop": args.interop, "log_mb": args.log_mb,
+                   "build_lines": args.build_lines},
+        "results": results,
+    }
+
+
+def load_history(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("runs", [])
+        except (OSError, ValueError):
+            pass
+    return []
+
+
+def save_history(path, runs):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs[-HISTORY_LIMIT:]}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def comparable(runs, run):
+    """Earlier runs on the same machine and Python with the same fixture sizes"""
+    return [r for r in runs if r.get("params") == run["params"] and r.get("host") == run["host"]
+            and r.get("python") == run["python"]][-BASELINE_WINDOW:]
+
+
+def compare(run, baseline_runs, threshold=1.25, min_delta_ms=2.0):
+    """Return {name: (baseline_ms, current_ms, regressed)} against the median of baseline_runs"""
+    comparison = {}
+    for name, result in run["results"].items():
+        history = [r["results"][name]["median_ms"] for r in baseline_runs if name in r.get("results", {})]
+        if not history:
+            continue
+        before = statistics.median(history)
+        after = result["median_ms"]
+        comparison[name] = (before, after, after > before * threshold and after - before >= min_delta_ms)
+    return comparison
+
+
+def format_comparison(run, comparison):
+    lines = [f"{'Benchmark':<18} {'Median':>11} {'Baseline':>11} {'Change':>8}  Throughput"]
+    for name, result in run["results"].items():
+        throughput = f"{result['mb_per_s']:.1f} MB/s" if "mb_per_s" in result else ""
+        if name in comparison:
+            before, after, regressed = comparison[name]
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            flag = "  REGRESSION" if regressed else ""
+            lines.append(f"{name:<18} {after:>9.3f}ms {before:>9.3f}ms {change:>8}  {throughput}{flag}")
+        else:
+            lines.append(f"{name:<18} {result['median_ms']:>9.3f}ms {'-':>11} {'':>8}  {throughput}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for launcher I/O paths")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark (default: 5)")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--bepinex-mb", type=float, default=24, help="Synthetic BepInEx archive size (default: 24)")
+    parser.add_argument("--interop", type=int, default=120, help="Generated interop assemblies (default: 120)")
+    parser.add_argument("--log-mb", type=float, default=8, help="LogOutput.log size (default: 8)")
+    parser.add_argument("--build-lines", type=int, default=2000, help="Stub dotnet output lines (default: 2000)")
+    parser.add_argument("--history", default=os.path.join(launcher.get_app_data_dir(), "benchmarks",
+                                                          "io_history.json"),
+                        help="History file runs are appended to and compared against")
+    parser.add_argument("--compare", help="Compare against this results file instead of the history")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Flag a regression above this ratio to the baseline (default: 1.25)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    print("Running launcher I/O benchmarks...")
+    run = run_suite(args)
+
+    history = load_history(args.history)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline_runs = [json.load(f)]
+    else:
+        baseline_runs = comparable(history, run)
+
+    comparison = compare(run, baseline_runs, threshold=args.threshold)
+    run["regressions"] = sorted(name for name, (_, _, regressed) in comparison.items() if regressed)
+    print()
+    print(format_comparison(run, comparison))
+    if not baseline_runs:
+        print("\nNo earlier comparable runs; this run becomes the baseline.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+    if not args.no_save:
+        save_history(args.history, history + [run])
+
+    return 1 if args.fail_on_regression and run["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
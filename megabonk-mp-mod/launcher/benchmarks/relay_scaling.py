@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the multi-lobby relay (relay.py).
+Starts the relay on a loopback port with 1, 2, 4, ... worker processes, fills
+it with lobbies of players from separate load generator processes, and has
+every player send PlayerPosition datagrams as fast as it can. Throughput is
+read from the relay's shared-memory stats block over the measured window, so
+it counts datagrams the relay actually processed, not what was offered.
+Speedup compares datagrams processed per second, which with --tick-rate is
+much more than the coalesced datagrams sent.
+
+Usage:
+    python benchmarks/relay_scaling.py
+    python benchmarks/relay_scaling.py --workers 1 2 4 8 --lobbies 32 --players 4 --seconds 5 --json relay.json
+
+The load generators need cores too: on a machine with C cores, worker counts
+above C - senders measure contention rather than the relay. Linux only
+(SO_REUSEPORT and fork).
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import multiprocessing
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relay
+import wire
+
+WARMUP = 1.0
+CONNECT_TIMEOUT = 5.0
+
+
+def _connect(address, name, lobby):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.connect(address)
+    sock.settimeout(0.5)
+    request = wire.wrap(wire.connect_request_packet(name, "bench", lobby), relay.RELIABLE)
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while time.monotonic() < deadline:
+        sock.send(request)
+        try:
+            while True:
+                if wire.packet_type(sock.recv(relay.RECV_SIZE)) == wire.PacketType.ConnectAccept:
+                    return sock
+        except socket.timeout:
+            continue
+    raise RuntimeError(f"{name} could not join lobby {lobby}")
+
+
+def _load(address, lobbies, players, seconds, ready, go, results):
+    """One load generator: players of the given lobbies sending positions round-robin"""
+    sockets = [_connect(address, f"p{index}", lobby) for lobby in lobbies for index in range(players)]
+    for sock in sockets:
+        sock.setblocking(False)
+    datagrams = [wire.wrap(wire.player_position_packet(index % players, (1.0, 2.0, 3.0), (0.5, 0.0, 0.5), 90.0, 0))
+                 for index in range(len(sockets))]
+    ready.release()
+    go.wait()
+    offered = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for sock, datagram in zip(sockets, datagrams):
+            try:
+                sock.send(datagram)
+                offered += 1
+            except OSError:
+                pass
+            try:
+                while True:
+                    sock.recv(relay.RECV_SIZE)  # keep receive buffers from filling
+            except OSError:
+                pass
+    results.put(offered)
+    for sock in sockets:
+        sock.close()
+
+
+def measure(workers, args):
+    """Datagrams processed and sent per second with the given number of workers"""
+    host = relay.RelayHost(("127.0.0.1", 0), workers, max_players=args.players, tick_rate=args.tick_rate,
+                           log=lambda *_: None)
+    host.start()
+    context = multiprocessing.get_context("fork")
+    ready = context.Semaphore(0)
+    go = context.Event()
+    results = context.Queue()
+    names = [f"lobby-{index}" for index in range(args.lobbies)]
+    senders = [context.Process(target=_load, daemon=True,
+                               args=(host.address, names[index::args.senders], args.players,
+                                     WARMUP + args.seconds + 0.5, ready, go, results))
+               for index in range(args.senders)]
+    try:
+        for sender in senders:
+            sender.start()
+        for _ in senders:
+            if not ready.acquire(timeout=CONNECT_TIMEOUT * args.players * args.lobbies):
+                raise RuntimeError("Load generators did not connect")
+        go.set()
+        time.sleep(WARMUP)
+        before = host.snapshot()
+        time.sleep(args.seconds)
+        after = host.snapshot()
+        offered = sum(results.get(timeout=WARMUP + args.seconds + 30) for _ in senders)
+    finally:
+        for sender in senders:
+            sender.join(5)
+            if sender.is_alive():
+                sender.terminate()
+        host.stop()
+
+    elapsed = after["time"] - before["time"]
+    lobby_rates = relay.rates(before, after)
+    totals = {field: sum(worker[field] - old[field] for worker, old in zip(after["workers"], before["workers"]))
+              for field in relay.WORKER_FIELDS}
+    return {
+        "workers": workers,
+        "packets_in_per_s": round(sum(r["packets_in_per_s"] for r in lobby_rates)),
+        "packets_out_per_s": round(sum(r["packets_out_per_s"] for r in lobby_rates)),
+        "mb_out_per_s": round(sum(r["bytes_out_per_s"] for r in lobby_rates) / (1 << 20), 2),
+        "offered_per_s": round(offered / (WARMUP + args.seconds + 0.5)),
+        "handed_off": round(totals["handed_off"] / max(totals["received"], 1), 3),
+        "dropped_per_s": round(totals["dropped"] / elapsed),
+    }
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Measure relay throughput against the number of workers")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="Worker counts to measure (default: 1, 2, 4, ... up to the core count); "
+                             "1 is always measured as the baseline")
+    parser.add_argument("--lobbies", type=int, default=32)
+    parser.add_argument("--players", type=int, default=4, help="Players per lobby")
+    parser.add_argument("--senders", type=int, default=max(1, cores // 4), help="Load generator processes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measured seconds per worker count")
+    parser.add_argument("--tick-rate", type=float, help="Run the relay with per-tick send scheduling")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "SO_REUSEPORT") or "fork" not in multiprocessing.get_all_start_methods():
+        print("Error: the relay needs SO_REUSEPORT and fork for more than one worker")
+        return 1
+    counts = args.workers or [1 << power for power in range(cores.bit_length()) if 1 << power <= cores]
+    # Speedup is relative to one worker, so that is always measured first
+    counts = [1] + [workers for workers in dict.fromkeys(counts) if workers != 1]
+
+    print(f"{args.lobbies} lobbies x {args.players} players, {args.senders} sender(s), {cores} core(s)")
+    print(f"{'workers':>7} {'pkt/s in':>10} {'pkt/s out':>10} {'MB/s out':>9} {'speedup':>8} {'efficiency':>10} "
+          f"{'handed off':>10}")
+    results = []
+    for workers in counts:
+        result = measure(workers, args)
+        baseline = results[0]["packets_in_per_s"] if results else result["packets_in_per_s"]
+        speedup = result["packets_in_per_s"] / baseline if baseline else 0.0
+        result["speedup"] = round(speedup, 2)
+        result["efficiency"] = round(speedup / workers, 2)
+        results.append(result)
+        print(f"{workers:>7} {result['packets_in_per_s']:>10} {result['packets_out_per_s']:>10} "
+              f"{result['mb_out_per_s']:>9.2f} {speedup:>7.2f}x {result['efficiency']:>10.0%} "
+              f"{result['handed_off']:>10.0%}", flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"time": datetime.now().isoformat(timespec="seconds"), "host": platform.node(),
+                       "cores": cores, "python": platform.python_version(),
+                       "params": {"lobbies": args.lobbies, "players": args.players, "senders": args.senders,
+                                  "seconds": args.seconds, "tick_rate": args.tick_rate},
+                       "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Startup budget benchmark for the Megabonk MP Launcher.
+Measures how long `import launcher` takes and how long it takes until the
+window first paints and until the installation status is shown, each in a
+fresh interpreter against a synthetic game folder, and compares the medians
+with fixed budgets.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 9 --json startup.json
+
+Exits with status 1 when a measurement is over budget. Window timings are
+skipped when no display is available.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+LAUNCHER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds, measured from just before `import launcher`
+BUDGETS = {
+    "import": 250.0,
+    "first_frame": 600.0,
+    "status_ready": 1000.0,
+}
+
+RESULT_MARKER = "STARTUP_RESULT "
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import launcher
+print(%r + repr((time.perf_counter() - started) * 1000))
+""" % RESULT_MARKER
+
+WINDOW_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import launcher
+import tkinter as tk
+
+result = {"import": (time.perf_counter() - started) * 1000, "first_frame": None, "status_ready": None}
+
+def elapsed():
+    return (time.perf_counter() - started) * 1000
+
+def finish():
+    print(%r + json.dumps(result), flush=True)
+    root.destroy()
+
+def painted():
+    if result["first_frame"] is None:
+        result["first_frame"] = elapsed()
+
+def on_map(event):
+    if event.widget is root:
+        root.after_idle(painted)
+
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(%r + json.dumps(result), flush=True)
+    raise SystemExit(0)
+
+root.bind("<Map>", on_map, add="+")
+apply_status = launcher.LauncherApp.apply_installation_status
+
+def apply_and_record(self, status):
+    apply_status(self, status)
+    result["status_ready"] = elapsed()
+    root.after_idle(finish)
+
+launcher.LauncherApp.apply_installation_status = apply_and_record
+app = launcher.LauncherApp(root)
+root.after(10000, finish)
+root.mainloop()
+""" % (RESULT_MARKER, RESULT_MARKER)
+
+
+def make_game_dir(root):
+    """Create a minimal Megabonk install with BepInEx and the mod present"""
+    game = os.path.join(root, "Megabonk")
+    files = {
+        "Megabonk.exe": b"MZ",
+        os.path.join("BepInEx", "core", "BepInEx.Core.dll"): b"MZ",
+        os.path.join("BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll"): b"MZ",
+        os.path.join("BepInEx", "config", "com.megabonk.multiplayer.cfg"): b"[Network]\nServerPort = 7777\n",
+    }
+    for relative_path, content in files.items():
+        path = os.path.join(game, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+    return game
+
+
+def run_script(script, workdir):
+    """Run a measurement script in a fresh interpreter and return its result line"""
+    env = dict(os.environ,
+               PYTHONPATH=LAUNCHER_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               PYTHONDONTWRITEBYTECODE="1",
+               HOME=workdir, LOCALAPPDATA=workdir)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env,
+                          capture_output=True, text=True, timeout=60)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return line[len(RESULT_MARKER):]
+    raise RuntimeError(f"Benchmark run failed:\n{proc.stderr.strip()}")
+
+
+def run_benchmark(runs=5):
+    """Return {measurement: [ms per run]}; window measurements are None without a display"""
+    samples = {name: [] for name in BUDGETS}
+    with tempfile.TemporaryDirectory(prefix="mbmp-startup-") as workdir:
+        game = make_game_dir(workdir)
+        with open(os.path.join(workdir, "launcher_config.json"), "w") as f:
+            json.dump({"game_path": game}, f)
+
+        # One untimed run so every timed run sees warm bytecode and file caches
+        run_script(IMPORT_SCRIPT, workdir)
+        for _ in range(runs):
+            samples["import"].append(float(run_script(IMPORT_SCRIPT, workdir)))
+            window = json.loads(run_script(WINDOW_SCRIPT, workdir))
+            for name in ("first_frame", "status_ready"):
+                if window[name] is not None:
+                    samples[name].append(window[name])
+    return samples
+
+
+def summarize(samples, budgets=BUDGETS):
+    """Median of each measurement compared with its budget"""
+    results = {}
+    for name, values in samples.items():
+        if not values:
+            results[name] = {"skipped": True, "budget_ms": budgets[name]}
+            continue
+        median = statistics.median(values)
+        results[name] = {"median_ms": round(median, 1), "min_ms": round(min(values), 1),
+                         "max_ms": round(max(values), 1), "runs": len(values),
+                         "budget_ms": budgets[name], "over_budget": median > budgets[name]}
+    return results
+
+
+def format_results(results):
+    lines = [f"{'Measurement':<14} {'Median':>9} {'Min':>9} {'Max':>9} {'Budget':>9}"]
+    for name, result in results.items():
+        if result.get("skipped"):
+            lines.append(f"{name:<14} {'skipped (no display)':>29} {result['budget_ms']:>7.0f}ms")
+            continue
+        flag = "  OVER BUDGET" if result["over_budget"] else ""
+        lines.append(f"{name:<14} {result['median_ms']:>7.1f}ms {result['min_ms']:>7.1f}ms "
+                     f"{result['max_ms']:>7.1f}ms {result['budget_ms']:>7.0f}ms{flag}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Launcher startup budget benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per measurement (default: 5)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = summarize(run_benchmark(args.runs))
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if any(result.get("over_budget") for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
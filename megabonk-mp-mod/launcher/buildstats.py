@@ -0,0 +1,229 @@
+"""
+Build performance tracking for the Megabonk MP Launcher.
+Parses MSBuild performance summaries and keeps a history of build durations.
+"""
+
+import os
+import re
+import json
+import hashlib
+import statistics
+from datetime import datetime
+
+HISTORY_FILE = "build_history.json"
+HISTORY_LIMIT = 200
+
+# Files that affect the build output; everything else in the source tree is ignored
+SOURCE_EXTENSIONS = (".cs", ".csproj", ".props", ".targets", ".config", ".json")
+SKIP_DIRS = {"bin", "obj", ".vs", ".git"}
+
+# MSBuild targets grouped by where the time actually goes
+PHASE_TARGETS = {
+    "restore": ("Restore", "_GenerateRestore", "_LoadRestoreGraph", "_IsProjectRestoreSupported",
+                "_GetAllRestoreProjectPathItems", "_FilterRestoreGraphProjectInputItems",
+                "CollectPackageReferences", "CollectPackageDownloads"),
+    "references": ("ResolveAssemblyReferences", "ResolvePackageAssets", "ResolveTargetingPackAssets",
+                   "ResolveLockFileReferences", "ResolvePackageDependencies", "ResolveFrameworkReferences",
+                   "ProcessFrameworkReferences", "_HandlePackageFileConflicts", "FindReferenceAssembliesForReferences"),
+    "compile": ("CoreCompile", "_ComputeNonExistentFileProperty", "GenerateAssemblyInfo",
+                "CoreGenerateAssemblyInfo", "GenerateGlobalUsings"),
+    "copy": ("CopyFilesToOutputDirectory", "_CopyFilesMarkedCopyLocal", "_CopyOutOfDateSourceItemsToOutputDirectory",
+             "_CopyAppConfigFile", "IncrementalClean", "CopyRefAssembly"),
+}
+
+SECTION_HEADERS = {
+    "Project Evaluation Performance Summary:": "evaluation",
+    "Project Performance Summary:": "projects",
+    "Target Performance Summary:": "targets",
+    "Task Performance Summary:": "tasks",
+}
+
+SUMMARY_LINE = re.compile(r"^\s*(\d+)\s+ms\s+(.+?)\s+(\d+)\s+calls?\s*$")
+
+
+def dotnet_build_args(csproj_path=None, configuration="Release", verbosity="normal",
+                      performance_summary=True, binlog_path=None, dotnet="dotnet"):
+    """Build the `dotnet build` command line with optional performance reporting"""
+    args = [dotnet, "build", "-c", configuration, "--verbosity", verbosity]
+    if performance_summary:
+        args.append("-clp:PerformanceSummary")
+    if binlog_path:
+        args.append(f"-bl:{binlog_path}")
+    if csproj_path:
+        args.append(csproj_path)
+    return args
+
+
+def parse_performance_summary(lines):
+    """Parse the per-project, per-target and per-task timings printed by -clp:PerformanceSummary"""
+    summary = {name: [] for name in SECTION_HEADERS.values()}
+    section = None
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped in SECTION_HEADERS:
+            section = SECTION_HEADERS[stripped]
+            continue
+        if section is None:
+            continue
+
+        match = SUMMARY_LINE.match(line)
+        if match:
+            summary[section].append({
+                "name": match.group(2),
+                "ms": int(match.group(1)),
+                "calls": int(match.group(3)),
+            })
+        elif stripped and not stripped.startswith("|"):
+            # Any other non-empty line ends the current table
+            section = None
+
+    return summary
+
+
+def phase_of_target(name):
+    """Return the build phase a target belongs to"""
+    for phase, prefixes in PHASE_TARGETS.items():
+        if name.startswith(prefixes):
+            return phase
+    return "other"
+
+
+def phase_breakdown(summary):
+    """Sum target time per build phase (restore, references, compile, copy, other)"""
+    phases = {phase: 0 for phase in PHASE_TARGETS}
+    phases["other"] = 0
+    for target in summary.get("targets", []):
+        phases[phase_of_target(target["name"])] += target["ms"]
+    return phases
+
+
+def slowest(entries, count=10):
+    """Return the `count` slowest entries of a summary section"""
+    return sorted(entries, key=lambda e: e["ms"], reverse=True)[:count]
+
+
+def source_fingerprint(source_dir, game_fingerprint=None):
+    """Hash the build-relevant files of the mod source tree.
+
+    Passing the game's fingerprint (see gamefingerprint) keys builds to the game
+    version too, so timings against old interop assemblies aren't compared with new ones.
+    """
+    digest = hashlib.sha256()
+    if not os.path.isdir(source_dir):
+        return None
+    if game_fingerprint:
+        digest.update(b"game:" + game_fingerprint.encode("ascii") + b"\0")
+
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            if not name.endswith(SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, source_dir).replace(os.sep, "/")
+            digest.update(rel_path.encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+
+    return digest.hexdigest()[:16]
+
+
+class BuildHistory:
+    """Build durations keyed by source fingerprint and SDK version, stored as JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f).get("builds", [])
+            except (OSError, ValueError):
+                pass
+        return []
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"builds": self.entries[-HISTORY_LIMIT:]}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record(self, fingerprint, sdk_version, duration, summary, success=True):
+        """Append a build result and return the stored entry"""
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "fingerprint": fingerprint,
+            "sdk": sdk_version,
+            "duration_ms": int(duration * 1000),
+            "success": success,
+            "phases": phase_breakdown(summary),
+            "targets": {t["name"]: t["ms"] for t in summary.get("targets", [])},
+            "tasks": {t["name"]: t["ms"] for t in summary.get("tasks", [])},
+        }
+        self.entries.append(entry)
+        self.save()
+        return entry
+
+    def baseline(self, entry, window=5):
+        """Previous successful builds comparable to `entry` (same SDK, same fingerprint if possible)"""
+        previous = [e for e in self.entries if e is not entry and e.get("success")
+                    and e.get("sdk") == entry.get("sdk")]
+        same_source = [e for e in previous if e.get("fingerprint") == entry.get("fingerprint")]
+        return (same_source or previous)[-window:]
+
+    def regressions(self, entry, threshold=1.5, min_delta_ms=200):
+        """Compare `entry` against its baseline; return a list of (name, baseline_ms, current_ms)"""
+        baseline = self.baseline(entry)
+        if not baseline:
+            return []
+
+        found = []
+        median_total = statistics.median(e["duration_ms"] for e in baseline)
+        if entry["duration_ms"] > median_total * threshold and entry["duration_ms"] - median_total >= min_delta_ms:
+            found.append(("Total build", int(median_total), entry["duration_ms"]))
+
+        for name, current in entry.get("targets", {}).items():
+            history = [e["targets"][name] for e in baseline if name in e.get("targets", {})]
+            if not history:
+                continue
+            median = statistics.median(history)
+            if current > median * threshold and current - median >= min_delta_ms:
+                found.append((name, int(median), current))
+
+        return sorted(found, key=lambda r: r[2] - r[1], reverse=True)
+
+
+def format_report(entry, history, count=10):
+    """Render a human readable report for a recorded build"""
+    lines = [
+        f"Build at {entry['time']}: {entry['duration_ms'] / 1000:.1f}s "
+        f"({'ok' if entry['success'] else 'failed'}), SDK {entry.get('sdk') or 'unknown'}, "
+        f"source {entry.get('fingerprint') or 'unknown'}",
+        "",
+        "Time by phase:",
+    ]
+    for phase, ms in sorted(entry["phases"].items(), key=lambda p: p[1], reverse=True):
+        lines.append(f"  {phase:<12} {ms:>8} ms")
+
+    lines.append("")
+    lines.append("Slowest targets:")
+    targets = [{"name": n, "ms": ms} for n, ms in entry.get("targets", {}).items()]
+    for target in slowest(targets, count):
+        lines.append(f"  {target['ms']:>8} ms  {target['name']}")
+
+    regressions = history.regressions(entry)
+    lines.append("")
+    if regressions:
+        lines.append("Regressions vs. previous builds:")
+        for name, before, after in regressions:
+            lines.append(f"  {name}: {before} ms -> {after} ms")
+    else:
+        lines.append("No regressions vs. previous builds.")
+
+    return "\n".join(lines)
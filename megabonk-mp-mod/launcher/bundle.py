@@ -0,0 +1,253 @@
+"""
+Offline deployment bundles for the Megabonk MP Launcher.
+A bundle is a single zip holding the pinned BepInEx archive, the compiled mod,
+its BepInEx config and Thunderstore metadata, plus a SHA-256 manifest. Importing
+verifies every file and installs it without the .NET SDK or any download.
+"""
+
+import os
+import io
+import json
+import zlib
+import struct
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from datetime import datetime
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "bundle.json"
+CHUNK_SIZE = 1 << 20
+
+# Paths inside the bundle
+BEPINEX_DIR = "bepinex/"
+MOD_DLL = "plugins/MegabonkMP/MegabonkMP.dll"
+MOD_CFG = "config/com.megabonk.multiplayer.cfg"
+THUNDERSTORE_MANIFEST = "thunderstore/manifest.json"
+
+# Where bundle files go, relative to the game folder
+INSTALL_TARGETS = {
+    MOD_DLL: os.path.join("BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll"),
+    MOD_CFG: os.path.join("BepInEx", "config", "com.megabonk.multiplayer.cfg"),
+}
+
+
+class BundleError(Exception):
+    """Raised when a bundle is incomplete, corrupt or cannot be applied"""
+
+
+class _HashingReader:
+    """File wrapper that hashes everything read through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        self.size += len(data)
+        return data
+
+
+def _copy_hashed(src, dst):
+    reader = _HashingReader(src)
+    shutil.copyfileobj(reader, dst, CHUNK_SIZE)
+    return reader.digest.hexdigest(), reader.size
+
+
+def export_bundle(bundle_path, bepinex_zip, mod_dll, mod_cfg=None, thunderstore_manifest=None,
+                  bepinex_version=None, log=print):
+    """Write a bundle; files are streamed into the archive and hashed on the way"""
+    files = [(BEPINEX_DIR + os.path.basename(bepinex_zip), bepinex_zip, zipfile.ZIP_STORED),
+             (MOD_DLL, mod_dll, zipfile.ZIP_DEFLATED)]
+    if mod_cfg:
+        files.append((MOD_CFG, mod_cfg, zipfile.ZIP_DEFLATED))
+    if thunderstore_manifest:
+        files.append((THUNDERSTORE_MANIFEST, thunderstore_manifest, zipfile.ZIP_DEFLATED))
+
+    for _, path, _ in files:
+        if not os.path.isfile(path):
+            raise BundleError(f"Missing bundle input: {path}")
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "bepinex_version": bepinex_version,
+        "files": {},
+    }
+    if thunderstore_manifest:
+        with open(thunderstore_manifest, "r", encoding="utf-8-sig") as f:
+            manifest["package"] = json.load(f)
+
+    tmp_path = bundle_path + ".part"
+    with zipfile.ZipFile(tmp_path, "w", allowZip64=True) as zf:
+        for arcname, path, compression in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            # The BepInEx archive is stored uncompressed so import can read it in place
+            info.compress_type = compression
+            with open(path, "rb") as src, zf.open(info, "w", force_zip64=True) as dst:
+                digest, size = _copy_hashed(src, dst)
+            manifest["files"][arcname] = {"sha256": digest, "size": size}
+            log(f"Added {arcname} ({size:,} bytes)")
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+    os.replace(tmp_path, bundle_path)
+    return manifest
+
+
+def read_manifest(zf):
+    try:
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+    except KeyError:
+        raise BundleError("Not a MegabonkMP bundle (bundle.json missing)")
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format: {manifest.get('format')}")
+    return manifest
+
+
+def verify_bundle(bundle_path, log=print):
+    """Stream every listed file and check its size and SHA-256; returns the manifest"""
+    with zipfile.ZipFile(bundle_path) as zf:
+        manifest = read_manifest(zf)
+        names = set(zf.namelist())
+        for arcname, expected in manifest["files"].items():
+            if arcname not in names:
+                raise BundleError(f"Bundle is missing {arcname}")
+            with zf.open(arcname) as f:
+                reader = _HashingReader(f)
+                for _ in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                    pass
+            if reader.size != expected["size"] or reader.digest.hexdigest() != expected["sha256"]:
+                raise BundleError(f"Checksum mismatch for {arcname}")
+        log(f"Verified {len(manifest['files'])} files")
+    return manifest
+
+
+class _StoredMember(io.RawIOBase):
+    """Seekable read-only view of an uncompressed zip member inside the bundle file"""
+
+    def __init__(self, f, start, size):
+        self.f = f
+        self.start = start
+        self.size = size
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(0, min(offset, self.size))
+        return self.pos
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.size - self.pos)
+        if count <= 0:
+            return 0
+        self.f.seek(self.start + self.pos)
+        data = self.f.read(count)
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+
+def _open_stored(bundle_file, info):
+    """Open a stored member for random access without copying it out of the bundle"""
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise BundleError(f"{info.filename} must be stored uncompressed")
+    bundle_file.seek(info.header_offset)
+    header = bundle_file.read(30)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    return _StoredMember(bundle_file, info.header_offset + 30 + name_length + extra_length, info.file_size)
+
+
+def _file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_atomic(src, dest_path):
+    """Stream `src` into dest_path via a temp file in the same folder"""
+    dest_dir = os.path.dirname(dest_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".bundle-", dir=dest_dir)
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def install_zip_delta(archive, game_path):
+    """Extract a zip into game_path, skipping files whose size and CRC already match.
+
+    Returns (written, skipped) counts.
+    """
+    written = skipped = 0
+    root = os.path.realpath(game_path)
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        dest_path = os.path.realpath(os.path.join(game_path, info.filename))
+        if not dest_path.startswith(root + os.sep):
+            raise BundleError(f"Refusing to write outside the game folder: {info.filename}")
+        if (os.path.isfile(dest_path) and os.path.getsize(dest_path) == info.file_size
+                and _file_crc32(dest_path) == info.CRC):
+            skipped += 1
+            continue
+        with archive.open(info) as src:
+            write_atomic(src, dest_path)
+        written += 1
+    return written, skipped
+
+
+def import_bundle(bundle_path, game_path, log=print):
+    """Verify a bundle and apply it to game_path, writing only files that changed"""
+    if not os.path.isdir(game_path):
+        raise BundleError(f"Game folder not found: {game_path}")
+
+    manifest = verify_bundle(bundle_path, log)
+    with open(bundle_path, "rb") as raw, zipfile.ZipFile(bundle_path) as zf:
+        for arcname in manifest["files"]:
+            if arcname.startswith(BEPINEX_DIR):
+                # Stored uncompressed, so the nested zip is read in place without unpacking it first
+                with zipfile.ZipFile(_open_stored(raw, zf.getinfo(arcname))) as bepinex:
+                    written, skipped = install_zip_delta(bepinex, game_path)
+                log(f"BepInEx: {written} files written, {skipped} unchanged")
+
+        for arcname, relative_path in INSTALL_TARGETS.items():
+            if arcname not in manifest["files"]:
+                continue
+            dest_path = os.path.join(game_path, relative_path)
+            if os.path.isfile(dest_path) and file_sha256(dest_path) == manifest["files"][arcname]["sha256"]:
+                log(f"{relative_path}: unchanged")
+                continue
+            with zf.open(arcname) as src:
+                write_atomic(src, dest_path)
+            log(f"{relative_path}: written")
+
+    return manifest
@@ -0,0 +1,481 @@
+"""
+Local JSON control API for the Megabonk MP Launcher.
+A small asyncio HTTP/1.1 server bound to 127.0.0.1 that lets scripts run the
+launcher's operations as jobs, read status and follow job progress and log
+tails by long-polling or server-sent events. Jobs (including batches of
+several operations) run one at a time on a single worker thread. While idle
+the server only waits in select(); nothing polls unless a client is waiting
+on a log file.
+
+Every request needs the token from control_api.json in the app data folder:
+    Authorization: Bearer <token>
+
+Endpoints:
+    GET  /status                         installation and build readiness
+    GET  /operations                     operations a job can run
+    POST /jobs                           {"op": "build"} or {"operations": [{"op": ...}, ...]}
+    GET  /jobs                           all jobs, newest last
+    GET  /jobs/<id>?since=N&wait=S       job with events after N, waiting up to S seconds for more
+    GET  /jobs/<id>/events               the same as a text/event-stream until the job ends
+    GET  /logs?source=S&since=N&wait=S   launcher log lines (or the BepInEx log with source=bepinex)
+    GET  /logs/stream?source=S           the same as a text/event-stream
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import secrets
+import threading
+import itertools
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+INFO_FILE = "control_api.json"
+DEFAULT_PORT = 7790
+
+MAX_BODY = 1 << 20
+MAX_WAIT = 60.0
+LOG_LINES = 5000
+LOG_POLL_INTERVAL = 0.5  # only while a client waits on a log file
+SSE_KEEPALIVE = 15.0
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class EventFeed:
+    """Append-only sequence of events that asyncio readers can wait on from another thread"""
+
+    def __init__(self, loop, maxlen=None):
+        self.loop = loop
+        self.events = deque(maxlen=maxlen)
+        self.next_seq = 0
+        self._lock = threading.Lock()
+        self._changed = asyncio.Event()
+
+    def append(self, event):
+        with self._lock:
+            event["seq"] = self.next_seq
+            self.next_seq += 1
+            self.events.append(event)
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def since(self, seq):
+        with self._lock:
+            return [event for event in self.events if event["seq"] >= seq]
+
+    async def wait(self, seq, timeout):
+        """Events from seq on, waiting up to timeout seconds for the first one"""
+        deadline = self.loop.time() + timeout
+        while True:
+            changed = self._changed
+            events = self.since(seq)
+            remaining = deadline - self.loop.time()
+            if events or remaining <= 0:
+                return events
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+
+class Job:
+    """One scheduled run of one or more operations"""
+
+    def __init__(self, job_id, steps, stop_on_error, loop):
+        self.id = job_id
+        self.steps = steps
+        self.stop_on_error = stop_on_error
+        self.state = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.results = []
+        self.feed = EventFeed(loop)
+        self.current = None
+
+    def log(self, message, level="INFO"):
+        logging.getLogger(__name__).log(getattr(logging, level, logging.INFO), message)
+        self.feed.append({"type": "log", "time": time.time(), "step": self.current, "level": level,
+                          "message": message})
+
+    def progress(self, fraction, message=None):
+        self.feed.append({"type": "progress", "time": time.time(), "step": self.current,
+                          "fraction": round(fraction, 3), "message": message})
+
+    @property
+    def done(self):
+        return self.state in ("succeeded", "failed")
+
+    def summary(self):
+        return {"id": self.id, "state": self.state, "operations": [step["op"] for step in self.steps],
+                "created": self.created, "started": self.started, "finished": self.finished,
+                "results": self.results}
+
+
+class JobRunner:
+    """Runs queued jobs in order on one worker thread"""
+
+    def __init__(self, operations, loop, on_job_done=None):
+        self.operations = operations
+        self.loop = loop
+        self.on_job_done = on_job_done
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._queue = deque()
+        self._wakeup = threading.Condition()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, steps, stop_on_error=True):
+        for step in steps:
+            if not isinstance(step, dict) or step.get("op") not in self.operations:
+                raise ApiError(400, f"Unknown operation: {step.get('op') if isinstance(step, dict) else step!r}")
+        job = Job(next(self._ids), steps, stop_on_error, self.loop)
+        self.jobs[job.id] = job
+        with self._wakeup:
+            self._queue.append(job)
+            self._wakeup.notify()
+        return job
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                while not self._queue:
+                    self._wakeup.wait()
+                job = self._queue.popleft()
+            self._run(job)
+
+    def _run(self, job):
+        job.state = "running"
+        job.started = time.time()
+        job.feed.append({"type": "state", "state": job.state})
+        failed = False
+        for index, step in enumerate(job.steps):
+            if failed and job.stop_on_error:
+                job.results.append({"op": step["op"], "ok": False, "skipped": True})
+                continue
+            job.current = index
+            function = self.operations[step["op"]][0]
+            params = {key: value for key, value in step.items() if key != "op"}
+            job.feed.append({"type": "step", "step": index, "op": step["op"], "state": "running"})
+            started = time.perf_counter()
+            try:
+                result = {"op": step["op"], "ok": True, "result": function(params, job)}
+            except Exception as e:
+                logging.getLogger(__name__).exception("Control API operation %s failed: %s", step["op"], e)
+                job.feed.append({"type": "log", "time": time.time(), "step": index, "level": "ERROR",
+                                 "message": str(e)})
+                result = {"op": step["op"], "ok": False, "error": str(e)}
+                failed = True
+            result["duration_ms"] = int((time.perf_counter() - started) * 1000)
+            job.results.append(result)
+            job.feed.append({"type": "step", "step": index, "op": step["op"],
+                             "state": "succeeded" if result["ok"] else "failed"})
+        job.current = None
+        job.finished = time.time()
+        job.state = "failed" if failed else "succeeded"
+        job.feed.append({"type": "state", "state": job.state})
+        if self.on_job_done:
+            self.on_job_done(job)
+
+
+class LogFeedHandler(logging.Handler):
+    """Copies launcher log records into an EventFeed"""
+
+    def __init__(self, feed):
+        super().__init__()
+        self.feed = feed
+
+    def emit(self, record):
+        self.feed.append({"type": "log", "time": record.created, "level": record.levelname,
+                          "message": record.getMessage()})
+
+
+class ControlServer:
+    """The HTTP front end; start() runs it on a background event-loop thread"""
+
+    def __init__(self, operations, status, bepinex_log=None, host="127.0.0.1", port=DEFAULT_PORT,
+                 token=None, on_job_done=None):
+        self.operations = operations
+        self.status = status
+        self.bepinex_log = bepinex_log
+        self.host = host
+        self.port = port
+        self.token = token or secrets.token_urlsafe(24)
+        self.on_job_done = on_job_done
+        self.loop = None
+        self.server = None
+        self._thread = None
+        self._log_handler = None
+
+    # Lifecycle
+
+    async def serve(self, ready=None):
+        """Serve until cancelled"""
+        self.loop = asyncio.get_running_loop()
+        self.runner = JobRunner(self.operations, self.loop, self.on_job_done)
+        self.log_feed = EventFeed(self.loop, maxlen=LOG_LINES)
+        self._log_handler = LogFeedHandler(self.log_feed)
+        logging.getLogger().addHandler(self._log_handler)
+        try:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            if ready:
+                ready()
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            logging.getLogger().removeHandler(self._log_handler)
+
+    def start(self):
+        """Run the server on a daemon thread; returns once it is listening"""
+        listening = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                asyncio.run(self.serve(ready=listening.set))
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                errors.append(e)
+                listening.set()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        listening.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+    def write_info(self, path):
+        """Publish the port and token for local scripts (readable by this user only)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"url": f"http://{self.host}:{self.port}", "port": self.port, "token": self.token,
+                       "pid": os.getpid()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)})
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    if not secrets.compare_digest(headers.get("authorization", ""), f"Bearer {self.token}"):
+                        raise ApiError(401, "Missing or wrong token (see control_api.json)")
+                    streamed = await self._route(method, target, body, writer)
+                    if streamed:
+                        break
+                except ApiError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)})
+                except Exception as e:
+                    logging.getLogger(__name__).exception("Control API request failed")
+                    await self._send_json(writer, 500, {"error": str(e)})
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            request_line = await reader.readline()
+        except (ConnectionError, ValueError):
+            return None
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(None, 2)
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise ApiError(400, "Bad Content-Length")
+        if length > MAX_BODY:
+            raise ApiError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _send_json(self, writer, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    async def _route(self, method, target, body, writer):
+        """Dispatch one request; returns True when the connection was used for a stream"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["status"] and method == "GET":
+            status = await self.loop.run_in_executor(None, self.status)
+            await self._send_json(writer, 200, status)
+        elif parts == ["operations"] and method == "GET":
+            await self._send_json(writer, 200, {name: description for name, (_, description)
+                                                in self.operations.items()})
+        elif parts == ["jobs"] and method == "POST":
+            await self._send_json(writer, 202, self._submit(body).summary())
+        elif parts == ["jobs"] and method == "GET":
+            await self._send_json(writer, 200, {"jobs": [job.summary() for job in self.runner.jobs.values()]})
+        elif len(parts) == 2 and parts[0] == "jobs" and method == "GET":
+            job = self._job(parts[1])
+            since = _int(query, "since", 0)
+            events = await job.feed.wait(since, _wait(query)) if not job.done else job.feed.since(since)
+            await self._send_json(writer, 200, dict(job.summary(), events=events,
+                                                    next=events[-1]["seq"] + 1 if events else since))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events" and method == "GET":
+            job = self._job(parts[1])
+            await self._stream(writer, job.feed, _int(query, "since", 0), until=lambda: job.done)
+            return True
+        elif parts == ["logs"] and method == "GET":
+            lines, next_seq = await self._log_lines(query.get("source", "launcher"), _int(query, "since", 0),
+                                                    _wait(query))
+            await self._send_json(writer, 200, {"lines": lines, "next": next_seq})
+        elif parts == ["logs", "stream"] and method == "GET":
+            await self._stream_logs(writer, query.get("source", "launcher"), _int(query, "since", 0))
+            return True
+        elif parts and parts[0] in ("status", "operations", "jobs", "logs"):
+            raise ApiError(405, f"{method} not allowed on {url.path}")
+        else:
+            raise ApiError(404, f"No such endpoint: {url.path}")
+        return False
+
+    def _submit(self, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise ApiError(400, "Body must be JSON")
+        if not isinstance(request, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        steps = request.get("operations") or ([request] if "op" in request else [])
+        if not steps or not isinstance(steps, list):
+            raise ApiError(400, 'Expected {"op": ...} or {"operations": [...]}')
+        return self.runner.submit(steps, stop_on_error=request.get("stop_on_error", True))
+
+    def _job(self, job_id):
+        try:
+            return self.runner.jobs[int(job_id)]
+        except (ValueError, KeyError):
+            raise ApiError(404, f"No such job: {job_id}")
+
+    # Streams
+
+    async def _start_stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-store\r\n"
+                     b"Connection: close\r\n\r\n")
+        await writer.drain()
+
+    async def _send_event(self, writer, event, name="message"):
+        writer.write(f"event: {name}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+        await writer.drain()
+
+    async def _stream(self, writer, feed, since, until):
+        await self._start_stream(writer)
+        while True:
+            events = await feed.wait(since, SSE_KEEPALIVE)
+            for event in events:
+                await self._send_event(writer, event)
+                since = event["seq"] + 1
+            if until() and not feed.since(since):
+                await self._send_event(writer, {}, name="end")
+                return
+            if not events:
+                writer.write(b": keepalive\n\n")
+                await writer.drain()
+
+    async def _log_lines(self, source, since, wait):
+        """Launcher log records from feed position since, or BepInEx log text from byte offset since"""
+        if source == "launcher":
+            events = await self.log_feed.wait(since, wait)
+            return events, events[-1]["seq"] + 1 if events else since
+        if source != "bepinex" or not self.bepinex_log:
+            raise ApiError(400, "source must be launcher or bepinex")
+
+        path = self.bepinex_log()
+        deadline = self.loop.time() + wait
+        while True:
+            lines, offset = await self.loop.run_in_executor(None, _read_new_lines, path, since)
+            if lines or self.loop.time() >= deadline:
+                return lines, offset
+            since = offset
+            await asyncio.sleep(min(LOG_POLL_INTERVAL, max(0.0, deadline - self.loop.time())))
+
+    async def _stream_logs(self, writer, source, since):
+        if source == "launcher":
+            await self._stream(writer, self.log_feed, since, until=lambda: False)
+            return
+        await self._start_stream(writer)
+        while True:
+            lines, since = await self._log_lines(source, since, SSE_KEEPALIVE)
+            for line in lines:
+                await self._send_event(writer, {"message": line, "offset": since})
+            if not lines:
+                writer.write(b": keepalive\n\n")
+                await writer.drain()
+
+
+def _read_new_lines(path, offset):
+    """Complete lines appended to path after byte offset; restarts if the file was truncated"""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            if offset > size:
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].decode("utf-8", errors="replace").splitlines()
+    return lines, offset + end
+
+
+def _int(query, name, default):
+    try:
+        return max(0, int(query.get(name, default)))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+
+
+def _wait(query):
+    try:
+        return min(MAX_WAIT, max(0.0, float(query.get("wait", 0))))
+    except ValueError:
+        raise ApiError(400, "wait must be a number of seconds")
@@ -0,0 +1,297 @@
+"""
+Developer watch mode for the Megabonk MP Launcher.
+Polls the mod source tree with cheap mtime snapshots, debounces bursts of
+saves, runs an incremental `dotnet build` that streams its diagnostics, and
+atomically deploys the new MegabonkMP.dll into BepInEx/plugins. While the game
+holds the plugin, the deploy is queued and applied before the next launch.
+"""
+
+import os
+import re
+import time
+import shutil
+import threading
+import subprocess
+
+import buildstats
+
+POLL_INTERVAL = 0.5
+DEBOUNCE = 0.6
+
+PENDING_DIR = "pending_deploy"
+DLL_NAME = "MegabonkMP.dll"
+
+# Built outside bin/Release so watch builds never touch the plugin folder directly
+WATCH_OUTPUT = os.path.join("bin", "Watch")
+
+# Edits to these can change package references, so the next build has to restore
+RESTORE_EXTENSIONS = (".csproj", ".props", ".targets")
+RESTORE_FILES = ("nuget.config",)
+
+# MSBuild/Roslyn diagnostic: "path(line,col): error CS0103: message [project]"
+DIAGNOSTIC = re.compile(r"^\s*(?P<file>.+?)\((?P<line>\d+),(?P<column>\d+)\):\s+(?P<level>error|warning)\s+"
+                        r"(?P<code>[A-Z]+\d+):\s+(?P<message>.*?)(?:\s+\[[^\]]+\])?\s*$")
+
+
+def snapshot(source_dir):
+    """{relative path: (size, mtime_ns)} for every build-relevant file"""
+    files = {}
+    stack = [source_dir]
+    while stack:
+        folder = stack.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in buildstats.SKIP_DIRS:
+                    stack.append(entry.path)
+            elif entry.name.endswith(buildstats.SOURCE_EXTENSIONS):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[os.path.relpath(entry.path, source_dir)] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def needs_restore(mod_source, changed):
+    """Whether a build after these changes has to run NuGet restore first"""
+    if not os.path.exists(os.path.join(mod_source, "obj", "project.assets.json")):
+        return True
+    return any(path.lower().endswith(RESTORE_EXTENSIONS) or os.path.basename(path).lower() in RESTORE_FILES
+               for path in changed)
+
+
+def changed_files(before, after):
+    """Relative paths added, removed or modified between two snapshots"""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def watch_build_args(csproj_path=None, restore=True, dotnet="dotnet"):
+    """Incremental build into WATCH_OUTPUT with compact, streamable output"""
+    args = buildstats.dotnet_build_args(csproj_path, verbosity="minimal", performance_summary=False,
+                                        dotnet=dotnet)
+    args += ["-nologo", "-clp:NoSummary", f"-p:OutputPath={WATCH_OUTPUT}{os.sep}"]
+    if not restore:
+        args.append("--no-restore")
+    return args
+
+
+def parse_diagnostic(line):
+    """Return a diagnostic dict for a compiler error/warning line, else None"""
+    match = DIAGNOSTIC.match(line)
+    if not match:
+        return None
+    diagnostic = match.groupdict()
+    diagnostic["line"] = int(diagnostic["line"])
+    diagnostic["column"] = int(diagnostic["column"])
+    return diagnostic
+
+
+def stream_build(args, cwd, on_line=None, env=None):
+    """Run a build, passing each output line to on_line as it arrives.
+
+    Returns (returncode, diagnostics) with duplicate diagnostics removed.
+    """
+    diagnostics = []
+    seen = set()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, errors="replace", bufsize=1)
+    with process.stdout:
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            diagnostic = parse_diagnostic(line)
+            if diagnostic:
+                key = (diagnostic["file"], diagnostic["line"], diagnostic["column"], diagnostic["code"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                diagnostics.append(diagnostic)
+            if on_line:
+                on_line(line, diagnostic)
+    return process.wait(), diagnostics
+
+
+def _replace_file(source, dest):
+    """Copy source next to dest and rename it into place, so dest is never half-written"""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = dest + ".tmp"
+    shutil.copy2(source, tmp_path)
+    try:
+        os.replace(tmp_path, dest)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def plugin_path(game_path):
+    return os.path.join(game_path, "BepInEx", "plugins", "MegabonkMP", DLL_NAME)
+
+
+def deploy(built_dll, game_path, pending_dir, game_running=False):
+    """Install built_dll into the game, or queue it if the game holds the plugin.
+
+    Returns "deployed" or "queued".
+    """
+    if not game_running:
+        try:
+            _replace_file(built_dll, plugin_path(game_path))
+            discard_pending(pending_dir)
+            return "deployed"
+        except PermissionError:
+            pass  # Windows keeps loaded assemblies locked
+    _replace_file(built_dll, os.path.join(pending_dir, DLL_NAME))
+    return "queued"
+
+
+def discard_pending(pending_dir):
+    pending = os.path.join(pending_dir, DLL_NAME)
+    if os.path.exists(pending):
+        os.remove(pending)
+
+
+def apply_pending(pending_dir, game_path):
+    """Deploy a queued DLL; returns True if one was applied"""
+    pending = os.path.join(pending_dir, DLL_NAME)
+    if not os.path.exists(pending):
+        return False
+    _replace_file(pending, plugin_path(game_path))
+    os.remove(pending)
+    return True
+
+
+class DevWatcher:
+    """Background loop: snapshot, debounce, build, deploy, report.
+
+    on_result receives one dict per cycle with the changed files, status
+    ("deployed", "queued" or "failed"), diagnostics and stage timings in ms,
+    including edit_to_deployed measured from the earliest changed file's mtime.
+    """
+
+    def __init__(self, mod_source, game_path, pending_dir, csproj_path=None, env=None, dotnet="dotnet",
+                 log=print, on_result=None, game_running=lambda: False,
+                 interval=POLL_INTERVAL, debounce=DEBOUNCE):
+        self.mod_source = mod_source
+        self.game_path = game_path
+        self.pending_dir = pending_dir
+        self.csproj_path = csproj_path
+        self.env = env
+        self.dotnet = dotnet
+        self.log = log
+        self.on_result = on_result
+        self.game_running = game_running
+        self.interval = interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        self.log(f"Watching {self.mod_source} for changes")
+        before = snapshot(self.mod_source)
+        while not self._stop.wait(self.interval):
+            after = snapshot(self.mod_source)
+            changed = changed_files(before, after)
+            if not changed:
+                if os.path.exists(os.path.join(self.pending_dir, DLL_NAME)) and not self.game_running():
+                    self._apply_queued()
+                continue
+
+            detected = time.time()
+            # Editors save in bursts (format-on-save, several files); wait for quiet
+            while not self._stop.wait(self.debounce):
+                later = snapshot(self.mod_source)
+                more = changed_files(after, later)
+                if not more:
+                    break
+                changed |= more
+                after = later
+            if self._stop.is_set():
+                break
+            before = after
+            edited = min((after[path][1] / 1e9 for path in changed if path in after), default=detected)
+            self.cycle(sorted(changed), edited, detected)
+        self.log("Watch mode stopped")
+
+    def _apply_queued(self):
+        try:
+            if apply_pending(self.pending_dir, self.game_path):
+                self.log("Applied queued MegabonkMP.dll now that the game has exited")
+        except PermissionError:
+            pass
+
+    def cycle(self, changed, edited, detected):
+        """Build and deploy once; returns the result dict also passed to on_result"""
+        shown = ", ".join(changed[:3]) + (f" and {len(changed) - 3} more" if len(changed) > 3 else "")
+        self.log(f"Change detected: {shown}")
+        result = {"changed": changed, "status": "failed", "diagnostics": [], "timings": {}}
+        timings = result["timings"]
+        timings["detect_ms"] = int((detected - edited) * 1000)
+        timings["debounce_ms"] = int((time.time() - detected) * 1000)
+
+        args = watch_build_args(self.csproj_path, restore=needs_restore(self.mod_source, changed), dotnet=self.dotnet)
+        started = time.perf_counter()
+
+        def on_line(line, diagnostic):
+            if diagnostic:
+                level = "ERROR" if diagnostic["level"] == "error" else "WARNING"
+                self.log(f"{diagnostic['file']}({diagnostic['line']},{diagnostic['column']}): "
+                         f"{diagnostic['code']} {diagnostic['message']}", level)
+
+        try:
+            returncode, result["diagnostics"] = stream_build(args, self.mod_source, on_line, env=self.env)
+        except OSError as e:
+            self.log(f"Could not run dotnet: {e}", "ERROR")
+            returncode = None
+        timings["build_ms"] = int((time.perf_counter() - started) * 1000)
+
+        built_dll = os.path.join(self.mod_source, WATCH_OUTPUT, DLL_NAME)
+        if returncode == 0 and os.path.exists(built_dll):
+            started = time.perf_counter()
+            try:
+                result["status"] = deploy(built_dll, self.game_path, self.pending_dir,
+                                          game_running=self.game_running())
+            except OSError as e:
+                self.log(f"Deploy failed: {e}", "ERROR")
+            timings["deploy_ms"] = int((time.perf_counter() - started) * 1000)
+
+        timings["edit_to_deployed_ms"] = int((time.time() - edited) * 1000)
+        errors = sum(1 for d in result["diagnostics"] if d["level"] == "error")
+        if result["status"] == "deployed":
+            self.log(f"Deployed MegabonkMP.dll {timings['edit_to_deployed_ms'] / 1000:.1f}s after the edit "
+                     f"(build {timings['build_ms'] / 1000:.1f}s)")
+        elif result["status"] == "queued":
+            self.log("Game is running; MegabonkMP.dll queued for the next launch", "WARNING")
+        else:
+            self.log(f"Watch build failed ({errors} error(s)); fix the source and save again", "ERROR")
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+
+def format_result(result):
+    """One-line summary for the UI"""
+    timings = result["timings"]
+    files = f"{len(result['changed'])} file(s)"
+    if result["status"] == "deployed":
+        return (f"✅ {files} → deployed in {timings['edit_to_deployed_ms'] / 1000:.1f}s "
+                f"(build {timings['build_ms'] / 1000:.1f}s, deploy {timings.get('deploy_ms', 0)} ms)")
+    if result["status"] == "queued":
+        return f"⏸ {files} → built in {timings['build_ms'] / 1000:.1f}s, deploy queued until next launch"
+    errors = sum(1 for d in result["diagnostics"] if d["level"] == "error")
+    return f"❌ {files} → build failed with {errors} error(s)"
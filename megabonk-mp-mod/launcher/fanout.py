@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Host fan-out simulator for MegabonkMP.
+Models the host's send path (NetworkManager.Send -> Server.Broadcast) for its
+own PlayerPosition and every EnemyPosition, and compares the current
+send-everything-to-everyone behaviour with interest management and batching:
+
+    broadcast     every moved enemy to every client, one datagram each (current)
+    grid          only enemies in grid cells within view distance of each client
+    distance      per-client update rate that falls off with distance
+    batched       the updates for one client in one tick packed into MTU-sized datagrams
+    combined      grid + distance + batched
+
+Enemy hordes are generated around the players with vectorized trajectories, so
+thousands of enemies simulate in a few seconds.
+
+Usage:
+    python fanout.py --players 4 --enemies 2000 --seconds 20
+    python fanout.py --enemies 5000 --spread 40 --json fanout.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not available. Install it with: pip install numpy")
+    sys.exit(1)
+
+import wire
+import packetlab
+
+PLAYER_RATE = 60  # PlayerSync._positionSendRate
+ENEMY_RATE = 30  # EnemySync.PositionSendRate
+MOVE_THRESHOLD = 0.1  # EnemySync skips enemies that moved less than this since the last send
+
+# Wrapped datagram sizes as sent today: header + type byte + payload
+PLAYER_PACKET = wire.HEADER_SIZE + 1 + wire.PLAYER_POSITION.size
+ENEMY_PACKET = wire.HEADER_SIZE + 1 + wire.ENEMY_POSITION.size
+UDP_IP_OVERHEAD = 28  # IPv4 + UDP headers per datagram
+
+# (max distance, Hz) tiers for distance-based rates; the last tier covers everything further
+DEFAULT_TIERS = ((25.0, 30), (50.0, 15), (100.0, 6), (float("inf"), 2))
+
+Strategy = namedtuple("Strategy", "name grid tiers batch")
+
+STRATEGIES = (
+    Strategy("broadcast (current)", False, None, False),
+    Strategy("broadcast, batched", False, None, True),
+    Strategy("grid", True, None, False),
+    Strategy("distance rates", False, DEFAULT_TIERS, False),
+    Strategy("grid + distance + batched", True, DEFAULT_TIERS, True),
+)
+
+
+def horde(players_pos, enemies=2000, radius=80.0, seed=3):
+    """Enemy positions per enemy tick as a generator of (enemies, 3) arrays.
+
+    Each enemy circles a target player at a wobbling distance, so the horde
+    follows the players the way Megabonk's enemies do. players_pos has shape
+    (players, ticks, 3) at ENEMY_RATE.
+    """
+    rng = np.random.default_rng(seed)
+    target = rng.integers(0, players_pos.shape[0], size=enemies)
+    # Uniform over a disc between 4 units and radius
+    distance = np.sqrt(rng.uniform((4.0 / radius) ** 2, 1.0, size=enemies)) * radius
+    angle = rng.uniform(0, 2 * np.pi, size=enemies)
+    orbit = rng.uniform(-0.6, 0.6, size=enemies)  # rad/s
+    wobble_hz = rng.uniform(0.05, 0.4, size=enemies)
+    wobble_phase = rng.uniform(0, 2 * np.pi, size=enemies)
+    for tick in range(players_pos.shape[1]):
+        t = tick / ENEMY_RATE
+        theta = angle + orbit * t + 0.3 * np.sin(2 * np.pi * wobble_hz * t + wobble_phase)
+        r = distance * (1.0 + 0.15 * np.sin(2 * np.pi * wobble_hz * t * 0.7 + wobble_phase))
+        pos = players_pos[target, tick].astype(np.float64)
+        pos[:, 0] += r * np.cos(theta)
+        pos[:, 2] += r * np.sin(theta)
+        yield pos
+
+
+def _batched(counts, entry_bytes, mtu=wire.MTU):
+    """(bytes, datagrams) when each count of entries goes out as back-to-back records behind one header"""
+    per_datagram = (mtu - wire.HEADER_SIZE) // entry_bytes
+    datagrams = -(-counts // per_datagram)
+    return counts * entry_bytes + datagrams * wire.HEADER_SIZE, datagrams
+
+
+class _Tally:
+    """Per-strategy counters and the position error clients see"""
+
+    def __init__(self, strategy, clients, enemies):
+        self.strategy = strategy
+        self.bytes = np.zeros(clients, dtype=np.int64)
+        self.packets = np.zeros(clients, dtype=np.int64)
+        self.enemy_updates = 0
+        self.sent = None  # (clients, enemies, 3) last position each client received
+        self.errors = []
+
+
+def simulate(players=4, enemies=2000, seconds=20.0, spread=150.0, radius=80.0, cell=32.0, view=60.0,
+             strategies=STRATEGIES, seed=1):
+    """Run every strategy over the same trajectories; returns a report dict.
+
+    Player 0 is the host. Bytes and packets are what the host uploads to the
+    players - 1 clients; error is how far a client's last received position of
+    an enemy within `view` units lags behind the real one (p95 and max).
+    """
+    clients = players - 1
+    if clients < 1:
+        raise ValueError("Need at least 2 players for the host to send anything")
+    started = time.perf_counter()
+    stream = packetlab.synthetic_players(players, seconds, PLAYER_RATE, seed=seed, spread=spread)
+    players_pos = stream.pos.reshape(players, -1, 3)
+    enemy_players = players_pos[:, ::PLAYER_RATE // ENEMY_RATE]
+    tallies = [_Tally(strategy, clients, enemies) for strategy in strategies]
+
+    index = np.arange(enemies)
+    reach = int(np.ceil(view / cell))  # grid cells needed to cover the view distance
+    for tick, enemy_pos in enumerate(horde(enemy_players, enemies, radius, seed + 2)):
+        client_pos = enemy_players[1:, tick]
+        offset = enemy_pos[None, :, [0, 2]] - client_pos[:, None, [0, 2]]
+        distance = np.hypot(offset[..., 0], offset[..., 1])  # (clients, enemies)
+        visible = distance < view
+        cells = np.floor(enemy_pos[:, [0, 2]] / cell).astype(np.int64)
+        client_cells = np.floor(client_pos[:, [0, 2]] / cell).astype(np.int64)
+        near = np.abs(cells[None] - client_cells[:, None]).max(axis=-1) <= reach
+
+        for tally in tallies:
+            strategy = tally.strategy
+            if tally.sent is None:
+                tally.sent = np.repeat(enemy_pos[None], clients, axis=0)
+            moved = np.linalg.norm(enemy_pos[None] - tally.sent, axis=-1) >= MOVE_THRESHOLD
+            send = moved
+            if strategy.grid:
+                send = send & near
+            if strategy.tiers:
+                bounds = np.array([bound for bound, _ in strategy.tiers])
+                divisors = np.array([ENEMY_RATE // hz for _, hz in strategy.tiers])
+                divisor = divisors[np.minimum(np.searchsorted(bounds, distance), len(bounds) - 1)]
+                # Stagger by enemy so a tier's updates spread evenly over its ticks
+                send = send & ((tick + index[None]) % divisor == 0)
+            tally.sent[send] = np.broadcast_to(enemy_pos[None], tally.sent.shape)[send]
+            counts = send.sum(axis=1)
+            tally.enemy_updates += int(counts.sum())
+
+            # The host's own PlayerPosition goes out at twice the enemy rate
+            if strategy.batch:
+                entry = wire.ENEMY_POSITION.size + 1
+                player_entry = wire.PLAYER_POSITION.size + 1
+                sent_bytes, datagrams = _batched(counts, entry)
+                # One position rides along in this tick's enemy batch, the other goes alone
+                with_batch = counts > 0
+                sent_bytes = sent_bytes + player_entry * with_batch + PLAYER_PACKET * (2 - with_batch)
+                datagrams = datagrams + (2 - with_batch)
+            else:
+                sent_bytes = counts * ENEMY_PACKET + 2 * PLAYER_PACKET
+                datagrams = counts + 2
+            tally.bytes += sent_bytes
+            tally.packets += datagrams
+
+            if tick % 10 == 0:
+                lag = np.linalg.norm(enemy_pos[None] - tally.sent, axis=-1)[visible]
+                tally.errors.append(lag)
+
+    duration = enemy_players.shape[1] / ENEMY_RATE
+    results = []
+    baseline = None
+    for tally in tallies:
+        total = int(tally.bytes.sum())
+        packets = int(tally.packets.sum())
+        baseline = baseline or total
+        errors = np.concatenate(tally.errors) if tally.errors else np.zeros(0)
+        results.append({
+            "strategy": tally.strategy.name,
+            "host_bytes_per_second": total / duration,
+            "host_packets_per_second": packets / duration,
+            "host_wire_bytes_per_second": (total + packets * UDP_IP_OVERHEAD) / duration,
+            "max_client_bytes_per_second": int(tally.bytes.max()) / duration,
+            "enemy_updates_per_second": tally.enemy_updates / duration,
+            "savings": 1.0 - total / baseline,
+            "visible_error_p95": float(np.percentile(errors, 95)) if len(errors) else 0.0,
+            "visible_error_max": float(errors.max()) if len(errors) else 0.0,
+        })
+    return {
+        "players": players, "enemies": enemies, "seconds": duration, "spread": spread, "radius": radius,
+        "cell": cell, "view": view, "tiers": [list(tier) for tier in DEFAULT_TIERS],
+        "simulated_in_s": round(time.perf_counter() - started, 2),
+        "results": results,
+    }
+
+
+def format_report(report):
+    """Render a report as a text table"""
+    header = (f"Host fan-out: {report['players']} players ({report['players'] - 1} clients), "
+              f"{report['enemies']} enemies, {report['seconds']:.0f}s "
+              f"(simulated in {report['simulated_in_s']:.1f}s)")
+    lines = [header, "-" * len(header),
+             f"{'strategy':<28} {'KB/s':>9} {'pkt/s':>9} {'wire KB/s':>10} {'client KB/s':>12} "
+             f"{'saved':>6} {'err p95/max':>13}"]
+    for r in report["results"]:
+        lines.append(f"{r['strategy']:<28} {r['host_bytes_per_second'] / 1024:>9.1f} "
+                     f"{r['host_packets_per_second']:>9.0f} {r['host_wire_bytes_per_second'] / 1024:>10.1f} "
+                     f"{r['max_client_bytes_per_second'] / 1024:>12.1f} {r['savings']:>6.0%} "
+                     f"{r['visible_error_p95']:>6.2f}/{r['visible_error_max']:<6.2f}")
+    lines.append("")
+    lines.append(f"wire KB/s adds {UDP_IP_OVERHEAD} bytes of UDP/IPv4 header per datagram; "
+                 f"client KB/s is the busiest client's download")
+    lines.append(f"err: how far (units) the last received position of enemies within {report['view']:.0f} "
+                 f"units of a client lags behind")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare host upload for broadcast, interest management "
+                                                 "and batching strategies")
+    parser.add_argument("--players", type=int, default=4, help="Players including the host")
+    parser.add_argument("--enemies", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--spread", type=float, default=150.0,
+                        help="How far apart players start (small values keep the group together)")
+    parser.add_argument("--radius", type=float, default=80.0, help="Horde radius around each player")
+    parser.add_argument("--cell", type=float, default=32.0, help="Grid cell size for the grid strategies")
+    parser.add_argument("--view", type=float, default=60.0, help="Distance at which staleness is measured")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        report = simulate(args.players, args.enemies, args.seconds, args.spread, args.radius, args.cell,
+                          args.view, seed=args.seed)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    print(format_report(report))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Game update detection for the Megabonk MP Launcher.
+Fingerprints the files the IL2CPP interop assemblies are generated from
+(GameAssembly.dll, global-metadata.dat and the Unity player). Large files are
+hashed in parallel chunks through mmap, and digests are cached by size and
+mtime so unchanged files are never read again.
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+STATE_FILE = "game_fingerprint.json"
+CHUNK_SIZE = 8 << 20
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Files whose change means BepInEx must regenerate BepInEx/interop
+GAME_FILES = {
+    "GameAssembly.dll": "GameAssembly.dll",
+    "global-metadata.dat": os.path.join("Megabonk_Data", "il2cpp_data", "Metadata", "global-metadata.dat"),
+    "UnityPlayer.dll": "UnityPlayer.dll",
+}
+
+
+def _hash_chunk(view, start, size):
+    # hashlib releases the GIL for large buffers, so chunks hash in parallel
+    return hashlib.sha256(view[start:start + size]).digest()
+
+
+def hash_file(path, executor=None, chunk_size=CHUNK_SIZE):
+    """SHA-256 over the SHA-256 digests of each chunk_size chunk (not a plain file SHA-256)"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.sha256(size.to_bytes(8, "little"))
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            try:
+                starts = range(0, size, chunk_size)
+                if executor and len(starts) > 1:
+                    chunks = executor.map(lambda start: _hash_chunk(view, start, chunk_size), starts)
+                else:
+                    chunks = (_hash_chunk(view, start, chunk_size) for start in starts)
+                for chunk in chunks:
+                    digest.update(chunk)
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def _newest_interop(game_path):
+    """mtime of the most recently generated interop assembly, or None"""
+    newest = None
+    try:
+        with os.scandir(os.path.join(game_path, "BepInEx", "interop")) as entries:
+            for entry in entries:
+                if entry.name.endswith(".dll"):
+                    mtime = entry.stat().st_mtime_ns
+                    newest = mtime if newest is None or mtime > newest else newest
+    except OSError:
+        pass
+    return newest
+
+
+class GameFingerprints:
+    """Per game folder: cached file digests, the combined fingerprint and whether interop needs regenerating"""
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.state = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def fingerprint(self, game_path):
+        """Last computed fingerprint of a game folder, without touching the disk"""
+        return self.state.get(os.path.abspath(game_path), {}).get("fingerprint")
+
+    def check(self, game_path):
+        """Fingerprint the game, rehashing only files whose size or mtime changed.
+
+        Returns the game's state: fingerprint, files, needs_regen, changed_at, plus
+        changed=True when this call is the one that noticed an update and
+        changed_files, the names whose hash differs from the previous check.
+        """
+        with self._lock:
+            return self._check(os.path.abspath(game_path))
+
+    def _check(self, game_path):
+        game = self.state.setdefault(game_path, {"fingerprint": None, "files": {}, "needs_regen": False,
+                                                 "changed_at": None, "interop_at_change": None})
+        dirty = False
+        files = {}
+        stale = []
+        for name, relative_path in GAME_FILES.items():
+            try:
+                stat = os.stat(os.path.join(game_path, relative_path))
+            except OSError:
+                continue
+            cached = game["files"].get(name)
+            if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns:
+                files[name] = cached
+            else:
+                files[name] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": None}
+                stale.append(name)
+
+        if stale:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(MAX_WORKERS) as executor:
+                for name in stale:
+                    files[name]["sha256"] = hash_file(os.path.join(game_path, GAME_FILES[name]), executor)
+            game["hash_ms"] = int((time.perf_counter() - started) * 1000)
+        previous = game["files"]
+        changed_files = sorted(name for name in files.keys() | previous.keys()
+                               if files.get(name, {}).get("sha256") != previous.get(name, {}).get("sha256"))
+        if files != game["files"]:
+            game["files"] = files
+            dirty = True
+
+        combined = hashlib.sha256()
+        for name in sorted(files):
+            combined.update(f"{name}:{files[name]['sha256']}\n".encode("utf-8"))
+        fingerprint = combined.hexdigest()[:16] if files else None
+
+        changed = False
+        if fingerprint != game["fingerprint"]:
+            # The first fingerprint of a folder is a baseline, not an update
+            if game["fingerprint"] is not None and fingerprint is not None:
+                changed = True
+                game["needs_regen"] = True
+                game["changed_at"] = time.time()
+                game["interop_at_change"] = _newest_interop(game_path)
+            game["fingerprint"] = fingerprint
+            dirty = True
+        elif game["needs_regen"]:
+            # BepInEx rewrites BepInEx/interop on the first launch after the update
+            newest = _newest_interop(game_path)
+            if newest is not None and (game["interop_at_change"] is None or newest > game["interop_at_change"]):
+                game["needs_regen"] = False
+                dirty = True
+
+        if dirty:
+            self._save()
+        return dict(game, changed=changed, changed_files=changed_files, files=dict(files))
@@ -0,0 +1,468 @@
+"""
+Per-job profiling for the Megabonk MP Launcher's background work.
+A JobProfile runs cProfile (and optionally tracemalloc) around one worker job
+and records timing spans for the steps inside it (download, extract members,
+copy DLL, write cfg, ...). Steps mark themselves with span(), which costs one
+thread-local lookup when no profile is active on the calling thread.
+
+Everything a job collected exports to one JSON file that is both a Chrome
+trace (load it in chrome://tracing or https://ui.perfetto.dev) and a report:
+its "megabonkmp" key holds, per job, the span totals, the hottest functions,
+the largest allocations and collapsed stacks for flamegraph.pl or
+speedscope. Attach that one file to a bug report.
+
+    python jobprofile.py summary job_profile.json
+    python jobprofile.py stacks job_profile.json > jobs.folded
+
+Before Python 3.12 cProfile attributes time per thread, so jobs running at the
+same time do not pollute each other's stacks. From 3.12 it runs on
+sys.monitoring for the whole process: one job is profiled at a time and its
+functions include whatever the Tk thread and other workers called meanwhile.
+tracemalloc is process-wide as well, so a job's memory peak is only reported
+when no other job traced memory alongside it.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import functools
+import itertools
+from collections import deque
+from datetime import datetime
+
+REPORT_FILE = "job_profile.json"
+
+KEEP_JOBS = 20
+MAX_EVENTS = 50000  # spans kept per job; per-member extract spans add up
+STACK_DEPTH = 64
+MIN_STACK_US = 50  # stacks cheaper than this are left out of the collapsed output
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+
+PROCESS_WIDE_NOTE = ("Python 3.12+ profiles the whole process: functions include calls from the UI thread "
+                     "and other jobs running at the same time")
+
+_local = threading.local()
+_origin = time.perf_counter()
+_origin_wall = time.time()
+_ids = itertools.count(1)
+_memory_lock = threading.Lock()
+_memory_jobs = set()  # JobProfiles tracing memory right now
+
+
+def _now_us():
+    return (time.perf_counter() - _origin) * 1e6
+
+
+def describe(func):
+    """Readable job name: the qualified name without <locals>"""
+    func = getattr(func, "func", func)  # functools.partial
+    name = getattr(func, "__qualname__", None) or type(func).__qualname__
+    return name.replace(".<locals>", "")
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profile, name, args):
+        self.profile = profile
+        self.name = name
+        self.args = args
+
+    def set(self, **args):
+        """Attach values learned inside the span (bytes read, member count, ...)"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.started = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.profile._add_span(self.name, self.started, _now_us() - self.started, self.args)
+        return False
+
+
+def span(name, **args):
+    """Context manager timing one step of the job profiled on this thread, if any"""
+    profile = getattr(_local, "profile", None)
+    return _NULL_SPAN if profile is None else _Span(profile, name, args)
+
+
+def active():
+    """The JobProfile running on this thread, or None"""
+    return getattr(_local, "profile", None)
+
+
+def _start_tracemalloc(profile):
+    """Trace memory for profile; its peak only counts while no other job traces alongside it"""
+    import tracemalloc
+    with _memory_lock:
+        if _memory_jobs:
+            for other in _memory_jobs | {profile}:
+                other.peak_known = False
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start(STACK_DEPTH // 4)
+        elif hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        else:
+            profile.peak_known = False  # traced since before the job started
+        _memory_jobs.add(profile)
+
+
+def _traced_peak(profile):
+    """Peak traced memory since profile started, or None if it overlapped another job"""
+    import tracemalloc
+    with _memory_lock:
+        return tracemalloc.get_traced_memory()[1] if profile.peak_known else None
+
+
+def _stop_tracemalloc(profile):
+    import tracemalloc
+    with _memory_lock:
+        _memory_jobs.discard(profile)
+        if not _memory_jobs:
+            tracemalloc.stop()
+
+
+def _label(key):
+    """flamegraph-safe name for a pstats (file, line, function) key"""
+    filename, line, function = key
+    if filename == "~":
+        label = function  # built-in, e.g. <built-in method zlib.decompress>
+    else:
+        label = f"{function} ({os.path.basename(filename)}:{line})"
+    return label.replace(";", ",")
+
+
+def _is_profiler_call(key):
+    """Frames of the profiler itself: Profiler.disable() and the JobProfile hooks around the job"""
+    return (key[0] == "~" and "_lsprof.Profiler" in key[2]) or key[0] == __file__
+
+
+def collapsed_stacks(stats, prefix):
+    """{"a;b;c": microseconds} from a pstats stats dict.
+
+    cProfile keeps caller/callee edges, not full stacks, so time is split down
+    the call graph in proportion to each edge's cumulative time. Exact for
+    functions with one caller, an estimate for shared helpers.
+    """
+    children = {}
+    for callee, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+    stacks = {}
+
+    def walk(key, budget, path, labels):
+        _, _, self_time, cumulative, _ = stats[key]
+        share = budget / cumulative if cumulative > 0 else 0.0
+        own = self_time * share
+        descend = len(path) < STACK_DEPTH
+        for callee, edge_time in children.get(key, ()) if descend else ():
+            if callee in path or _is_profiler_call(callee) or edge_time * share * 1e6 < MIN_STACK_US:
+                continue
+            walk(callee, edge_time * share, path | {callee}, labels + [_label(callee)])
+        if not descend:
+            own = budget  # the truncated subtree is charged to the deepest frame kept
+        micros = int(own * 1e6)
+        if micros >= MIN_STACK_US:
+            stack = ";".join(labels)
+            stacks[stack] = stacks.get(stack, 0) + micros
+
+    for key, (_, _, _, cumulative, callers) in stats.items():
+        if not callers and not _is_profiler_call(key):
+            walk(key, cumulative, {key}, [prefix, _label(key)])
+    return stacks
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """The functions with the most self time and the most cumulative time"""
+    def row(key):
+        calls, _, self_time, cumulative, _ = stats[key]
+        return {"function": _label(key), "calls": calls, "self_ms": round(self_time * 1000, 2),
+                "cumulative_ms": round(cumulative * 1000, 2)}
+
+    # Leaves out the profiler and what only the profiler called (its clock reads)
+    keys = [key for key, (_, _, _, _, callers) in stats.items() if not _is_profiler_call(key)
+            and not (callers and all(_is_profiler_call(caller) for caller in callers))]
+    return {
+        "by_self_time": [row(key) for key in sorted(keys, key=lambda k: -stats[k][2])[:limit]],
+        "by_cumulative_time": [row(key) for key in sorted(keys, key=lambda k: -stats[k][3])[:limit]],
+    }
+
+
+class JobProfile:
+    """cProfile, optional tracemalloc and step spans for one job on the current thread"""
+
+    def __init__(self, name, cpu=True, memory=False):
+        self.id = next(_ids)
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.events = []
+        self.dropped = 0
+        self.spans = {}
+        self.error = None
+        self.cpu_note = None
+        self.functions = None
+        self.stacks = {}
+        self.memory_report = None
+        self.peak_known = True
+        self.thread = None
+        self.started = self.duration = None
+        self._profiler = None
+        self._snapshot = None
+
+    def _add_span(self, name, started, duration, args):
+        entry = self.spans.get(name)
+        if entry is None:
+            entry = self.spans[name] = {"calls": 0, "total_us": 0.0, "max_us": 0.0}
+        entry["calls"] += 1
+        entry["total_us"] += duration
+        entry["max_us"] = max(entry["max_us"], duration)
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        event = {"name": name, "ph": "X", "ts": round(started, 1), "dur": round(duration, 1),
+                 "pid": os.getpid(), "tid": self.id}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def __enter__(self):
+        self.thread = threading.current_thread().name
+        _local.profile = self
+        if self.memory:
+            import tracemalloc
+            _start_tracemalloc(self)
+            try:
+                self._snapshot = tracemalloc.take_snapshot()
+            except BaseException:
+                _stop_tracemalloc(self)
+                _local.profile = None
+                raise
+        if self.cpu:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError as e:  # Python 3.12+ allows one cProfile per process
+                self._profiler = None
+                self.cpu_note = f"cProfile unavailable: {e}"
+            else:
+                if sys.version_info >= (3, 12):
+                    self.cpu_note = PROCESS_WIDE_NOTE
+        self.started = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = _now_us() - self.started
+        if self._profiler is not None:
+            self._profiler.disable()
+        _local.profile = None
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self.memory:
+            self._finish_memory()
+        if self._profiler is not None:
+            import pstats
+            stats = pstats.Stats(self._profiler).stats
+            self.functions = top_functions(stats)
+            self.stacks = collapsed_stacks(stats, f"{self.name} #{self.id}")
+            self._profiler = None
+        return False
+
+    def _finish_memory(self):
+        import tracemalloc
+        try:
+            peak = _traced_peak(self)
+            snapshot = tracemalloc.take_snapshot()
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            growth = snapshot.filter_traces(ignore).compare_to(self._snapshot.filter_traces(ignore), "lineno")
+            self.memory_report = {
+                "peak_kb": None if peak is None else round(peak / 1024, 1),
+                "top_allocations": [{"where": f"{os.path.basename(stat.traceback[0].filename)}:"
+                                              f"{stat.traceback[0].lineno}",
+                                     "size_kb": round(stat.size_diff / 1024, 1), "count": stat.count_diff}
+                                    for stat in growth if stat.size_diff > 0][:TOP_ALLOCATIONS],
+            }
+        finally:
+            self._snapshot = None
+            _stop_tracemalloc(self)
+
+    def trace_events(self):
+        """Chrome trace events: a named track for the job, the job itself and its spans"""
+        job = {"name": self.name, "ph": "X", "ts": round(self.started, 1), "dur": round(self.duration, 1),
+               "pid": os.getpid(), "tid": self.id, "args": {"thread": self.thread}}
+        if self.error:
+            job["args"]["error"] = self.error
+        return [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self.id,
+                 "args": {"name": f"{self.name} #{self.id}"}}, job] + self.events
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "thread": self.thread,
+            "started": datetime.fromtimestamp(_origin_wall + self.started / 1e6).isoformat(timespec="milliseconds"),
+            "duration_ms": round(self.duration / 1000, 1),
+            "error": self.error,
+            "spans": {name: {"calls": entry["calls"], "total_ms": round(entry["total_us"] / 1000, 1),
+                             "max_ms": round(entry["max_us"] / 1000, 1)}
+                      for name, entry in sorted(self.spans.items(), key=lambda item: -item[1]["total_us"])},
+            "dropped_spans": self.dropped,
+            "cpu": self.functions,
+            "cpu_note": self.cpu_note,
+            "memory": self.memory_report,
+            "collapsed": "\n".join(f"{stack} {micros}" for stack, micros in sorted(self.stacks.items())),
+        }
+
+
+class JobProfiler:
+    """Profiles every job it wraps and keeps the most recent ones for export"""
+
+    def __init__(self, cpu=True, memory=False, keep=KEEP_JOBS):
+        self.cpu = cpu
+        self.memory = memory
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.profiles = deque(maxlen=keep)
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.profiles.clear()
+
+    def run(self, name, target, *args, **kwargs):
+        """Call target under a JobProfile; a job started inside another becomes a span of it"""
+        if active() is not None:
+            with span(name):
+                return target(*args, **kwargs)
+        profile = JobProfile(name, self.cpu, self.memory)
+        try:
+            with profile:
+                return target(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.profiles.append(profile)
+
+    def wrap_job(self, target, name=None):
+        """Wrap a worker-thread target so each run is profiled"""
+        name = name or describe(target)
+
+        @functools.wraps(target)
+        def job(*args, **kwargs):
+            return self.run(name, target, *args, **kwargs)
+        return job
+
+    def to_dict(self):
+        """Chrome trace JSON with the per-job reports under "megabonkmp" """
+        with self._lock:
+            profiles = list(self.profiles)
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+                   "args": {"name": "Megabonk MP Launcher"}}]
+        for profile in profiles:
+            events += profile.trace_events()
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"python": platform.python_version(),
+                          "platform": f"{platform.system()} {platform.release()}",
+                          "origin": datetime.fromtimestamp(_origin_wall).isoformat(timespec="milliseconds")},
+            "megabonkmp": {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "cpu_profiling": self.cpu,
+                "memory_tracing": self.memory,
+                "jobs": [profile.to_dict() for profile in profiles],
+            },
+        }
+
+    def dump(self, path):
+        """Write to_dict() as JSON, atomically"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+
+def hot_spot(job):
+    """One line naming where a job spent its time"""
+    parts = []
+    if job["spans"]:
+        name, entry = next(iter(job["spans"].items()))
+        parts.append(f"step '{name}' {entry['total_ms']:.0f} ms"
+                     + (f" over {entry['calls']} calls" if entry["calls"] > 1 else ""))
+    if isinstance(job["cpu"], dict) and job["cpu"]["by_self_time"]:
+        top = job["cpu"]["by_self_time"][0]
+        parts.append(f"{top['function']} {top['self_ms']:.0f} ms self")
+    if job["memory"] and job["memory"]["top_allocations"] and job["memory"]["top_allocations"][0]["size_kb"] >= 1:
+        top = job["memory"]["top_allocations"][0]
+        parts.append(f"{top['size_kb']:.0f} KB at {top['where']}")
+    return "; ".join(parts) or "no spans recorded"
+
+
+def format_report(report, top=5):
+    """Text report for the diagnostics panel"""
+    data = report["megabonkmp"]
+    modes = ["cProfile" if data["cpu_profiling"] else None, "tracemalloc" if data["memory_tracing"] else None]
+    lines = [f"Job profiling ({', '.join(mode for mode in modes if mode) or 'spans only'}): "
+             f"{len(data['jobs'])} job(s) since {data['started']}"]
+    for job in reversed(data["jobs"]):
+        status = f"  FAILED {job['error']}" if job["error"] else ""
+        lines += ["", f"#{job['id']} {job['name']}  {job['duration_ms']:.0f} ms{status}",
+                  f"  Hot spot: {hot_spot(job)}"]
+        for name, entry in list(job["spans"].items())[:top]:
+            lines.append(f"  {entry['calls']:>6} x  total {entry['total_ms']:>9.1f} ms  "
+                         f"max {entry['max_ms']:>8.1f} ms  {name}")
+        if job["cpu_note"]:
+            lines.append(f"  {job['cpu_note']}")
+        if job["memory"] and job["memory"]["peak_kb"] is not None:
+            lines.append(f"  Memory peak {job['memory']['peak_kb']:.0f} KB")
+        elif job["memory"]:
+            lines.append("  Memory peak not measured (another job traced memory at the same time)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read a launcher job profile")
+    parser.add_argument("view", choices=["summary", "stacks"],
+                        help="summary: hot spots per job; stacks: collapsed stacks for flamegraph.pl")
+    parser.add_argument("profile", help="job_profile.json exported from the Diagnostics tab")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.profile, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        jobs = report["megabonkmp"]["jobs"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 1
+    if args.view == "summary":
+        print(format_report(report))
+    else:
+        for job in jobs:
+            if job["collapsed"]:
+                print(job["collapsed"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
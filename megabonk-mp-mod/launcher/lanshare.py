@@ -0,0 +1,258 @@
+"""
+LAN artifact sharing for the Megabonk MP Launcher.
+One launcher publishes its verified downloads and builds over HTTP; other
+launchers on the LAN discover it with a UDP broadcast probe and fetch from it
+with SHA-256 verification, falling back to the upstream download.
+"""
+
+import os
+import json
+import time
+import socket
+import shutil
+import hashlib
+import tempfile
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SERVICE = "megabonkmp-lanshare"
+PROTOCOL_VERSION = 1
+DISCOVERY_PORT = 47779
+PROBE_TIMEOUT = 1.0
+CHUNK_SIZE = 1 << 16
+
+
+class LanShareError(Exception):
+    """Raised when an artifact cannot be fetched or verified from a peer"""
+
+
+def sha256_file(path):
+    """Stream a file through SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Named files offered to peers; hashes are cached per (path, size, mtime)"""
+
+    def __init__(self):
+        self._artifacts = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def publish(self, name, path, **meta):
+        with self._lock:
+            self._artifacts[name] = (path, meta)
+
+    def withdraw(self, name):
+        with self._lock:
+            self._artifacts.pop(name, None)
+
+    def path(self, name):
+        with self._lock:
+            entry = self._artifacts.get(name)
+        return entry[0] if entry and os.path.isfile(entry[0]) else None
+
+    def manifest(self):
+        """Describe every published artifact that currently exists on disk"""
+        with self._lock:
+            artifacts = dict(self._artifacts)
+
+        manifest = {}
+        for name, (path, meta) in artifacts.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            key = (path, stat.st_size, stat.st_mtime_ns)
+            digest = self._hashes.get(key)
+            if digest is None:
+                digest = sha256_file(path)
+                self._hashes[key] = digest
+            manifest[name] = {"sha256": digest, "size": stat.st_size,
+                              "filename": os.path.basename(path), **meta}
+        return manifest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MegabonkMP-LanShare/1"
+
+    def do_GET(self):
+        store = self.server.store
+        if self.path == "/manifest.json":
+            body = json.dumps({"service": SERVICE, "version": PROTOCOL_VERSION,
+                               "host": socket.gethostname(), "artifacts": store.manifest()}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith("/artifact/"):
+            path = store.path(self.path[len("/artifact/"):])
+            if path:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+                return
+
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass  # Keep the launcher log clean
+
+
+class LanShareServer:
+    """HTTP artifact server plus a UDP responder that answers discovery probes"""
+
+    def __init__(self, store, http_port=0, discovery_port=DISCOVERY_PORT, log=None):
+        self.store = store
+        self.http_port = http_port
+        self.discovery_port = discovery_port
+        self.log = log or (lambda message, level="INFO": None)
+        self._httpd = None
+        self._udp = None
+        self._running = False
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("", self.http_port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.store = self.store
+        self.http_port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._udp.bind(("", self.discovery_port))
+        self._udp.settimeout(0.5)
+        self._running = True
+        threading.Thread(target=self._answer_probes, daemon=True).start()
+        self.log(f"LAN sharing on HTTP port {self.http_port}")
+
+    def _answer_probes(self):
+        reply = json.dumps({"service": SERVICE, "version": PROTOCOL_VERSION,
+                            "http_port": self.http_port, "host": socket.gethostname()}).encode("utf-8")
+        while self._running:
+            try:
+                data, addr = self._udp.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                probe = json.loads(data)
+            except ValueError:
+                continue
+            if probe.get("service") == SERVICE and probe.get("probe"):
+                try:
+                    self._udp.sendto(reply, addr)
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._running = False
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._udp:
+            self._udp.close()
+            self._udp = None
+
+
+def discover_peers(timeout=PROBE_TIMEOUT, targets=("255.255.255.255",), discovery_port=DISCOVERY_PORT):
+    """Broadcast a probe and return a list of (address, http_port, host) for responding peers"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    probe = json.dumps({"service": SERVICE, "version": PROTOCOL_VERSION, "probe": True}).encode("utf-8")
+    peers = {}
+    try:
+        for target in targets:
+            try:
+                sock.sendto(probe, (target, discovery_port))
+            except OSError:
+                continue
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, addr = sock.recvfrom(1024)
+            except socket.timeout:
+                break
+            try:
+                reply = json.loads(data)
+            except ValueError:
+                continue
+            if reply.get("service") == SERVICE and reply.get("version") == PROTOCOL_VERSION:
+                peers[(addr[0], reply["http_port"])] = reply.get("host", addr[0])
+    finally:
+        sock.close()
+    return [(address, port, host) for (address, port), host in peers.items()]
+
+
+def peer_manifest(peer, timeout=3.0):
+    """Fetch a peer's artifact manifest"""
+    address, port = peer[0], peer[1]
+    with urllib.request.urlopen(f"http://{address}:{port}/manifest.json", timeout=timeout) as response:
+        return json.load(response).get("artifacts", {})
+
+
+def find_artifact(name, peers=None, **required_meta):
+    """Return (peer, entry) of the first peer offering `name` with matching metadata, or (None, None)"""
+    for peer in (discover_peers() if peers is None else peers):
+        try:
+            entry = peer_manifest(peer).get(name)
+        except (OSError, ValueError):
+            continue
+        if entry and all(entry.get(key) == value for key, value in required_meta.items()):
+            return peer, entry
+    return None, None
+
+
+def fetch_artifact(peer, name, entry, dest_path, progress=None, timeout=10.0, verify=None):
+    """Download an artifact to dest_path, verifying size and SHA-256 before replacing it.
+
+    The manifest entry comes from the same peer, so this only catches damaged
+    transfers; pin the expected sha256 through find_artifact's metadata or pass
+    verify(path), which raises LanShareError to reject the download.
+    """
+    address, port = peer[0], peer[1]
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    digest = hashlib.sha256()
+    received = 0
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".lanshare-", dir=os.path.dirname(os.path.abspath(dest_path)))
+    try:
+        with os.fdopen(fd, "wb") as out, \
+                urllib.request.urlopen(f"http://{address}:{port}/artifact/{name}", timeout=timeout) as response:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                received += len(chunk)
+                if progress:
+                    progress(received, entry["size"])
+
+        if received != entry["size"] or digest.hexdigest() != entry["sha256"]:
+            raise LanShareError(f"{name} from {address} failed verification")
+        if verify:
+            verify(tmp_path)
+        os.replace(tmp_path, dest_path)
+    except (OSError, ValueError) as e:
+        raise LanShareError(f"Could not fetch {name} from {address}: {e}") from e
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dest_path
@@ -6,14 +6,21 @@ A simple GUI launcher for installing BepInEx and configuring the mod.
 
 import os
 import sys
+import re
 import json
 import shutil
 import zipfile
 import logging
+import logging.handlers
+import argparse
+import functools
+import itertools
+import contextlib
 import threading
 import webbrowser
 import urllib.request
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -24,14 +31,34 @@ except ImportError:
     print("Error: tkinter not available. Install python3-tk")
     sys.exit(1)
 
+import bundle
+import buildstats
+import devwatch
+import gamefingerprint
+import jobprofile
+import lanshare
+import logtimeline
+import modconfig
+import pluginscan
+import thunderstore
+import toolchain
+
 # Constants
 APP_NAME = "Megabonk MP Launcher"
 APP_VERSION = "1.2.0"
 CONFIG_FILE = "launcher_config.json"
 LOG_FILE = "launcher.log"
+LOG_TAIL_BYTES = 1 << 20  # How much of LogOutput.log the Logs tab shows
+TIMELINE_VIEW_LINES = 5000  # Most merged lines the Timeline tab renders at once
+TIMELINE_SYNC_PATTERN = r"Session started|Connected with player ID|Client \d+ .* connected"
 
 BEPINEX_URL = "https://github.com/BepInEx/BepInEx/releases/download/v6.0.0-pre.2/BepInEx-Unity.IL2CPP-win-x64-6.0.0-pre.2.zip"
 BEPINEX_VERSION = "6.0.0-pre.2"
+# SHA-256 of the release asset at BEPINEX_URL. Downloads must match it, and cached or
+# LAN-shared archives are only used when they do. While it is empty, nothing is
+# trusted but a fresh download from BEPINEX_URL.
+BEPINEX_SHA256 = ""
+PLUGIN_GUID = "com.megabonk.multiplayer"
 
 # GitHub source repository
 GITHUB_REPO = "inci97/test123"
@@ -50,10 +77,373 @@ DEFAULT_CONFIG = {
     "xp_multiplier": 2.0,
     "show_nameplates": True,
     "show_network_stats": False,
-    "debug_mode": False
+    "debug_mode": False,
+    "build_binlog": False,
+    "lan_share": False,
+    "lan_fetch": False,
+    "ui_monitor": False,
+    "profile_jobs": False,
+    "trace_memory": False,
+    "control_api": False,
+    "control_api_port": 7790
 }
 
 
+def get_app_data_dir():
+    """Get the per-user data directory used for downloads, builds and history"""
+    if sys.platform == "win32":
+        app_data = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        app_data = os.path.expanduser("~/.local/share")
+    return os.path.join(app_data, "MegabonkMP")
+
+
+def get_bepinex_cache_path():
+    """Get where the downloaded BepInEx archive is kept for reuse and sharing"""
+    return os.path.join(get_app_data_dir(), "downloads", os.path.basename(BEPINEX_URL))
+
+
+def get_mod_source_dir():
+    """Get the mod source directory (local checkout in development mode, else app data)"""
+    launcher_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    # Check for local source first (development mode)
+    local_source = os.path.join(launcher_dir, "..", "src")
+    if os.path.exists(os.path.join(local_source, "MegabonkMP.csproj")):
+        return local_source
+    
+    # Use downloaded source in user's app data
+    source_dir = os.path.join(get_app_data_dir(), "src")
+    return source_dir
+
+
+def find_mod_dll(game_path, mod_source):
+    """Find the installed or most recently built MegabonkMP.dll"""
+    dll_paths = [
+        os.path.join(game_path, "BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll"),
+        os.path.join(mod_source, "bin", "Release", "MegabonkMP.dll"),
+        os.path.join(mod_source, "bin", "Release", "net6.0", "MegabonkMP.dll"),
+    ]
+    for dll_path in dll_paths:
+        if os.path.exists(dll_path):
+            return dll_path
+    return None
+
+
+def cached_bepinex_archive():
+    """The cached BepInEx archive if it matches BEPINEX_SHA256; any other archive is deleted"""
+    zip_path = get_bepinex_cache_path()
+    if not BEPINEX_SHA256 or not os.path.exists(zip_path):
+        return None
+    if lanshare.sha256_file(zip_path) != BEPINEX_SHA256:
+        os.remove(zip_path)
+        return None
+    return zip_path
+
+
+def download_bepinex(zip_path):
+    """Download BepInEx from BEPINEX_URL and check it against BEPINEX_SHA256"""
+    download_file(BEPINEX_URL, zip_path)
+    digest = lanshare.sha256_file(zip_path)
+    if BEPINEX_SHA256 and digest != BEPINEX_SHA256:
+        os.remove(zip_path)
+        raise ValueError(f"BepInEx download has SHA-256 {digest}, expected {BEPINEX_SHA256}")
+    return zip_path
+
+
+def read_plugin_version(mod_source):
+    """PluginInfo.PLUGIN_VERSION from the mod source, or None"""
+    try:
+        with open(os.path.join(mod_source, "Core", "Plugin.cs"), "r", encoding="utf-8") as f:
+            match = re.search(r'PLUGIN_VERSION\s*=\s*"([^"]+)"', f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def mod_build_metadata(mod_source):
+    """{"source": fingerprint, "version": plugin version} of the local mod source, or None without one"""
+    fingerprint = buildstats.source_fingerprint(mod_source)
+    version = read_plugin_version(mod_source)
+    if not fingerprint or not version:
+        return None
+    return {"source": fingerprint, "version": version}
+
+
+def check_mod_dll(path, version):
+    """Raise lanshare.LanShareError unless path is a MegabonkMP build declaring the given plugin version"""
+    try:
+        info = pluginscan.read_assembly(path)
+    except pluginscan.MetadataError as e:
+        raise lanshare.LanShareError(str(e)) from e
+    if not info or not any(plugin["guid"] == PLUGIN_GUID and plugin["version"] == version
+                           for plugin in info["plugins"]):
+        raise lanshare.LanShareError(f"Shared MegabonkMP.dll is not a {PLUGIN_GUID} {version} build")
+
+
+def shareable_mod_dll(game_path, mod_source):
+    """(path, metadata) of the installed mod DLL if it is newer than every mod source file, else None"""
+    mod_dll = os.path.join(game_path, "BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll")
+    metadata = mod_build_metadata(mod_source)
+    if not metadata or not os.path.exists(mod_dll):
+        return None
+    sources = devwatch.snapshot(mod_source)
+    if os.stat(mod_dll).st_mtime_ns < max((mtime for _, mtime in sources.values()), default=0):
+        return None
+    return mod_dll, metadata
+
+
+def download_file(url, dest_path):
+    """Download url to dest_path via a .part file so a failed download leaves nothing behind"""
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    with jobprofile.span("download", url=url) as span:
+        urllib.request.urlretrieve(url, dest_path + ".part")
+        span.set(bytes=os.path.getsize(dest_path + ".part"))
+    os.replace(dest_path + ".part", dest_path)
+
+
+def extract_members(zip_ref, dest_dir):
+    """zip_ref.extractall(dest_dir), one profiling span per member"""
+    with jobprofile.span("extract archive", members=len(zip_ref.infolist())):
+        for member in zip_ref.infolist():
+            with jobprofile.span("extract member", member=member.filename, bytes=member.file_size):
+                zip_ref.extract(member, dest_dir)
+
+
+def install_bepinex_archive(zip_path, game_path):
+    """Extract the BepInEx archive into the game folder"""
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            extract_members(zip_ref, game_path)
+    except zipfile.BadZipFile:
+        # Don't keep a broken archive around for the next attempt
+        os.remove(zip_path)
+        raise
+
+
+def extract_source_archive(zip_path, mod_dir):
+    """Unpack a GitHub source archive and move the mod's src folder to mod_dir/src"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        extract_members(zip_ref, mod_dir)
+    
+    # The zip extracts to test123-main/megabonk-mp-mod/src
+    # Move to the right location
+    extracted_root = os.path.join(mod_dir, "test123-main")
+    extracted_dir = os.path.join(extracted_root, MOD_SOURCE_FOLDER, "src")
+    target_dir = os.path.join(mod_dir, "src")
+    
+    # Remove old source if exists
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    
+    if not os.path.exists(extracted_dir):
+        raise Exception("Source folder not found in downloaded archive")
+    with jobprofile.span("move source"):
+        shutil.move(extracted_dir, target_dir)
+    
+    # Cleanup
+    with jobprofile.span("clean up"):
+        os.remove(zip_path)
+        if os.path.exists(extracted_root):
+            shutil.rmtree(extracted_root)
+    return target_dir
+
+
+def dotnet_build(mod_source, sdk_version, history, csproj_path=None, env=None, binlog_path=None,
+                 dotnet="dotnet", game_fingerprint=None):
+    """Run dotnet build with a performance summary and record it in history.
+
+    Returns (result, entry, duration).
+    """
+    args = buildstats.dotnet_build_args(csproj_path, binlog_path=binlog_path, dotnet=dotnet)
+    fingerprint = buildstats.source_fingerprint(mod_source, game_fingerprint)
+    started = time.perf_counter()
+    with jobprofile.span("dotnet build", sdk=sdk_version):
+        result = subprocess.run(args, capture_output=True, text=True, cwd=mod_source, env=env)
+    duration = time.perf_counter() - started
+    
+    with jobprofile.span("parse build output"):
+        summary = buildstats.parse_performance_summary(result.stdout.splitlines())
+    with jobprofile.span("record build history"):
+        entry = history.record(fingerprint, sdk_version, duration, summary, success=result.returncode == 0)
+    return result, entry, duration
+
+
+def read_log_tail(path, max_bytes=LOG_TAIL_BYTES):
+    """Read the last max_bytes of a log file, starting at a line boundary"""
+    with open(path, 'rb') as f, jobprofile.span("read log tail") as span:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - max_bytes))
+        data = f.read()
+        span.set(bytes=len(data))
+    if size > max_bytes:
+        data = data[data.find(b"\n") + 1:]
+    return data.decode('utf-8', errors='ignore')
+
+
+def probe_installation(game_path, mod_source, game_changed_at=None):
+    """Check the game folder for BepInEx and the mod; safe to run off the UI thread.
+
+    A mod built before game_changed_at (the last detected game update) counts as outdated.
+    """
+    status = {"game_found": bool(game_path) and os.path.exists(game_path),
+              "bepinex": False, "mod": False, "mod_latest": False}
+    if not status["game_found"]:
+        return status
+    
+    bepinex_path = os.path.join(game_path, "BepInEx")
+    status["bepinex"] = os.path.exists(os.path.join(bepinex_path, "core", "BepInEx.Core.dll"))
+    
+    # Check if mod DLL is latest built version
+    mod_dll = os.path.join(bepinex_path, "plugins", "MegabonkMP", "MegabonkMP.dll")
+    built_dll = os.path.join(mod_source, "bin", "Release", "MegabonkMP.dll")
+    if os.path.exists(mod_dll):
+        status["mod"] = True
+        try:
+            status["mod_latest"] = os.path.getmtime(mod_dll) >= os.path.getmtime(built_dll)
+            if game_changed_at and os.path.getmtime(built_dll) < game_changed_at:
+                status["mod_latest"] = False
+        except OSError:
+            pass
+    return status
+
+
+def installation_report(game_path):
+    """Installation status and build readiness as JSON-friendly data"""
+    mod_source = get_mod_source_dir()
+    probe = toolchain.ToolchainProbe(os.path.join(get_app_data_dir(), toolchain.CACHE_FILE),
+                                     os.path.join(mod_source, "MegabonkMP.csproj"))
+    fingerprints = gamefingerprint.GameFingerprints(os.path.join(get_app_data_dir(), gamefingerprint.STATE_FILE))
+    game = fingerprints.check(game_path) if game_path and os.path.isdir(game_path) else None
+    tools = probe.probe(game_path, needs_regen=bool(game and game["needs_regen"]))
+    return {
+        "game_path": game_path,
+        "installation": probe_installation(game_path, mod_source, game and game["changed_at"]),
+        "game": game and {"fingerprint": game["fingerprint"], "needs_regen": game["needs_regen"]},
+        "toolchain": tools,
+        "build_problems": [message for _, message in toolchain.build_problems(tools)],
+        "mod_source": mod_source,
+    }
+
+
+def api_operations():
+    """Headless launcher operations for the control API, {name: (function(params, job), description)}.
+
+    Every operation accepts an optional game_path, defaulting to the saved launcher config.
+    """
+    def game_path_of(params):
+        game_path = params.get("game_path") or load_config()["game_path"]
+        if not game_path or not os.path.isdir(game_path):
+            raise ValueError(f"Game folder not found: {game_path!r}")
+        return game_path
+    
+    def status(params, job):
+        return installation_report(params.get("game_path") or load_config()["game_path"])
+    
+    def sync_source(params, job):
+        mod_dir = get_app_data_dir()
+        zip_path = os.path.join(mod_dir, "source_temp.zip")
+        job.log(f"Downloading source from {GITHUB_SOURCE_URL}")
+        download_file(GITHUB_SOURCE_URL, zip_path)
+        job.progress(0.5, "Extracting source")
+        return {"source": extract_source_archive(zip_path, mod_dir)}
+    
+    def install_bepinex(params, job):
+        game_path = game_path_of(params)
+        zip_path = cached_bepinex_archive()
+        if zip_path:
+            job.log(f"Using cached BepInEx archive: {zip_path}")
+        else:
+            job.log(f"Downloading BepInEx from {BEPINEX_URL}")
+            zip_path = download_bepinex(get_bepinex_cache_path())
+        job.progress(0.5, "Extracting BepInEx")
+        install_bepinex_archive(zip_path, game_path)
+        return {"version": BEPINEX_VERSION}
+    
+    def build(params, job):
+        game_path = game_path_of(params)
+        report = installation_report(game_path)
+        if report["build_problems"]:
+            raise RuntimeError(report["build_problems"][0].replace("\n", " "))
+        mod_source = report["mod_source"]
+        sdk_version = report["toolchain"]["dotnet"]["version"]
+        env = os.environ.copy()
+        env["MEGABONK_PATH"] = game_path
+        history = buildstats.BuildHistory(os.path.join(get_app_data_dir(), buildstats.HISTORY_FILE))
+        job.log(f"Building with .NET SDK {sdk_version}")
+        result, entry, duration = dotnet_build(mod_source, sdk_version, history,
+                                               csproj_path=os.path.join(mod_source, "MegabonkMP.csproj"),
+                                               env=env, game_fingerprint=report["game"]["fingerprint"])
+        for line in result.stdout.splitlines():
+            diagnostic = devwatch.parse_diagnostic(line)
+            if diagnostic:
+                job.log(line.strip(), "ERROR" if diagnostic["level"] == "error" else "WARNING")
+        if result.returncode != 0:
+            raise RuntimeError(f"Build failed with exit code {result.returncode}")
+        return {"duration_s": round(duration, 1), "phases": entry["phases"]}
+    
+    def install_mod(params, job):
+        game_path = game_path_of(params)
+        mod_source = get_mod_source_dir()
+        built = [path for path in (os.path.join(mod_source, "bin", "Release", "MegabonkMP.dll"),
+                                   os.path.join(mod_source, "bin", "Release", "net6.0", "MegabonkMP.dll"))
+                 if os.path.exists(path)]
+        if not built:
+            # Builds with MEGABONK_PATH set write straight into the plugins folder
+            if os.path.exists(devwatch.plugin_path(game_path)):
+                return {"status": "already installed"}
+            raise FileNotFoundError("MegabonkMP.dll not found. Build the mod first.")
+        with jobprofile.span("copy DLL"):
+            status = devwatch.deploy(built[0], game_path, os.path.join(get_app_data_dir(), devwatch.PENDING_DIR))
+        job.log(f"MegabonkMP.dll {status}")
+        return {"status": status}
+    
+    def apply_config(params, job):
+        values = modconfig.values_from_launcher(load_config())
+        for name, value in params.get("values", {}).items():
+            section, _, key = name.partition(".")
+            values[(section, key)] = value
+        path = os.path.join(game_path_of(params), "BepInEx", "config", modconfig.CONFIG_FILE)
+        return {"changed": modconfig.update_config(path, values)}
+    
+    def plugins(params, job):
+        scanner = pluginscan.PluginScanner(os.path.join(get_app_data_dir(), pluginscan.CACHE_FILE))
+        found, issues = pluginscan.scan_game(game_path_of(params), scanner)
+        return {"plugins": found, "issues": issues}
+    
+    def launch(params, job):
+        game_path = game_path_of(params)
+        if devwatch.apply_pending(os.path.join(get_app_data_dir(), devwatch.PENDING_DIR), game_path):
+            job.log("Deployed queued MegabonkMP.dll")
+        process = subprocess.Popen([os.path.join(game_path, "Megabonk.exe")], cwd=game_path)
+        return {"pid": process.pid}
+    
+    return {
+        "status": (status, "Installation status and build readiness"),
+        "sync_source": (sync_source, "Download the latest mod source from GitHub"),
+        "install_bepinex": (install_bepinex, f"Install BepInEx {BEPINEX_VERSION} (cached archive if present)"),
+        "build": (build, "Build the mod; fails fast when the SDK or interop assemblies are missing"),
+        "install_mod": (install_mod, "Deploy the built MegabonkMP.dll (queued if the game holds it)"),
+        "apply_config": (apply_config, 'Write launcher settings to the mod cfg; "values" overrides entries '
+                                       'like {"Network.TickRate": 90}'),
+        "plugins": (plugins, "Scan BepInEx/plugins for conflicts"),
+        "launch": (launch, "Start Megabonk.exe without waiting for it"),
+    }
+
+
+def load_config():
+    """Load configuration from file"""
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                # Merge with defaults for any missing keys
+                return {**DEFAULT_CONFIG, **config}
+        except Exception as e:
+            print(f"Failed to load config: {e}")
+    return DEFAULT_CONFIG.copy()
+
+
 class LauncherApp:
     def __init__(self, root):
         self.root = root
@@ -80,34 +470,98 @@ class LauncherApp:
         self.show_nameplates_var = tk.BooleanVar(value=self.config.get("show_nameplates", True))
         self.show_network_stats_var = tk.BooleanVar(value=self.config.get("show_network_stats", False))
         self.debug_mode_var = tk.BooleanVar(value=self.config.get("debug_mode", False))
+        self.build_binlog_var = tk.BooleanVar(value=self.config.get("build_binlog", False))
+        self.lan_share_var = tk.BooleanVar(value=self.config.get("lan_share", False))
+        self.lan_fetch_var = tk.BooleanVar(value=self.config.get("lan_fetch", False))
+        self.ui_monitor_var = tk.BooleanVar(value=self.config.get("ui_monitor", False))
+        self.profile_jobs_var = tk.BooleanVar(value=self.config.get("profile_jobs", False))
+        self.trace_memory_var = tk.BooleanVar(value=self.config.get("trace_memory", False))
+        self.control_api_var = tk.BooleanVar(value=self.config.get("control_api", False))
+        
+        # Opt-in event-loop instrumentation, started before any widget exists
+        self.ui_monitor = None
+        if self.ui_monitor_var.get():
+            self.toggle_ui_monitor(startup=True)
+        self.job_profiler = None
+        if self.profile_jobs_var.get():
+            self.toggle_job_profiler()
+        
+        # Build history
+        self.build_history = buildstats.BuildHistory(
+            os.path.join(get_app_data_dir(), buildstats.HISTORY_FILE))
+        
+        # Build prerequisites, shown from cache until the background probe finishes
+        self.toolchain = toolchain.ToolchainProbe(os.path.join(get_app_data_dir(), toolchain.CACHE_FILE),
+                                                  os.path.join(get_mod_source_dir(), "MegabonkMP.csproj"))
+        
+        # Game binary fingerprints, to notice updates that invalidate interop and builds
+        self.game_fingerprints = gamefingerprint.GameFingerprints(
+            os.path.join(get_app_data_dir(), gamefingerprint.STATE_FILE))
+        
+        # Watch mode and the game process it must not deploy under
+        self.dev_watcher = None
+        self.game_process = None
+        
+        # Plugin conflict scanner (results cached per file)
+        self.plugin_scanner = pluginscan.PluginScanner(os.path.join(get_app_data_dir(), pluginscan.CACHE_FILE))
+        self.plugin_issues = (None, [])  # (game path, issues) of the last plugin scan
+        
+        # LAN sharing
+        self.lan_store = lanshare.ArtifactStore()
+        self.lan_server = None
+        
+        # Local control API for scripts, started on demand
+        self.control_server = None
         
         # Status
         self.status_var = tk.StringVar(value="Ready")
         self.bepinex_installed = tk.BooleanVar(value=False)
         self.mod_installed = tk.BooleanVar(value=False)
         
-        # Build UI
+        # Build UI (only the Launch tab; the rest are built on first selection)
         self.create_ui()
         
-        # Check installation status
-        self.check_installation_status()
+        # Everything else waits until the window has painted
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Open the log file, probe the installation and start LAN sharing"""
+        self.attach_log_handlers()
+        
+        # Publish artifacts to the LAN if enabled; starting the server also checks installation status
+        self.update_lan_sharing()
+        if self.lan_server is None:
+            self.check_installation_status()
+        
+        # Serve the local control API if enabled
+        self.update_control_api()
         
         self.log("Launcher started")
     
     def setup_logging(self):
-        """Setup logging to file and memory buffer"""
+        """Setup memory buffers; the log file is opened after the window appears"""
         self.log_buffer = []
         
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s [%(levelname)s] %(message)s',
-            handlers=[
-                logging.FileHandler(LOG_FILE, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        # Records are held here until attach_log_handlers runs
+        self.log_memory = logging.handlers.MemoryHandler(capacity=10000, flushLevel=logging.CRITICAL + 1)
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.DEBUG)
+        root_logger.addHandler(self.log_memory)
         self.logger = logging.getLogger(__name__)
     
+    def attach_log_handlers(self):
+        """Replace the startup memory buffer with the log file and stdout"""
+        root_logger = logging.getLogger()
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+        handlers = [logging.FileHandler(LOG_FILE, encoding='utf-8'), logging.StreamHandler(sys.stdout)]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            for record in self.log_memory.buffer:
+                handler.handle(record)
+            root_logger.addHandler(handler)
+        root_logger.removeHandler(self.log_memory)
+        self.log_memory.close()
+    
     def log(self, message, level="INFO"):
         """Log message and update log display"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -123,26 +577,41 @@ class LauncherApp:
         
         # Update log display if it exists
         if hasattr(self, 'log_text'):
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.insert(tk.END, log_entry + "\n")
-            self.log_text.see(tk.END)
-            self.log_text.config(state=tk.DISABLED)
+            with self.ui_span("log_text insert"):
+                self.log_text.config(state=tk.NORMAL)
+                self.log_text.insert(tk.END, log_entry + "\n")
+                self.log_text.see(tk.END)
+                self.log_text.config(state=tk.DISABLED)
+    
+    def ui_span(self, name):
+        """Time a block of UI work when the UI monitor is on"""
+        return self.ui_monitor.span(name) if self.ui_monitor else contextlib.nullcontext()
+    
+    def start_job(self, target, *args):
+        """Run target on a daemon worker thread, timed by the UI monitor and job profiler when they are on"""
+        target = self.profiled(target)
+        if self.ui_monitor:
+            target = self.ui_monitor.wrap_job(target)
+        threading.Thread(target=target, args=args, daemon=True).start()
+    
+    def profiled(self, target, name=None):
+        """Wrap target so each run is profiled if job profiling is on at the time it runs"""
+        name = name or jobprofile.describe(target)
+        
+        @functools.wraps(target)
+        def job(*args, **kwargs):
+            if self.job_profiler is None:
+                return target(*args, **kwargs)
+            return self.job_profiler.run(name, target, *args, **kwargs)
+        return job
     
     def load_config(self):
         """Load configuration from file"""
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                    # Merge with defaults for any missing keys
-                    return {**DEFAULT_CONFIG, **config}
-            except Exception as e:
-                print(f"Failed to load config: {e}")
-        return DEFAULT_CONFIG.copy()
+        return load_config()
     
-    def save_config(self):
-        """Save configuration to file"""
-        config = {
+    def current_config(self):
+        """Settings as currently shown in the UI"""
+        return {
             "game_path": self.game_path_var.get(),
             "player_name": self.player_name_var.get(),
             "server_address": self.server_address_var.get(),
@@ -154,8 +623,20 @@ class LauncherApp:
             "xp_multiplier": self.xp_multiplier_var.get(),
             "show_nameplates": self.show_nameplates_var.get(),
             "show_network_stats": self.show_network_stats_var.get(),
-            "debug_mode": self.debug_mode_var.get()
+            "debug_mode": self.debug_mode_var.get(),
+            "build_binlog": self.build_binlog_var.get(),
+            "lan_share": self.lan_share_var.get(),
+            "lan_fetch": self.lan_fetch_var.get(),
+            "ui_monitor": self.ui_monitor_var.get(),
+            "profile_jobs": self.profile_jobs_var.get(),
+            "trace_memory": self.trace_memory_var.get(),
+            "control_api": self.control_api_var.get(),
+            "control_api_port": self.config.get("control_api_port", DEFAULT_CONFIG["control_api_port"])
         }
+    
+    def save_config(self):
+        """Save configuration to file"""
+        config = self.current_config()
         
         try:
             with open(CONFIG_FILE, 'w') as f:
@@ -170,16 +651,31 @@ class LauncherApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Create tabs
-        self.create_main_tab()
-        self.create_settings_tab()
-        self.create_log_tab()
+        # Create empty tabs; each is filled in the first time it is selected
+        self.tab_builders = {}
+        for title, builder in (("  Launch  ", self.create_main_tab),
+                               ("  Server  ", self.create_server_tab),
+                               ("  Settings  ", self.create_settings_tab),
+                               ("  Build  ", self.create_build_tab),
+                               ("  Logs  ", self.create_log_tab),
+                               ("  Timeline  ", self.create_timeline_tab),
+                               ("  Diagnostics  ", self.create_diagnostics_tab)):
+            frame = ttk.Frame(self.notebook, padding=10)
+            self.notebook.add(frame, text=title)
+            self.tab_builders[str(frame)] = builder
+        
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.build_selected_tab())
+        self.build_selected_tab()
     
-    def create_main_tab(self):
+    def build_selected_tab(self):
+        """Build the selected tab's widgets if that has not happened yet"""
+        tab = self.notebook.select()
+        builder = self.tab_builders.pop(tab, None)
+        if builder:
+            builder(self.notebook.nametowidget(tab))
+    
+    def create_main_tab(self, main_frame):
         """Create the main/launch tab"""
-        main_frame = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(main_frame, text="  Launch  ")
-        
         # Game Path Section
         path_frame = ttk.LabelFrame(main_frame, text="Game Installation", padding=10)
         path_frame.pack(fill=tk.X, pady=5)
@@ -199,12 +695,16 @@ class LauncherApp:
         status_frame = ttk.LabelFrame(main_frame, text="Installation Status", padding=10)
         status_frame.pack(fill=tk.X, pady=5)
         
-        self.bepinex_status = ttk.Label(status_frame, text="⬜ BepInEx not installed")
+        self.bepinex_status = ttk.Label(status_frame, text="⬜ Checking BepInEx...")
         self.bepinex_status.pack(anchor=tk.W)
         
-        self.mod_status = ttk.Label(status_frame, text="⬜ Mod not installed")
+        self.mod_status = ttk.Label(status_frame, text="⬜ Checking mod...")
         self.mod_status.pack(anchor=tk.W)
         
+        self.toolchain_status = ttk.Label(status_frame)
+        self.toolchain_status.pack(anchor=tk.W)
+        self.show_toolchain_status(self.toolchain.cached(self.game_path_var.get()))
+        
         # Install Buttons - Row 1
         install_frame = ttk.Frame(status_frame)
         install_frame.pack(fill=tk.X, pady=5)
@@ -232,6 +732,9 @@ class LauncherApp:
         ttk.Button(install_frame2, text="Verify Installation", 
                    command=self.check_installation_status).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(install_frame2, text="Check Plugins", 
+                   command=self.check_plugins).pack(side=tk.LEFT, padx=5)
+        
         # Player Settings
         player_frame = ttk.LabelFrame(main_frame, text="Player", padding=10)
         player_frame.pack(fill=tk.X, pady=5)
@@ -251,11 +754,8 @@ class LauncherApp:
         ttk.Checkbutton(launch_frame, text="Auto-connect on launch", 
                         variable=self.auto_connect_var).pack()
     
-    def create_server_tab(self):
+    def create_server_tab(self, server_frame):
         """Create server/connection settings tab"""
-        server_frame = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(server_frame, text="  Server  ")
-        
         # Connection Settings
         conn_frame = ttk.LabelFrame(server_frame, text="Connection Settings", padding=10)
         conn_frame.pack(fill=tk.X, pady=5)
@@ -319,11 +819,8 @@ class LauncherApp:
         ttk.Button(server_frame, text="Save & Apply Settings", 
                    command=self.apply_server_settings).pack(pady=20)
     
-    def create_settings_tab(self):
+    def create_settings_tab(self, settings_frame):
         """Create general settings tab"""
-        settings_frame = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(settings_frame, text="  Settings  ")
-        
         # UI Settings
         ui_frame = ttk.LabelFrame(settings_frame, text="UI Settings", padding=10)
         ui_frame.pack(fill=tk.X, pady=5)
@@ -339,6 +836,8 @@ class LauncherApp:
         
         ttk.Checkbutton(debug_frame, text="Enable debug mode (verbose logging)", 
                         variable=self.debug_mode_var).pack(anchor=tk.W)
+        ttk.Checkbutton(debug_frame, text="Write MSBuild binary log (.binlog) when building", 
+                        variable=self.build_binlog_var).pack(anchor=tk.W)
         
         # Buttons
         btn_frame = ttk.Frame(debug_frame)
@@ -351,6 +850,31 @@ class LauncherApp:
         ttk.Button(btn_frame, text="Open BepInEx Logs", 
                    command=self.open_bepinex_logs).pack(side=tk.LEFT, padx=5)
         
+        # Offline bundles
+        bundle_frame = ttk.Frame(debug_frame)
+        bundle_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Button(bundle_frame, text="Export Offline Bundle...", 
+                   command=self.export_bundle).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bundle_frame, text="Import Offline Bundle...", 
+                   command=self.import_bundle).pack(side=tk.LEFT, padx=5)
+        
+        # LAN Sharing
+        lan_frame = ttk.LabelFrame(settings_frame, text="LAN Sharing", padding=10)
+        lan_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Checkbutton(lan_frame, text="Share my BepInEx download, mod build and config on the LAN", 
+                        variable=self.lan_share_var, command=self.update_lan_sharing).pack(anchor=tk.W)
+        ttk.Checkbutton(lan_frame, text="Download from LAN launchers when available (trusted networks only)", 
+                        variable=self.lan_fetch_var).pack(anchor=tk.W)
+        
+        # Control API
+        api_frame = ttk.LabelFrame(settings_frame, text="Automation", padding=10)
+        api_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Checkbutton(api_frame, text="Enable local control API for scripts (127.0.0.1 only, token in app data)", 
+                        variable=self.control_api_var, command=self.update_control_api).pack(anchor=tk.W)
+        
         # About
         about_frame = ttk.LabelFrame(settings_frame, text="About", padding=10)
         about_frame.pack(fill=tk.X, pady=5)
@@ -370,11 +894,47 @@ class LauncherApp:
         ttk.Button(settings_frame, text="Save All Settings", 
                    command=self.save_config).pack(pady=20)
     
-    def create_log_tab(self):
-        """Create log viewer tab"""
-        log_frame = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(log_frame, text="  Logs  ")
+    def create_build_tab(self, build_frame):
+        """Create build performance tab"""
+        # Report of the last build
+        self.build_report_text = scrolledtext.ScrolledText(build_frame, height=20, state=tk.DISABLED,
+                                                           font=('Consolas', 9))
+        self.build_report_text.pack(fill=tk.BOTH, expand=True)
+        
+        # Buttons
+        btn_frame = ttk.Frame(build_frame)
+        btn_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Button(btn_frame, text="Open Build Folder", 
+                   command=lambda: webbrowser.open(get_app_data_dir())).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Refresh", command=self.refresh_build_report).pack(side=tk.RIGHT, padx=5)
+        
+        # Watch mode: rebuild and redeploy on every save
+        watch_frame = ttk.LabelFrame(build_frame, text="Watch Mode", padding=10)
+        watch_frame.pack(fill=tk.X, pady=5)
         
+        self.watch_btn = ttk.Button(watch_frame, text="Start Watching", command=self.toggle_watch_mode)
+        self.watch_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.watch_status = ttk.Label(watch_frame, text="Rebuilds and deploys the mod whenever a source file is saved")
+        self.watch_status.pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_build_report()
+    
+    def refresh_build_report(self):
+        """Show the report for the most recent build"""
+        if self.build_history.entries:
+            report = buildstats.format_report(self.build_history.entries[-1], self.build_history)
+        else:
+            report = "No builds recorded yet.\n\nBuild the mod to see where the time goes."
+        
+        self.build_report_text.config(state=tk.NORMAL)
+        self.build_report_text.delete(1.0, tk.END)
+        self.build_report_text.insert(tk.END, report)
+        self.build_report_text.config(state=tk.DISABLED)
+    
+    def create_log_tab(self, log_frame):
+        """Create log viewer tab"""
         # Log text area
         self.log_text = scrolledtext.ScrolledText(log_frame, height=20, state=tk.DISABLED,
                                                    font=('Consolas', 9))
@@ -395,6 +955,273 @@ class LauncherApp:
         ttk.Button(btn_frame, text="Save Log", command=self.save_log).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Refresh", command=self.refresh_log).pack(side=tk.RIGHT, padx=5)
     
+    def create_timeline_tab(self, timeline_frame):
+        """Create the merged host/client log timeline tab"""
+        self.timeline_sources = []
+        
+        sources_frame = ttk.LabelFrame(timeline_frame, text="Logs (one per host/client)", padding=5)
+        sources_frame.pack(fill=tk.X)
+        
+        self.timeline_list = tk.Listbox(sources_frame, height=4, font=('Consolas', 9))
+        self.timeline_list.pack(fill=tk.X)
+        
+        source_btns = ttk.Frame(sources_frame)
+        source_btns.pack(fill=tk.X, pady=2)
+        ttk.Button(source_btns, text="Add Local Logs", command=self.add_local_timeline_logs).pack(side=tk.LEFT, padx=2)
+        ttk.Button(source_btns, text="Add Files...", command=self.add_timeline_files).pack(side=tk.LEFT, padx=2)
+        ttk.Button(source_btns, text="Remove", command=self.remove_timeline_source).pack(side=tk.LEFT, padx=2)
+        
+        self.timeline_offset_var = tk.StringVar(value="0")
+        ttk.Label(source_btns, text="Clock offset (s):").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Entry(source_btns, textvariable=self.timeline_offset_var, width=8).pack(side=tk.LEFT)
+        ttk.Button(source_btns, text="Set", command=self.set_timeline_offset).pack(side=tk.LEFT, padx=2)
+        
+        self.timeline_sync_var = tk.StringVar(value=TIMELINE_SYNC_PATTERN)
+        ttk.Button(source_btns, text="Align", command=self.align_timeline).pack(side=tk.RIGHT, padx=2)
+        ttk.Entry(source_btns, textvariable=self.timeline_sync_var, width=30).pack(side=tk.RIGHT)
+        ttk.Label(source_btns, text="Align on:").pack(side=tk.RIGHT, padx=2)
+        
+        filter_frame = ttk.Frame(timeline_frame)
+        filter_frame.pack(fill=tk.X, pady=5)
+        
+        self.timeline_level_var = tk.StringVar(value="debug")
+        ttk.Label(filter_frame, text="Level:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.timeline_level_var, state="readonly", width=8,
+                     values=["debug", "info", "warning", "error"]).pack(side=tk.LEFT, padx=2)
+        
+        self.timeline_packets_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="Packet/sync messages only", 
+                        variable=self.timeline_packets_var).pack(side=tk.LEFT, padx=10)
+        
+        self.timeline_at_var = tk.StringVar()
+        self.timeline_window_var = tk.DoubleVar(value=5.0)
+        ttk.Button(filter_frame, text="Show", command=self.refresh_timeline).pack(side=tk.RIGHT, padx=2)
+        ttk.Spinbox(filter_frame, textvariable=self.timeline_window_var, from_=0.1, to=3600, 
+                    increment=1, width=6).pack(side=tk.RIGHT)
+        ttk.Label(filter_frame, text="± s").pack(side=tk.RIGHT, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.timeline_at_var, width=14).pack(side=tk.RIGHT)
+        ttk.Label(filter_frame, text="Jump to (HH:MM:SS):").pack(side=tk.RIGHT, padx=2)
+        
+        self.timeline_text = scrolledtext.ScrolledText(timeline_frame, height=16, state=tk.DISABLED,
+                                                       font=('Consolas', 9), wrap=tk.NONE)
+        self.timeline_text.pack(fill=tk.BOTH, expand=True)
+        
+        self.add_local_timeline_logs()
+    
+    def set_timeline_sources(self, paths):
+        """Replace the source list, keeping the offsets of files already listed"""
+        offsets = {source.path: source.offset for source in self.timeline_sources}
+        labels = logtimeline.unique_labels(paths)
+        self.timeline_sources = [logtimeline.LogSource(path, label, offsets.get(path, 0.0))
+                                 for path, label in zip(paths, labels)]
+        self.show_timeline_sources()
+    
+    def show_timeline_sources(self):
+        self.timeline_list.delete(0, tk.END)
+        for source in self.timeline_sources:
+            self.timeline_list.insert(tk.END, f"{source.label:<12} {source.offset:+9.3f}s  {source.path}")
+    
+    def add_local_timeline_logs(self):
+        """Add LogOutput.log of every local game instance"""
+        known = [source.path for source in self.timeline_sources]
+        found = logtimeline.local_instance_logs(self.game_path_var.get())
+        self.set_timeline_sources(known + [path for path in found if path not in known])
+    
+    def add_timeline_files(self):
+        files = filedialog.askopenfilenames(title="Add logs from other players",
+                                            filetypes=[("Log files", "*.log *.log.* *.txt"), ("All files", "*.*")])
+        known = [source.path for source in self.timeline_sources]
+        self.set_timeline_sources(known + [path for path in files if path not in known])
+    
+    def remove_timeline_source(self):
+        selected = set(self.timeline_list.curselection())
+        self.set_timeline_sources([source.path for index, source in enumerate(self.timeline_sources)
+                                   if index not in selected])
+    
+    def set_timeline_offset(self):
+        """Apply the offset entry to the selected logs"""
+        try:
+            offset = float(self.timeline_offset_var.get())
+        except ValueError:
+            self.status_var.set("Clock offset must be a number of seconds")
+            return
+        for index in self.timeline_list.curselection():
+            self.timeline_sources[index].offset = offset
+        self.show_timeline_sources()
+    
+    def align_timeline(self):
+        """Compute clock offsets from the first line matching the align pattern in each log"""
+        sources = list(self.timeline_sources)
+        pattern = self.timeline_sync_var.get()
+        self.status_var.set("Aligning logs...")
+        
+        def work():
+            try:
+                unmatched = logtimeline.sync_offsets(sources, pattern)
+            except (OSError, re.error) as e:
+                message = f"Align failed: {e}"
+                self.root.after(0, lambda: self.status_var.set(message))
+                return
+            message = (f"No match for the align pattern in {', '.join(unmatched)}" if unmatched
+                       else "Logs aligned")
+            self.root.after(0, lambda: (self.show_timeline_sources(), self.status_var.set(message)))
+        
+        self.start_job(work)
+    
+    def refresh_timeline(self):
+        """Merge the logs in the background and show the filtered window"""
+        sources = list(self.timeline_sources)
+        if not sources:
+            self.status_var.set("Add at least one log to the timeline")
+            return
+        level = self.timeline_level_var.get()
+        packets = self.timeline_packets_var.get()
+        at = self.timeline_at_var.get().strip()
+        try:
+            seconds = float(self.timeline_window_var.get())
+        except (tk.TclError, ValueError):
+            seconds = 5.0
+        self.status_var.set("Merging logs...")
+        
+        def work():
+            try:
+                with jobprofile.span("merge logs", files=len(sources)):
+                    if at:
+                        entries = logtimeline.window(sources, logtimeline.resolve_time(at, sources), seconds,
+                                                     level, packets, limit=TIMELINE_VIEW_LINES)
+                    else:
+                        entries = list(itertools.islice(
+                            logtimeline.select(logtimeline.merge(sources), level, packets), TIMELINE_VIEW_LINES))
+            except (OSError, ValueError) as e:
+                message = f"Timeline failed: {e}"
+                self.root.after(0, lambda: self.status_var.set(message))
+                return
+            width = max(len(source.label) for source in sources)
+            with jobprofile.span("format timeline", lines=len(entries)):
+                text = "\n".join(logtimeline.format_entry(entry, width) for entry in entries)
+            self.root.after(0, lambda: self.show_timeline(text, len(entries)))
+        
+        self.start_job(work)
+    
+    def show_timeline(self, text, count):
+        self.timeline_text.config(state=tk.NORMAL)
+        self.timeline_text.delete(1.0, tk.END)
+        self.timeline_text.insert(tk.END, text or "No matching lines")
+        self.timeline_text.config(state=tk.DISABLED)
+        if count >= TIMELINE_VIEW_LINES:
+            self.status_var.set(f"Timeline: first {count} lines; use Jump to for later moments")
+        else:
+            self.status_var.set(f"Timeline: {count} lines")
+    
+    def create_diagnostics_tab(self, diagnostics_frame):
+        """Create UI responsiveness and job profiling diagnostics tab"""
+        ttk.Checkbutton(diagnostics_frame, text="Monitor UI responsiveness (event-loop lag, slow callbacks)", 
+                        variable=self.ui_monitor_var, command=self.toggle_ui_monitor).pack(anchor=tk.W)
+        ttk.Checkbutton(diagnostics_frame, text="Profile background jobs (cProfile and step timings)",
+                        variable=self.profile_jobs_var, command=self.toggle_job_profiler).pack(anchor=tk.W)
+        ttk.Checkbutton(diagnostics_frame, text="Also trace memory allocations (tracemalloc, slower)",
+                        variable=self.trace_memory_var, command=self.toggle_job_profiler).pack(anchor=tk.W)
+        
+        self.diagnostics_text = scrolledtext.ScrolledText(diagnostics_frame, height=20, state=tk.DISABLED,
+                                                          font=('Consolas', 9))
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True, pady=5)
+        
+        # Buttons
+        btn_frame = ttk.Frame(diagnostics_frame)
+        btn_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Button(btn_frame, text="Reset", command=self.reset_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Export JSON...", command=self.export_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Export Job Profile...",
+                   command=self.export_job_profile).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Refresh", command=self.refresh_diagnostics).pack(side=tk.RIGHT, padx=5)
+        
+        self.refresh_diagnostics()
+    
+    def toggle_ui_monitor(self, startup=False):
+        """Install or remove the event-loop instrumentation to match the checkbox.
+
+        Tk keeps the dispatcher each command and binding was created with, so the monitor
+        is only installed at startup; switching it on later takes effect after a restart.
+        """
+        if self.ui_monitor_var.get() and not self.ui_monitor:
+            if not startup:
+                self.save_config()
+                self.log("UI responsiveness monitor will start the next time the launcher starts")
+                messagebox.showinfo("UI Monitor", "Restart the launcher to start monitoring.\n\n"
+                                                  "Only buttons and bindings created after the monitor "
+                                                  "starts can be timed.")
+                return
+            import uiprofile  # Only loaded when monitoring is switched on
+            self.ui_monitor = uiprofile.UiMonitor(self.root)
+            self.ui_monitor.install()
+            self.log("UI responsiveness monitor enabled")
+        elif not self.ui_monitor_var.get() and self.ui_monitor:
+            self.ui_monitor.uninstall()
+            self.ui_monitor = None
+            self.log("UI responsiveness monitor disabled")
+        if hasattr(self, 'diagnostics_text'):
+            self.refresh_diagnostics()
+    
+    def toggle_job_profiler(self):
+        """Start, stop or reconfigure job profiling to match the checkboxes"""
+        if self.profile_jobs_var.get() and not self.job_profiler:
+            self.job_profiler = jobprofile.JobProfiler(memory=self.trace_memory_var.get())
+            self.log("Job profiling enabled" + (" with memory tracing" if self.job_profiler.memory else ""))
+        elif not self.profile_jobs_var.get() and self.job_profiler:
+            self.job_profiler = None
+            self.log("Job profiling disabled")
+        elif self.job_profiler:
+            # Takes effect from the next job
+            self.job_profiler.memory = self.trace_memory_var.get()
+        if hasattr(self, 'diagnostics_text'):
+            self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        """Show the current responsiveness report and job profiles"""
+        if self.ui_monitor:
+            import uiprofile
+            report = uiprofile.format_report(self.ui_monitor.to_dict())
+        else:
+            report = ("UI monitoring is off.\n\nEnable it above, restart the launcher, use it as usual, then "
+                      "come back here to see event-loop stalls and the callbacks that caused them.")
+        if self.job_profiler:
+            report += "\n\n" + jobprofile.format_report(self.job_profiler.to_dict())
+        
+        self.diagnostics_text.config(state=tk.NORMAL)
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, report)
+        self.diagnostics_text.config(state=tk.DISABLED)
+    
+    def reset_diagnostics(self):
+        if self.ui_monitor:
+            self.ui_monitor.reset()
+        if self.job_profiler:
+            self.job_profiler.reset()
+        self.refresh_diagnostics()
+    
+    def export_diagnostics(self):
+        """Save the responsiveness report as JSON"""
+        if not self.ui_monitor:
+            messagebox.showinfo("UI Monitor", "Enable UI monitoring first.")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".json", initialfile="ui_monitor.json",
+                                                filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if filename:
+            self.ui_monitor.dump(filename)
+            self.log(f"UI monitor report saved to {filename}")
+    
+    def export_job_profile(self):
+        """Save the profiled jobs as one Chrome trace with hot-spot reports and collapsed stacks"""
+        if not self.job_profiler:
+            messagebox.showinfo("Job Profiling", "Enable job profiling first, then repeat the slow operation.")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".json", initialfile=jobprofile.REPORT_FILE,
+                                                filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if filename:
+            self.job_profiler.dump(filename)
+            self.log(f"Job profile saved to {filename} (open in chrome://tracing or ui.perfetto.dev)")
+    
     def browse_game_path(self):
         """Open file browser to select game path"""
         initial_dir = self.game_path_var.get() or os.path.expanduser("~")
@@ -433,64 +1260,126 @@ class LauncherApp:
                                             "Please browse to the game folder manually.")
     
     def check_installation_status(self):
-        """Check if BepInEx and mod are installed"""
+        """Check if BepInEx and mod are installed (probed in the background)"""
         game_path = self.game_path_var.get()
-        
-        if not game_path or not os.path.exists(game_path):
+        mod_source = self.get_mod_source_dir()
+        lan_share = self.lan_share_var.get()
+        
+        def do_probe():
+            game = self.game_fingerprints.check(game_path) if game_path and os.path.isdir(game_path) else None
+            if game and game["changed"]:
+                self.root.after(0, lambda: self.notify_game_update(game))
+            status = probe_installation(game_path, mod_source, game and game["changed_at"])
+            # Hashing the mod source for LAN sharing stays off the UI thread
+            shared_dll = shareable_mod_dll(game_path, mod_source) if lan_share and status["game_found"] else None
+            self.root.after(0, lambda: self.apply_installation_status(status, shared_dll))
+            tools = self.toolchain.probe(game_path, needs_regen=bool(game and game["needs_regen"]))
+            self.root.after(0, lambda: self.show_toolchain_status(tools))
+            if status["game_found"]:
+                # Launching only reads this result, so a cold plugin cache never blocks the UI
+                _, issues = pluginscan.scan_game(game_path, self.plugin_scanner)
+                self.root.after(0, lambda: setattr(self, "plugin_issues", (game_path, issues)))
+        
+        self.start_job(do_probe)
+    
+    def apply_installation_status(self, status, shared_dll=None):
+        """Show the result of probe_installation and share shared_dll (see shareable_mod_dll)"""
+        if not status["game_found"]:
             self.bepinex_status.config(text="⬜ Game path not set")
             self.mod_status.config(text="⬜ Game path not set")
             self.bepinex_installed.set(False)
             self.mod_installed.set(False)
-        else:
-            # Check BepInEx
-            bepinex_path = os.path.join(game_path, "BepInEx")
-            bepinex_core = os.path.join(bepinex_path, "core", "BepInEx.Core.dll")
-            
-            if os.path.exists(bepinex_core):
-                self.bepinex_status.config(text="✅ BepInEx installed")
-                self.bepinex_installed.set(True)
-                self.log("BepInEx found")
-            else:
-                self.bepinex_status.config(text="❌ BepInEx not installed")
-                self.bepinex_installed.set(False)
-            
-            # Check Mod
-            mod_path = os.path.join(bepinex_path, "plugins", "MegabonkMP")
-            mod_dll = os.path.join(mod_path, "MegabonkMP.dll")
-            
-            if os.path.exists(mod_dll):
-                self.mod_status.config(text="✅ MegabonkMP mod installed")
-                self.mod_installed.set(True)
-                self.log("MegabonkMP mod found")
-            else:
-                self.mod_status.config(text="❌ MegabonkMP mod not installed")
-                self.mod_installed.set(False)
+            self.refresh_lan_artifacts(shared_dll)
+            return
         
-        # Check Source (independent of game path)
-        mod_source = self.get_mod_source_dir()
-        csproj_path = os.path.join(mod_source, "MegabonkMP.csproj")
+        if status["bepinex"]:
+            self.bepinex_status.config(text="✅ BepInEx installed")
+            self.log("BepInEx found")
+        else:
+            self.bepinex_status.config(text="❌ BepInEx not installed")
+        self.bepinex_installed.set(status["bepinex"])
         
-        # Check if mod DLL is latest built version
-        mod_source = self.get_mod_source_dir()
-        built_dll = os.path.join(mod_source, "bin", "Release", "MegabonkMP.dll")
-        if os.path.exists(mod_dll):
-            is_latest = False
-            if os.path.exists(built_dll):
-                try:
-                    mod_time = os.path.getmtime(mod_dll)
-                    built_time = os.path.getmtime(built_dll)
-                    is_latest = mod_time >= built_time
-                except Exception:
-                    pass
-            if is_latest:
+        if status["mod"]:
+            if status["mod_latest"]:
                 self.mod_status.config(text="✅ MegabonkMP mod installed (latest)")
             else:
                 self.mod_status.config(text="⚠️ MegabonkMP mod installed (outdated)")
-            self.mod_installed.set(True)
             self.log("MegabonkMP mod found")
         else:
             self.mod_status.config(text="❌ MegabonkMP mod not installed")
-            self.mod_installed.set(False)
+        self.mod_installed.set(status["mod"])
+        
+        self.refresh_lan_artifacts(shared_dll)
+    
+    def notify_game_update(self, game):
+        """Tell the user a game update made the interop assemblies and the mod build stale"""
+        changed = ", ".join(game["changed_files"]) or "none"
+        self.log(f"Game update detected (fingerprint {game['fingerprint']}, changed {changed}, "
+                 f"hashed in {game.get('hash_ms', 0)} ms)", "WARNING")
+        self.log("BepInEx interop assemblies and the MegabonkMP build are out of date", "WARNING")
+        messagebox.showwarning("Game Updated",
+                               "Megabonk has been updated.\n\n"
+                               "The BepInEx interop assemblies the mod builds against are now out of date. "
+                               "Launch the game once with BepInEx installed to regenerate them, "
+                               "then rebuild and reinstall the mod.")
+    
+    def show_toolchain_status(self, result):
+        """Show build readiness (.NET SDK, interop assemblies, game build)"""
+        if result is None:
+            self.toolchain_status.config(text="⬜ Checking build tools...")
+        else:
+            self.toolchain_status.config(text=toolchain.format_status(result))
+    
+    def check_build_prerequisites(self, game_path):
+        """Fail fast before MSBuild runs; returns the SDK version, or None if something is missing"""
+        game = self.game_fingerprints.check(game_path) if game_path and os.path.isdir(game_path) else None
+        result = self.toolchain.probe(game_path, needs_regen=bool(game and game["needs_regen"]))
+        self.root.after(0, lambda: self.show_toolchain_status(result))
+        
+        problems = toolchain.build_problems(result)
+        if not problems:
+            self.log(f"Found .NET SDK: {result['dotnet']['version']}")
+            return result["dotnet"]["version"]
+        
+        for kind, message in problems:
+            self.log(message.replace("\n", " "), "ERROR")
+        kind, message = problems[0]
+        if kind == "dotnet":
+            if messagebox.askyesno("Install .NET SDK", 
+                                    f"{message}\n\n.NET SDK is required to build the mod.\n\n"
+                                    "Would you like to open the download page?"):
+                webbrowser.open("https://dotnet.microsoft.com/download/dotnet/6.0")
+        else:
+            messagebox.showerror("Build Prerequisites Missing", message)
+        return None
+    
+    def check_plugins(self):
+        """Scan BepInEx/plugins for duplicate plugins and version clashes"""
+        game_path = self.game_path_var.get()
+        if not game_path or not os.path.exists(game_path):
+            messagebox.showerror("Error", "Please set a valid game path first.")
+            return
+        
+        def do_scan():
+            started = time.perf_counter()
+            plugins, issues = pluginscan.scan_game(game_path, self.plugin_scanner)
+            self.root.after(0, lambda: setattr(self, "plugin_issues", (game_path, issues)))
+            self.log(f"Scanned {len(plugins)} plugin DLLs in {(time.perf_counter() - started) * 1000:.0f} ms")
+            for line in pluginscan.format_report(plugins, issues).splitlines():
+                if line:
+                    self.log(f"  {line}", "ERROR" if line.startswith("ERROR") else
+                             "WARNING" if line.startswith("WARNING") else "INFO")
+            
+            if issues:
+                summary = "\n\n".join(issue["message"] for issue in issues[:10])
+                self.root.after(0, lambda: messagebox.showwarning(
+                    "Plugin Conflicts", f"{len(issues)} problem(s) found in BepInEx/plugins:\n\n{summary}"))
+            else:
+                self.root.after(0, lambda: messagebox.showinfo(
+                    "Plugins OK", f"No conflicts among {len(plugins)} plugin DLLs."))
+        
+        self.start_job(do_scan)
+    
     def install_bepinex(self):
         """Download and install BepInEx"""
         game_path = self.game_path_var.get()
@@ -508,17 +1397,20 @@ class LauncherApp:
         
         def download_and_install():
             try:
-                # Download
-                zip_path = os.path.join(game_path, "bepinex_temp.zip")
-                urllib.request.urlretrieve(BEPINEX_URL, zip_path)
+                # Download, preferring a cached copy or a LAN peer over GitHub
+                zip_path = cached_bepinex_archive()
+                if zip_path:
+                    self.log(f"Using cached BepInEx archive: {zip_path}")
+                else:
+                    zip_path = get_bepinex_cache_path()
+                    # Without a pin a peer's archive cannot be checked, so only upstream is used
+                    if not BEPINEX_SHA256 or not self.fetch_from_lan("bepinex", zip_path, version=BEPINEX_VERSION,
+                                                                     sha256=BEPINEX_SHA256):
+                        download_bepinex(zip_path)
                 self.log("Download complete, extracting...")
                 
                 # Extract
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(game_path)
-                
-                # Cleanup
-                os.remove(zip_path)
+                install_bepinex_archive(zip_path, game_path)
                 
                 self.log("BepInEx installed successfully!")
                 self.root.after(0, lambda: self.status_var.set("BepInEx installed!"))
@@ -527,29 +1419,16 @@ class LauncherApp:
                     "BepInEx installed!\n\nRun the game once to generate interop assemblies."))
                 
             except Exception as e:
-                self.log(f"Failed to install BepInEx: {e}", "ERROR")
+                message = str(e)
+                self.log(f"Failed to install BepInEx: {message}", "ERROR")
                 self.root.after(0, lambda: self.status_var.set("Installation failed"))
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to install BepInEx:\n{e}"))
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to install BepInEx:\n{message}"))
         
-        threading.Thread(target=download_and_install, daemon=True).start()
+        self.start_job(download_and_install)
     
     def get_mod_source_dir(self):
         """Get the mod source directory, downloading from GitHub if needed"""
-        launcher_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Check for local source first (development mode)
-        local_source = os.path.join(launcher_dir, "..", "src")
-        if os.path.exists(os.path.join(local_source, "MegabonkMP.csproj")):
-            return local_source
-        
-        # Use downloaded source in user's app data
-        if sys.platform == "win32":
-            app_data = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
-        else:
-            app_data = os.path.expanduser("~/.local/share")
-        
-        source_dir = os.path.join(app_data, "MegabonkMP", "src")
-        return source_dir
+        return get_mod_source_dir()
     
     def download_source(self):
         """Download latest source files from GitHub"""
@@ -559,44 +1438,18 @@ class LauncherApp:
         def do_download():
             try:
                 # Setup directories
-                if sys.platform == "win32":
-                    app_data = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
-                else:
-                    app_data = os.path.expanduser("~/.local/share")
-                
-                mod_dir = os.path.join(app_data, "MegabonkMP")
+                mod_dir = get_app_data_dir()
                 os.makedirs(mod_dir, exist_ok=True)
                 
                 zip_path = os.path.join(mod_dir, "source_temp.zip")
                 
                 # Download
-                urllib.request.urlretrieve(GITHUB_SOURCE_URL, zip_path)
+                download_file(GITHUB_SOURCE_URL, zip_path)
                 self.log("Download complete, extracting...")
                 
                 # Extract
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(mod_dir)
-                
-                # The zip extracts to test123-main/megabonk-mp-mod/src
-                # Move to the right location
-                extracted_dir = os.path.join(mod_dir, "test123-main", MOD_SOURCE_FOLDER, "src")
-                target_dir = os.path.join(mod_dir, "src")
-                
-                # Remove old source if exists
-                if os.path.exists(target_dir):
-                    shutil.rmtree(target_dir)
-                
-                if os.path.exists(extracted_dir):
-                    shutil.move(extracted_dir, target_dir)
-                    self.log(f"Source files installed to {target_dir}")
-                else:
-                    raise Exception(f"Source folder not found in downloaded archive")
-                
-                # Cleanup
-                os.remove(zip_path)
-                extracted_root = os.path.join(mod_dir, "test123-main")
-                if os.path.exists(extracted_root):
-                    shutil.rmtree(extracted_root)
+                target_dir = extract_source_archive(zip_path, mod_dir)
+                self.log(f"Source files installed to {target_dir}")
                 
                 self.root.after(0, lambda: self.status_var.set("Source downloaded!"))
                 self.root.after(0, lambda: messagebox.showinfo("Success", 
@@ -610,7 +1463,7 @@ class LauncherApp:
                 self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to download source:\n{e}"))
                 return False
         
-        threading.Thread(target=do_download, daemon=True).start()
+        self.start_job(do_download)
     
     def build_mod(self, after_build=None):
         """Build the mod from source. Calls after_build() on success if provided."""
@@ -621,18 +1474,9 @@ class LauncherApp:
                                           "to generate the required interop assemblies.")
             return
         
-        # Check if dotnet is available
-        try:
-            result = subprocess.run(["dotnet", "--version"], capture_output=True, text=True)
-            if result.returncode != 0:
-                raise FileNotFoundError()
-            self.log(f"Found .NET SDK: {result.stdout.strip()}")
-        except FileNotFoundError:
-            self.log(".NET SDK not found", "ERROR")
-            if messagebox.askyesno("Install .NET SDK", 
-                                    ".NET SDK is required to build the mod.\n\n"
-                                    "Would you like to open the download page?"):
-                webbrowser.open("https://dotnet.microsoft.com/download/dotnet/6.0")
+        # Check the .NET SDK and interop assemblies before starting MSBuild
+        sdk_version = self.check_build_prerequisites(game_path)
+        if not sdk_version:
             return
         
         # Get mod source directory
@@ -657,14 +1501,7 @@ class LauncherApp:
                 env["MEGABONK_PATH"] = game_path
                 
                 # Run dotnet build with detailed output
-                self.log(f"Running: dotnet build -c Release --verbosity normal")
-                result = subprocess.run(
-                    ["dotnet", "build", "-c", "Release", "--verbosity", "normal", csproj_path],
-                    capture_output=True,
-                    text=True,
-                    cwd=mod_source,
-                    env=env
-                )
+                result = self.run_dotnet_build(mod_source, sdk_version, csproj_path=csproj_path, env=env)
 
                 # Log all output regardless of success/failure
                 if result.stdout:
@@ -718,7 +1555,72 @@ class LauncherApp:
                 self.root.after(0, lambda: messagebox.showerror("Build Failed", 
                     f"Failed to build mod:\n{e}\n\nCheck the Logs tab for details."))
         
-        threading.Thread(target=do_build, daemon=True).start()
+        self.start_job(do_build)
+    
+    def run_dotnet_build(self, mod_source, sdk_version, csproj_path=None, env=None):
+        """Run dotnet build with a performance summary and record the timings in the build history"""
+        binlog_path = None
+        if self.build_binlog_var.get():
+            binlog_path = os.path.join(get_app_data_dir(), "builds", "MegabonkMP.binlog")
+            os.makedirs(os.path.dirname(binlog_path), exist_ok=True)
+        
+        self.log(f"Running: {' '.join(buildstats.dotnet_build_args(csproj_path, binlog_path=binlog_path))}")
+        result, entry, duration = dotnet_build(mod_source, sdk_version, self.build_history,
+                                               csproj_path=csproj_path, env=env, binlog_path=binlog_path,
+                                               game_fingerprint=self.game_fingerprints.fingerprint(
+                                                   self.game_path_var.get()))
+        phases = ", ".join(f"{phase} {ms} ms" for phase, ms in entry["phases"].items() if ms)
+        self.log(f"Build took {duration:.1f}s ({phases or 'no performance summary'})")
+        for name, before, after in self.build_history.regressions(entry):
+            self.log(f"Build regression: {name} {before} ms -> {after} ms", "WARNING")
+        if binlog_path:
+            self.log(f"Binary log written to {binlog_path}")
+        
+        if hasattr(self, 'build_report_text'):
+            self.root.after(0, self.refresh_build_report)
+        return result
+    
+    def toggle_watch_mode(self):
+        """Start or stop rebuilding and deploying the mod on source changes"""
+        if self.dev_watcher and self.dev_watcher.running:
+            self.dev_watcher.stop()
+            self.watch_btn.config(text="Start Watching")
+            self.watch_status.config(text="Watch mode stopped")
+            return
+        
+        game_path = self.game_path_var.get()
+        mod_source = self.get_mod_source_dir()
+        csproj_path = os.path.join(mod_source, "MegabonkMP.csproj")
+        if not game_path or not os.path.exists(game_path):
+            messagebox.showerror("Error", "Please set a valid game path first")
+            return
+        if not os.path.exists(csproj_path):
+            messagebox.showerror("Error", "Mod source not found. Download the source first.")
+            return
+        if not self.check_build_prerequisites(game_path):
+            return
+        
+        env = os.environ.copy()
+        env["MEGABONK_PATH"] = game_path
+        log = lambda message, level="INFO": self.root.after(0, lambda: self.log(message, level))
+        self.dev_watcher = devwatch.DevWatcher(
+            mod_source, game_path, os.path.join(get_app_data_dir(), devwatch.PENDING_DIR),
+            csproj_path=csproj_path, env=env, log=log,
+            on_result=lambda result: self.root.after(0, lambda: self.show_watch_result(result)),
+            game_running=self.game_running)
+        self.dev_watcher.start()
+        self.watch_btn.config(text="Stop Watching")
+        self.watch_status.config(text="👀 Watching for changes...")
+    
+    def show_watch_result(self, result):
+        """Show the outcome and edit-to-deployed time of the last watch build"""
+        self.watch_status.config(text=devwatch.format_result(result))
+        if result["status"] != "failed":
+            self.check_installation_status()
+    
+    def game_running(self):
+        """Whether the game this launcher started is still running"""
+        return self.game_process is not None and self.game_process.poll() is None
     
     def build_and_install_mod(self):
         """Build the mod and install it in one go."""
@@ -748,27 +1650,15 @@ class LauncherApp:
                 self.log("Building mod...")
                 self.status_var.set("Building mod...")
 
-                # Check dotnet availability
-                try:
-                    result = subprocess.run(["dotnet", "--version"], capture_output=True, text=True)
-                    if result.returncode != 0:
-                        raise FileNotFoundError()
-                except FileNotFoundError:
-                    self.log(".NET SDK not found", "ERROR")
-                    if messagebox.askyesno("Install .NET SDK",
-                                            ".NET SDK is required to build the mod.\n\n"
-                                            "Would you like to open the download page?"):
-                        webbrowser.open("https://dotnet.microsoft.com/download/dotnet/6.0")
+                # Check the .NET SDK and interop assemblies before starting MSBuild
+                sdk_version = self.check_build_prerequisites(game_path)
+                if not sdk_version:
+                    self.status_var.set("Ready")
                     return
 
                 # Build the mod with detailed output
                 self.log("Starting build process...")
-                result = subprocess.run(
-                    ["dotnet", "build", "-c", "Release", "--verbosity", "normal"],
-                    cwd=mod_source,
-                    capture_output=True,
-                    text=True
-                )
+                result = self.run_dotnet_build(mod_source, sdk_version)
 
                 # Log the full output regardless of success/failure
                 if result.stdout:
@@ -811,7 +1701,8 @@ class LauncherApp:
 
                 if dll_found:
                     dest_dll = os.path.join(mod_dest, "MegabonkMP.dll")
-                    shutil.copy2(dll_found, dest_dll)
+                    with jobprofile.span("copy DLL"):
+                        shutil.copy2(dll_found, dest_dll)
                     self.log(f"Mod installed successfully: {dest_dll}")
                     self.status_var.set("Mod installed successfully!")
                     messagebox.showinfo("Success", f"Mod built and installed successfully!\n\n{dest_dll}")
@@ -828,58 +1719,8 @@ class LauncherApp:
             # Update status regardless
             self.check_installation_status()
 
-        threading.Thread(target=do_build_and_install, daemon=True).start()
+        self.start_job(do_build_and_install)
 
-    def build_mod(self, after_build=None):
-        """Build the mod from source. Calls after_build() on success if provided."""
-        game_path = self.game_path_var.get()
-        
-        if not self.bepinex_installed.get():
-            messagebox.showerror("Error", "Please install BepInEx first.")
-            return
-        
-        def do_build():
-            mod_source = self.get_mod_source_dir()
-            
-            try:
-                # Build the mod
-                csproj_path = os.path.join(mod_source, "MegabonkMP.csproj")
-                if not os.path.exists(csproj_path):
-                    self.log("MegabonkMP.csproj not found. Downloading source first.", "WARNING")
-                    if messagebox.askyesno("Download Required", 
-                        "Mod source not found.\n\nWould you like to download it now?"):
-                        self.download_source(lambda: self.build_mod(after_build))
-                    return
-                
-                self.log("Building mod...")
-                self.status_var.set("Building mod...")
-                
-                # Run dotnet build
-                import subprocess
-                result = subprocess.run(
-                    ["dotnet", "build", "-c", "Release", "--verbosity", "minimal"],
-                    cwd=mod_source,
-                    capture_output=True,
-                    text=True
-                )
-                
-                if result.returncode == 0:
-                    self.log("Mod built successfully")
-                    self.status_var.set("Mod built successfully")
-                    messagebox.showinfo("Success", "Mod built successfully!")
-                    
-                    if after_build:
-                        after_build()
-                else:
-                    self.log(f"Build failed: {result.stderr}", "ERROR")
-                    self.status_var.set("Build failed")
-                    messagebox.showerror("Build Failed", f"Failed to build mod:\n\n{result.stderr}")
-                    
-            except Exception as e:
-                self.log(f"Build failed: {e}", "ERROR")
-                self.status_var.set("Build failed")
-                messagebox.showerror("Build Failed", f"Failed to build mod:\n{e}")
-    
     def install_mod(self):
         """Install a pre-built mod DLL to the game directory."""
         game_path = self.game_path_var.get()
@@ -927,6 +1768,9 @@ class LauncherApp:
                 shutil.copy2(dll_found, dest_dll)
                 self.log(f"Mod DLL copied from {dll_found} to {dest_dll}")
                 messagebox.showinfo("Success", f"Mod installed successfully!\n\n{dest_dll}")
+            elif self.lan_fetch_var.get():
+                self.start_job(self.install_mod_from_lan, game_path)
+                return
             else:
                 self.log("Mod DLL not found. Please build the mod first.", "WARNING")
                 if messagebox.askyesno("Build Required", 
@@ -940,6 +1784,192 @@ class LauncherApp:
             self.log(f"Failed to install mod: {e}", "ERROR")
             messagebox.showerror("Error", f"Failed to install mod:\n{e}")
     
+    def install_mod_from_lan(self, game_path):
+        """Install the mod DLL (and config, if missing) built by another launcher on the LAN"""
+        dest_dll = os.path.join(game_path, "BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll")
+        self.root.after(0, lambda: self.status_var.set("Looking for LAN launchers..."))
+        
+        # Only a build of the same source as ours, declaring the same plugin version, is accepted
+        metadata = mod_build_metadata(get_mod_source_dir())
+        if metadata is None:
+            self.log("No local mod source to match LAN builds against, not using the LAN", "WARNING")
+        if metadata is None or not self.fetch_from_lan(
+                "mod_dll", dest_dll, verify=lambda path: check_mod_dll(path, metadata["version"]), **metadata):
+            self.root.after(0, lambda: self.status_var.set("Ready"))
+            self.root.after(0, lambda: messagebox.showerror("Build Required",
+                "Mod DLL not found locally or on the LAN.\n\nBuild the mod first."))
+            return
+        
+        config_path = os.path.join(game_path, "BepInEx", "config", "com.megabonk.multiplayer.cfg")
+        if not os.path.exists(config_path):
+            self.fetch_from_lan("mod_cfg", config_path)
+        
+        self.root.after(0, lambda: self.status_var.set("Mod installed from LAN"))
+        self.root.after(0, self.check_installation_status)
+        self.root.after(0, lambda: messagebox.showinfo("Success", f"Mod installed from LAN!\n\n{dest_dll}"))
+    
+    def fetch_from_lan(self, name, dest_path, verify=None, **required_meta):
+        """Try to fetch an artifact from a LAN launcher; returns False to fall back to upstream.
+
+        required_meta must match the peer's manifest entry (a sha256 given here pins the
+        content) and verify(path) may reject the download before it replaces dest_path.
+        """
+        if not self.lan_fetch_var.get():
+            return False
+        
+        peer, entry = lanshare.find_artifact(name, **required_meta)
+        if peer is None:
+            self.log(f"No LAN launcher offers {name}, using upstream")
+            return False
+        
+        try:
+            started = time.perf_counter()
+            lanshare.fetch_artifact(peer, name, entry, dest_path, verify=verify)
+            self.log(f"Fetched {name} from {peer[2]} ({peer[0]}) in {time.perf_counter() - started:.1f}s, "
+                     f"sha256 {entry['sha256'][:12]}" + (" (pinned)" if "sha256" in required_meta else ""))
+            return True
+        except lanshare.LanShareError as e:
+            self.log(f"{e}, using upstream", "WARNING")
+            return False
+    
+    def update_lan_sharing(self):
+        """Start or stop publishing artifacts to other launchers"""
+        if self.lan_share_var.get() and self.lan_server is None:
+            try:
+                self.lan_server = lanshare.LanShareServer(self.lan_store, log=self.log)
+                self.lan_server.start()
+            except OSError as e:
+                self.lan_server = None
+                self.log(f"Could not start LAN sharing: {e}", "ERROR")
+                return
+            self.check_installation_status()  # Publishes the artifacts once the probe finishes
+        elif not self.lan_share_var.get() and self.lan_server is not None:
+            self.lan_server.stop()
+            self.lan_server = None
+            self.log("LAN sharing stopped")
+    
+    def update_control_api(self):
+        """Start or stop the localhost JSON control API"""
+        if self.control_api_var.get() and self.control_server is None:
+            import controlapi  # asyncio is only needed when the API is on
+            
+            info_path = os.path.join(get_app_data_dir(), controlapi.INFO_FILE)
+            port = self.config.get("control_api_port", DEFAULT_CONFIG["control_api_port"])
+            operations = {name: (self.profiled(function, f"api {name}"), description)
+                          for name, (function, description) in api_operations().items()}
+            server = controlapi.ControlServer(
+                operations, lambda: installation_report(load_config()["game_path"]),
+                bepinex_log=lambda: os.path.join(load_config()["game_path"], "BepInEx", "LogOutput.log"),
+                port=port, on_job_done=lambda job: self.root.after(0, self.check_installation_status))
+            try:
+                server.start()
+                server.write_info(info_path)
+            except OSError as e:
+                self.log(f"Could not start control API on port {port}: {e}", "ERROR")
+                return
+            self.control_server = server
+            self.log(f"Control API listening on http://127.0.0.1:{server.port} (token in {info_path})")
+        elif not self.control_api_var.get() and self.control_server is not None:
+            self.stop_control_api()
+    
+    def stop_control_api(self):
+        if self.control_server is None:
+            return
+        import controlapi  # Already loaded by update_control_api when a server exists
+        
+        self.control_server.stop()
+        self.control_server = None
+        info_path = os.path.join(get_app_data_dir(), controlapi.INFO_FILE)
+        if os.path.exists(info_path):
+            os.remove(info_path)
+        self.log("Control API stopped")
+    
+    def refresh_lan_artifacts(self, shared_dll=None):
+        """Publish the BepInEx archive, config and shared_dll, the (path, metadata) from shareable_mod_dll"""
+        if not self.lan_share_var.get():
+            return
+        game_path = self.game_path_var.get()
+        self.lan_store.publish("bepinex", get_bepinex_cache_path(), version=BEPINEX_VERSION)
+        # Peers only take a DLL tagged with their own source, so an outdated build is not offered
+        if shared_dll:
+            self.lan_store.publish("mod_dll", shared_dll[0], **shared_dll[1])
+        else:
+            self.lan_store.withdraw("mod_dll")
+        if game_path:
+            self.lan_store.publish("mod_cfg", os.path.join(game_path, "BepInEx", "config",
+                                                           "com.megabonk.multiplayer.cfg"))
+    
+    def export_bundle(self):
+        """Write everything needed for an offline install into one archive"""
+        game_path = self.game_path_var.get()
+        bundle_path = filedialog.asksaveasfilename(
+            defaultextension=".zip",
+            filetypes=[("MegabonkMP bundle", "*.zip")],
+            initialfile=f"MegabonkMP_bundle_{datetime.now().strftime('%Y%m%d')}.zip"
+        )
+        if not bundle_path:
+            return
+        
+        self.status_var.set("Exporting bundle...")
+        
+        def do_export():
+            try:
+                create_bundle(bundle_path, game_path, log=self.log)
+                self.log(f"Bundle written to {bundle_path}")
+                self.root.after(0, lambda: self.status_var.set("Bundle exported"))
+                self.root.after(0, lambda: messagebox.showinfo("Success", f"Offline bundle written:\n\n{bundle_path}"))
+            except (OSError, bundle.BundleError) as e:
+                self.log(f"Failed to export bundle: {e}", "ERROR")
+                message = f"Failed to export bundle:\n{e}"
+                self.root.after(0, lambda: self.status_var.set("Bundle export failed"))
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
+        
+        self.start_job(do_export)
+    
+    def import_bundle(self):
+        """Verify an offline bundle and install it into the game folder"""
+        game_path = self.game_path_var.get()
+        if not game_path or not os.path.exists(game_path):
+            messagebox.showerror("Error", "Please set a valid game path first.")
+            return
+        
+        bundle_path = filedialog.askopenfilename(filetypes=[("MegabonkMP bundle", "*.zip")])
+        if not bundle_path:
+            return
+        
+        self.status_var.set("Importing bundle...")
+        
+        def do_import():
+            try:
+                bundle.import_bundle(bundle_path, game_path, log=self.log)
+                self.log(f"Bundle {bundle_path} applied to {game_path}")
+                self.root.after(0, lambda: self.status_var.set("Bundle imported"))
+                self.root.after(0, self.check_installation_status)
+                self.root.after(0, lambda: messagebox.showinfo("Success", "Offline bundle installed!"))
+            except (OSError, zipfile.BadZipFile, bundle.BundleError) as e:
+                self.log(f"Failed to import bundle: {e}", "ERROR")
+                message = f"Failed to import bundle:\n{e}"
+                self.root.after(0, lambda: self.status_var.set("Bundle import failed"))
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
+        
+        self.start_job(do_import)
+    
+    def write_mod_config(self):
+        """Write the launcher's settings into the mod's cfg, touching only what changed.
+
+        Returns the changed entries; raises modconfig.ConfigError for invalid settings.
+        """
+        try:
+            values = modconfig.values_from_launcher(self.current_config())
+        except tk.TclError as e:
+            raise modconfig.ConfigError(f"Invalid setting: {e}")
+        
+        config_path = os.path.join(self.game_path_var.get(), "BepInEx", "config", modconfig.CONFIG_FILE)
+        changed = modconfig.update_config(config_path, values)
+        if changed:
+            self.log(f"Config updated ({', '.join(changed)}): {config_path}")
+        return changed
+    
     def apply_server_settings(self):
         """Apply and save server settings to mod config"""
         game_path = self.game_path_var.get()
@@ -948,63 +1978,16 @@ class LauncherApp:
             messagebox.showerror("Error", "Game path not set.")
             return
         
-        # Save launcher config
-        self.save_config()
-        
-        # Write to BepInEx config
-        config_path = os.path.join(game_path, "BepInEx", "config", "com.megabonk.multiplayer.cfg")
-        
         try:
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            
-            config_content = f"""## Settings file for MegabonkMP
-## Generated by {APP_NAME}
-
-[Network]
-
-## IP address to connect to or host on
-ServerAddress = {self.server_address_var.get()}
-
-## Port for multiplayer connections
-ServerPort = {self.server_port_var.get()}
-
-## Maximum players in a session
-MaxPlayers = {self.max_players_var.get()}
-
-[Gameplay]
-
-## Allow players to damage each other
-FriendlyFire = {str(self.friendly_fire_var.get()).lower()}
-
-## Share loot drops among all players
-SharedLoot = {str(self.shared_loot_var.get()).lower()}
-
-## XP multiplier for multiplayer
-XpMultiplier = {self.xp_multiplier_var.get()}
-
-[UI]
-
-## Display nameplates above other players
-ShowPlayerNameplates = {str(self.show_nameplates_var.get()).lower()}
-
-## Display network statistics overlay
-ShowNetworkStats = {str(self.show_network_stats_var.get()).lower()}
-
-[Debug]
-
-## Enable debug logging
-DebugMode = {str(self.debug_mode_var.get()).lower()}
-"""
-            
-            with open(config_path, 'w') as f:
-                f.write(config_content)
-            
-            self.log(f"Config written to {config_path}")
-            messagebox.showinfo("Success", "Settings saved!")
-            
-        except Exception as e:
+            # Reading an IntVar/DoubleVar that holds text raises TclError
+            self.save_config()
+            changed = self.write_mod_config()
+        except (OSError, tk.TclError, modconfig.ConfigError) as e:
             self.log(f"Failed to write config: {e}", "ERROR")
             messagebox.showerror("Error", f"Failed to save config:\n{e}")
+            return
+        
+        self.status_var.set("Settings saved" if changed else "Settings unchanged")
     
     def launch_game(self):
         """Launch the game"""
@@ -1015,17 +1998,42 @@ DebugMode = {str(self.debug_mode_var.get()).lower()}
             messagebox.showerror("Error", f"Game executable not found:\n{exe_path}")
             return
         
-        # Save settings before launch
-        self.save_config()
-        self.apply_server_settings()
+        # Fast path: validate, write only changed cfg values, start the game; no dialogs
+        try:
+            # Reading an IntVar/DoubleVar that holds text raises TclError
+            self.save_config()
+            self.write_mod_config()
+        except (tk.TclError, modconfig.ConfigError) as e:
+            self.log(f"Not launching, invalid settings: {e}", "ERROR")
+            self.status_var.set(f"Invalid settings: {e}")
+            return
+        except OSError as e:
+            self.log(f"Could not update mod config, launching with the existing one: {e}", "WARNING")
+        
+        # Conflicting plugins only show up as cryptic errors in game, so point them out
+        scanned_path, issues = self.plugin_issues
+        if scanned_path != game_path:
+            self.log("Plugins not scanned yet, launching without a conflict check", "WARNING")
+            issues = []
+        errors = [issue["message"] for issue in issues if issue["severity"] == "error"]
+        for message in errors:
+            self.log(f"Plugin conflict: {message}", "WARNING")
+        
+        # A watch-mode build that couldn't replace the loaded plugin goes in now
+        try:
+            if devwatch.apply_pending(os.path.join(get_app_data_dir(), devwatch.PENDING_DIR), game_path):
+                self.log("Deployed queued MegabonkMP.dll from watch mode")
+        except OSError as e:
+            self.log(f"Could not deploy queued MegabonkMP.dll: {e}", "WARNING")
         
         self.log(f"Launching game: {exe_path}")
         self.status_var.set("Launching game...")
         
         try:
-            subprocess.Popen([exe_path], cwd=game_path)
+            self.game_process = subprocess.Popen([exe_path], cwd=game_path)
             self.log("Game launched successfully")
-            self.status_var.set("Game running")
+            self.status_var.set(f"Game running ({len(errors)} plugin conflict(s), see Logs)" if errors
+                                else "Game running")
         except Exception as e:
             self.log(f"Failed to launch game: {e}", "ERROR")
             messagebox.showerror("Error", f"Failed to launch game:\n{e}")
@@ -1102,8 +2110,7 @@ DebugMode = {str(self.debug_mode_var.get()).lower()}
         
         if os.path.exists(log_path):
             try:
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                content = read_log_tail(log_path)
                 
                 self.log_text.config(state=tk.NORMAL)
                 self.log_text.delete(1.0, tk.END)
@@ -1116,7 +2123,345 @@ DebugMode = {str(self.debug_mode_var.get()).lower()}
                 self.log(f"Failed to read log: {e}", "ERROR")
 
 
+def create_bundle(bundle_path, game_path, log=print):
+    """Export the cached BepInEx archive, mod DLL, config and Thunderstore metadata"""
+    # Only the pinned release goes into a bundle, not whatever a LAN peer left in the cache
+    bepinex_zip = cached_bepinex_archive()
+    if not BEPINEX_SHA256:
+        raise bundle.BundleError("BEPINEX_SHA256 is not set, so the cached BepInEx archive cannot be verified.")
+    if not bepinex_zip:
+        raise bundle.BundleError(f"No BepInEx {BEPINEX_VERSION} archive matching the pinned SHA-256 is cached.\n"
+                                 "Install BepInEx with the launcher once first.")
+    
+    mod_source = get_mod_source_dir()
+    mod_dll = find_mod_dll(game_path, mod_source)
+    if not mod_dll:
+        raise bundle.BundleError("MegabonkMP.dll not found. Build the mod first.")
+    
+    mod_cfg = os.path.join(game_path, "BepInEx", "config", "com.megabonk.multiplayer.cfg")
+    if not os.path.exists(mod_cfg):
+        log("No com.megabonk.multiplayer.cfg in the game folder; bundle will not include settings", "WARNING")
+        mod_cfg = None
+    
+    manifest = os.path.join(mod_source, "..", "thunderstore", "manifest.json")
+    return bundle.export_bundle(bundle_path, bepinex_zip, mod_dll, mod_cfg,
+                                manifest if os.path.exists(manifest) else None,
+                                bepinex_version=BEPINEX_VERSION, log=log)
+
+
+def create_package(output_dir, game_path, force=False, log=print):
+    """Build the Thunderstore package from thunderstore/ and the built mod DLL"""
+    mod_source = get_mod_source_dir()
+    metadata_dir = os.path.join(mod_source, "..", "thunderstore")
+    if not os.path.exists(os.path.join(metadata_dir, thunderstore.MANIFEST)):
+        raise thunderstore.PackageError(f"Thunderstore metadata not found in {os.path.abspath(metadata_dir)}.\n"
+                                        "Package from a source checkout.")
+    mod_dll = find_mod_dll(game_path, mod_source)
+    if not mod_dll:
+        raise thunderstore.PackageError("MegabonkMP.dll not found. Build the mod first.")
+    
+    icon = os.path.join(metadata_dir, thunderstore.ICON)
+    return thunderstore.build_package(output_dir, os.path.join(metadata_dir, thunderstore.MANIFEST),
+                                      os.path.join(metadata_dir, thunderstore.README), mod_dll,
+                                      icon if os.path.exists(icon) else None, force=force, log=log)
+
+
+def run_package_command(args):
+    """Build, verify or install a Thunderstore package"""
+    game_path = args.game_path or load_config()["game_path"]
+    log = lambda message, level="INFO": print(message if level == "INFO" else f"{level}: {message}")
+    
+    try:
+        if args.action == "build":
+            zip_path, built = create_package(args.path or "dist", game_path, force=args.force, log=log)
+            if built:
+                print(f"Package written to {zip_path}")
+        elif not args.path:
+            print("Error: give the package .zip to check")
+            return 1
+        elif args.action == "verify":
+            thunderstore.verify_package(args.path, args.hashes, log=log)
+        else:
+            thunderstore.install_package(args.path, game_path, args.hashes, log=log)
+            print(f"Package installed to {game_path}")
+    except (OSError, zipfile.BadZipFile, thunderstore.PackageError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def run_bundle_command(args):
+    """Export or import an offline deployment bundle"""
+    game_path = args.game_path or load_config()["game_path"]
+    log = lambda message, level="INFO": print(message if level == "INFO" else f"{level}: {message}")
+    
+    try:
+        if args.action == "export":
+            create_bundle(args.path, game_path, log=log)
+            print(f"Bundle written to {args.path}")
+        else:
+            bundle.import_bundle(args.path, game_path, log=log)
+            print(f"Bundle applied to {game_path}")
+    except (OSError, zipfile.BadZipFile, bundle.BundleError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def run_timeline_command(args):
+    """Print the merged timeline of several BepInEx logs"""
+    specs = args.logs or logtimeline.local_instance_logs(args.game_path or load_config()["game_path"])
+    if not specs:
+        print("Error: no logs given and no LogOutput.log found in the game folder")
+        return 1
+    paths = [spec.split("=", 1)[1] if "=" in spec else spec for spec in specs]
+    labels = logtimeline.unique_labels(paths)
+    labels = [spec.split("=", 1)[0] if "=" in spec else label for spec, label in zip(specs, labels)]
+    sources = [logtimeline.LogSource(path, label) for path, label in zip(paths, labels)]
+    
+    by_label = {source.label: source for source in sources}
+    try:
+        if args.sync_on:
+            for label in logtimeline.sync_offsets(sources, args.sync_on):
+                print(f"WARNING: {label} has no line matching --sync-on; its clock is not adjusted", file=sys.stderr)
+        for spec in args.offset or []:
+            label, _, seconds = spec.partition("=")
+            if label not in by_label:
+                print(f"Error: unknown log label in --offset: {label} (labels: {', '.join(by_label)})")
+                return 1
+            by_label[label].offset = float(seconds)
+        
+        for source in sources:
+            print(f"# {source.label}: {source.path} ({source.offset:+.3f}s)")
+        if args.at:
+            at = logtimeline.resolve_time(args.at, sources)
+            entries = logtimeline.select(logtimeline.merge(sources), args.level, args.packets,
+                                         at - args.window, at + args.window)
+        else:
+            entries = logtimeline.select(logtimeline.merge(sources), args.level, args.packets)
+        width = max(len(label) for label in labels)
+        for entry in entries:
+            print(logtimeline.format_entry(entry, width))
+    except BrokenPipeError:
+        # Output piped into head or less that exited early; keep the final flush from failing too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError, re.error) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def run_plugins_command(args):
+    """Scan BepInEx/plugins and print plugins and conflicts"""
+    game_path = args.game_path or load_config()["game_path"]
+    scanner = pluginscan.PluginScanner(os.path.join(get_app_data_dir(), pluginscan.CACHE_FILE))
+    plugins, issues = pluginscan.scan_game(game_path, scanner)
+    
+    if args.json:
+        print(json.dumps({"plugins": plugins, "issues": issues}, indent=2))
+    else:
+        print(pluginscan.format_report(plugins, issues))
+    return 1 if any(issue["severity"] == "error" for issue in issues) else 0
+
+
+def run_proxy_command(args):
+    """Run the network impairment proxy in front of the configured server"""
+    import netproxy  # asyncio is only needed here, keep it out of GUI startup
+    
+    config = load_config()
+    upstream = (args.server or config["server_address"], args.server_port or config["server_port"])
+    scenario = netproxy.Scenario.load(args.scenario) if args.scenario else None
+    
+    summary = netproxy.run_proxy(upstream, (args.listen, args.port), scenario,
+                                 duration=args.duration, stats_path=args.stats,
+                                 packet_log_path=args.packet_log, capture_path=args.capture)
+    
+    for direction, types in summary.items():
+        for type_name, stats in types.items():
+            print(f"{direction:<10} {type_name:<18} fwd {stats['forwarded']:>7}  drop {stats['dropped']:>6}  "
+                  f"dup {stats['duplicated']:>5}  delay {stats['mean_delay_ms']:.1f} ms")
+    return 0
+
+
+def run_relay_command(args):
+    """Host many lobbies on one port with a pool of relay worker processes"""
+    import relay  # multiprocessing and shared memory are only needed here
+    
+    log = lambda message, level="INFO": print(message if level == "INFO" else f"{level}: {message}", flush=True)
+    try:
+        last = relay.run_relay((args.listen, args.port), args.workers, args.max_players, duration=args.duration,
+                               report_interval=args.report, stats_path=args.stats, tick_rate=args.tick_rate, log=log)
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    print(f"Stopped with {len(last['lobbies'])} open lobbies")
+    for index, worker in enumerate(last["workers"]):
+        print(f"worker {index}: received {worker['received']}, handed off {worker['handed_off']}, "
+              f"sent {worker['sent']}, dropped {worker['dropped']}, scheduled {worker['scheduled']}")
+    return 0
+
+
+def run_watch_command(args):
+    """Rebuild and deploy the mod on every source change until interrupted"""
+    game_path = args.game_path or load_config()["game_path"]
+    mod_source = get_mod_source_dir()
+    csproj_path = os.path.join(mod_source, "MegabonkMP.csproj")
+    if not os.path.exists(csproj_path):
+        print(f"Error: project file not found: {csproj_path}")
+        return 1
+    
+    probe = toolchain.ToolchainProbe(os.path.join(get_app_data_dir(), toolchain.CACHE_FILE), csproj_path)
+    problems = toolchain.build_problems(probe.probe(game_path))
+    if problems:
+        for _, message in problems:
+            print(f"Error: {message}")
+        return 1
+    
+    env = os.environ.copy()
+    env["MEGABONK_PATH"] = game_path
+    log = lambda message, level="INFO": print(message if level == "INFO" else f"{level}: {message}", flush=True)
+    watcher = devwatch.DevWatcher(mod_source, game_path, os.path.join(get_app_data_dir(), devwatch.PENDING_DIR),
+                                  csproj_path=csproj_path, env=env, log=log, interval=args.interval,
+                                  debounce=args.debounce)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("Stopped")
+    return 0
+
+
+def run_api_command(args):
+    """Serve the control API without the GUI until interrupted"""
+    import asyncio
+    import controlapi
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    port = args.port if args.port is not None else load_config()["control_api_port"]
+    operations = api_operations()
+    profiler = None
+    if args.profile:
+        profiler = jobprofile.JobProfiler(memory=args.trace_memory)
+        operations = {name: (profiler.wrap_job(function, f"api {name}"), description)
+                      for name, (function, description) in operations.items()}
+    server = controlapi.ControlServer(
+        operations, lambda: installation_report(load_config()["game_path"]),
+        bepinex_log=lambda: os.path.join(load_config()["game_path"], "BepInEx", "LogOutput.log"), port=port)
+    info_path = os.path.join(get_app_data_dir(), controlapi.INFO_FILE)
+    
+    def ready():
+        server.write_info(info_path)
+        print(f"Control API listening on http://127.0.0.1:{server.port} (token in {info_path})", flush=True)
+    
+    try:
+        asyncio.run(server.serve(ready=ready))
+    except KeyboardInterrupt:
+        print("Stopped")
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        if os.path.exists(info_path):
+            os.remove(info_path)
+        if profiler:
+            profiler.dump(args.profile)
+            print(f"Job profile written to {args.profile}")
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line; no command starts the GUI"""
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} v{APP_VERSION}")
+    commands = parser.add_subparsers(dest="command")
+    
+    proxy = commands.add_parser("proxy", help="Run a local UDP proxy that simulates a bad network")
+    proxy.add_argument("--listen", default="127.0.0.1", help="Address clients connect to (default: 127.0.0.1)")
+    proxy.add_argument("--port", type=int, default=7778, help="Port clients connect to (default: 7778)")
+    proxy.add_argument("--server", help="Server address (default: server_address from launcher config)")
+    proxy.add_argument("--server-port", type=int, help="Server port (default: server_port from launcher config)")
+    proxy.add_argument("--scenario", help="Scenario JSON file (default: no impairment)")
+    proxy.add_argument("--duration", type=float, help="Stop after this many seconds")
+    proxy.add_argument("--stats", help="Write per-direction, per-packet-type summary JSON")
+    proxy.add_argument("--packet-log", help="Write one CSV row per packet")
+    proxy.add_argument("--capture", help="Write forwarded datagrams to a capture file (see packetlab.py)")
+    
+    relay_cmd = commands.add_parser("relay", help="Host many lobbies on one port (community servers)")
+    relay_cmd.add_argument("--listen", default="0.0.0.0", help="Address to listen on (default: 0.0.0.0)")
+    relay_cmd.add_argument("--port", type=int, default=7777, help="UDP port players connect to (default: 7777)")
+    relay_cmd.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    relay_cmd.add_argument("--max-players", type=int, default=6, help="Players per lobby (default: 6)")
+    relay_cmd.add_argument("--tick-rate", type=float,
+                           help="Send each player's relayed packets this many times per second, coalesced and "
+                                "batched (default: send immediately)")
+    relay_cmd.add_argument("--report", type=float, default=10.0, help="Seconds between rate reports (default: 10)")
+    relay_cmd.add_argument("--stats", help="Rewrite per-lobby counters and rates to this JSON file every report")
+    relay_cmd.add_argument("--duration", type=float, help="Stop after this many seconds")
+    
+    plugins_cmd = commands.add_parser("plugins", help="List BepInEx plugins and report conflicts")
+    plugins_cmd.add_argument("--game-path", help="Megabonk folder (default: game_path from launcher config)")
+    plugins_cmd.add_argument("--json", action="store_true", help="Print the full scan as JSON")
+    
+    bundle_cmd = commands.add_parser("bundle", help="Export or import an offline deployment bundle")
+    bundle_cmd.add_argument("action", choices=["export", "import"])
+    bundle_cmd.add_argument("path", help="Bundle archive (.zip)")
+    bundle_cmd.add_argument("--game-path", help="Megabonk folder (default: game_path from launcher config)")
+    
+    timeline_cmd = commands.add_parser("timeline", help="Merge BepInEx logs of the host and clients by time")
+    timeline_cmd.add_argument("logs", nargs="*", metavar="[LABEL=]LOG",
+                              help="Log files (default: LogOutput*.log of the local game folder)")
+    timeline_cmd.add_argument("--offset", action="append", metavar="LABEL=SECONDS",
+                              help="Add SECONDS to every time in that log (repeatable)")
+    timeline_cmd.add_argument("--sync-on", metavar="REGEX",
+                              help="Align clocks on the first line matching REGEX in each log")
+    timeline_cmd.add_argument("--level", choices=["debug", "info", "warning", "error"], help="Minimum level")
+    timeline_cmd.add_argument("--packets", action="store_true", help="Only [NET]/[SYNC] and packet messages")
+    timeline_cmd.add_argument("--at", help="Jump to a moment (HH:MM:SS[.fff] or ISO time) in all logs")
+    timeline_cmd.add_argument("--window", type=float, default=5.0, help="Seconds shown around --at (default: 5)")
+    timeline_cmd.add_argument("--game-path", help="Megabonk folder (default: game_path from launcher config)")
+    
+    package_cmd = commands.add_parser("package", help="Build, verify or install a reproducible Thunderstore package")
+    package_cmd.add_argument("action", choices=["build", "verify", "install"])
+    package_cmd.add_argument("path", nargs="?", help="Output folder for build (default: dist), package .zip otherwise")
+    package_cmd.add_argument("--force", action="store_true", help="Rebuild even if the inputs are unchanged")
+    package_cmd.add_argument("--hashes", help="Hash manifest to check against (default: <package>.hashes.json)")
+    package_cmd.add_argument("--game-path", help="Megabonk folder (default: game_path from launcher config)")
+    
+    watch_cmd = commands.add_parser("watch", help="Rebuild and deploy the mod whenever a source file changes")
+    watch_cmd.add_argument("--game-path", help="Megabonk folder (default: game_path from launcher config)")
+    watch_cmd.add_argument("--interval", type=float, default=devwatch.POLL_INTERVAL,
+                           help=f"Seconds between source scans (default: {devwatch.POLL_INTERVAL})")
+    watch_cmd.add_argument("--debounce", type=float, default=devwatch.DEBOUNCE,
+                           help=f"Quiet period before building (default: {devwatch.DEBOUNCE})")
+    
+    api_cmd = commands.add_parser("api", help="Serve the local JSON control API without the GUI")
+    api_cmd.add_argument("--port", type=int, help="Port on 127.0.0.1 (default: control_api_port from launcher "
+                                                  "config, 7790; 0 picks a free port)")
+    api_cmd.add_argument("--profile", metavar="FILE",
+                         help="Profile every operation and write a Chrome trace with hot spots to FILE on exit")
+    api_cmd.add_argument("--trace-memory", action="store_true", help="With --profile, also trace allocations")
+    
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+    if args.command == "proxy":
+        return run_proxy_command(args)
+    if args.command == "relay":
+        return run_relay_command(args)
+    if args.command == "bundle":
+        return run_bundle_command(args)
+    if args.command == "timeline":
+        return run_timeline_command(args)
+    if args.command == "package":
+        return run_package_command(args)
+    if args.command == "plugins":
+        return run_plugins_command(args)
+    if args.command == "watch":
+        return run_watch_command(args)
+    if args.command == "api":
+        return run_api_command(args)
+    
     root = tk.Tk()
     
     # Try to set theme
@@ -1130,6 +2475,15 @@ def main():
     
     # Handle window close
     def on_closing():
+        if app.dev_watcher:
+            app.dev_watcher.stop()
+        if app.control_server:
+            app.stop_control_api()
+        if app.ui_monitor:
+            import uiprofile
+            app.ui_monitor.dump(os.path.join(get_app_data_dir(), uiprofile.REPORT_FILE))
+        if app.job_profiler:
+            app.job_profiler.dump(os.path.join(get_app_data_dir(), jobprofile.REPORT_FILE))
         app.save_config()
         root.destroy()
     
@@ -1138,4 +2492,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Merged timeline of BepInEx logs from the host and every client.
+Each file is streamed line by line, its timestamps are shifted by a per-file
+clock offset, and heapq.merge interleaves the files, so memory stays
+proportional to the number of files rather than their size.
+
+BepInEx writes no timestamps itself; MegabonkMP's ModLogger prefixes its
+messages with UTC time. Lines from other plugins and continuation lines (stack
+traces) take the time of the line before them.
+"""
+
+import os
+import re
+import glob
+import heapq
+import itertools
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+Entry = namedtuple("Entry", "time source line level packet text")
+
+# [Level  :   Source] message  (BepInEx disk log)
+BEPINEX_LINE = re.compile(r"^\[(?P<level>Fatal|Error|Warning|Message|Info|Debug)\s*:\s*[^\]]*\]\s?(?P<message>.*)$")
+# 2026-10-19 12:34:56,789 [INFO] message  (launcher.log)
+LAUNCHER_LINE = re.compile(r"^(?P<stamp>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \[(?P<level>[A-Z]+)\] (?P<message>.*)$")
+# [2026-10-19T12:34:56.789Z] or [12:34:56] at the start of a message
+STAMP = re.compile(r"^\[(?P<stamp>\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:[.,]\d+)?(?:Z|[+-]\d\d:?\d\d)?"
+                   r"|\d\d:\d\d:\d\d(?:[.,]\d+)?)\]\s?")
+# ModLogger.Network / ModLogger.Sync prefixes
+PACKET_TAGS = ("[NET]", "[SYNC]")
+
+LEVELS = {"debug": 0, "info": 1, "message": 1, "warning": 2, "error": 3, "fatal": 4}
+LEVEL_ALIASES = {"warn": "warning", "critical": "fatal", "err": "error", "dbg": "debug"}
+
+# Untimed lines held back while looking for a file's first timestamp
+LEAD_LINES = 10000
+UNKNOWN_TIME = float("-inf")
+
+
+def normalize_level(name):
+    name = name.lower()
+    name = LEVEL_ALIASES.get(name, name)
+    return name if name in LEVELS else "info"
+
+
+def parse_stamp(text, mtime=None):
+    """Seconds since the epoch for an ISO or time-of-day stamp; naive times are local.
+
+    A time of day is placed on the date of the file's last write, or the day
+    before when it is later than that write (the log ran over midnight).
+    """
+    text = text.replace(",", ".")
+    if len(text) > 15:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    if mtime is None:
+        return None
+    written = datetime.fromtimestamp(mtime)
+    clock = datetime.strptime(text.split(".")[0], "%H:%M:%S")
+    fraction = float("0." + text.split(".")[1]) if "." in text else 0.0
+    stamp = written.replace(hour=clock.hour, minute=clock.minute, second=clock.second, microsecond=0)
+    if stamp > written + timedelta(minutes=1):
+        stamp -= timedelta(days=1)
+    return stamp.timestamp() + fraction
+
+
+def parse_line(line, mtime=None):
+    """(time or None, level or None, packet, message) for one log line; level None means continuation"""
+    time = None
+    level = None
+    message = line
+    match = BEPINEX_LINE.match(line)
+    if match:
+        level = normalize_level(match.group("level"))
+        message = match.group("message")
+    else:
+        match = LAUNCHER_LINE.match(line)
+        if match:
+            level = normalize_level(match.group("level"))
+            message = match.group("message")
+            time = parse_stamp(match.group("stamp"))
+    if level is not None and time is None:
+        stamp = STAMP.match(message)
+        if stamp:
+            try:
+                time = parse_stamp(stamp.group("stamp"), mtime)
+            except ValueError:
+                time = None
+            else:
+                message = message[stamp.end():]
+    packet = level is not None and (message.startswith(PACKET_TAGS) or "packet" in message.lower())
+    return time, level, packet, message
+
+
+class LogSource:
+    """One participant's log file with the clock offset that aligns it to the others"""
+
+    def __init__(self, path, label=None, offset=0.0):
+        self.path = path
+        self.label = label or os.path.basename(path)
+        self.offset = offset
+
+    def entries(self):
+        """Yield Entry tuples in file order with corrected, non-decreasing times"""
+        mtime = os.path.getmtime(self.path)
+        last = None
+        level = "info"
+        packet = False
+        pending = []
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            for number, line in enumerate(f, 1):
+                line = line.rstrip("\r\n")
+                if not line.strip():
+                    continue
+                time, line_level, line_packet, message = parse_line(line, mtime)
+                if line_level is not None:
+                    level, packet = line_level, line_packet
+                if time is not None:
+                    time += self.offset
+                    # Clock steps backwards would break the merge order
+                    last = time if last is None else max(last, time)
+                    for held in pending:
+                        yield held._replace(time=last)
+                    pending = []
+                entry = Entry(last, self.label, number, level, packet, message)
+                if last is None:
+                    pending.append(entry)
+                    if len(pending) >= LEAD_LINES:
+                        for held in pending:
+                            yield held._replace(time=UNKNOWN_TIME)
+                        pending = []
+                        last = UNKNOWN_TIME
+                    continue
+                yield entry
+        for held in pending:
+            yield held._replace(time=UNKNOWN_TIME)
+
+    def first_match(self, pattern):
+        """Uncorrected time of the first message matching a regex, or None"""
+        regex = re.compile(pattern)
+        offset, self.offset = self.offset, 0.0
+        try:
+            for entry in self.entries():
+                if entry.time != UNKNOWN_TIME and regex.search(entry.text):
+                    return entry.time
+        finally:
+            self.offset = offset
+        return None
+
+
+def unique_labels(paths):
+    """Short distinct names: the file name, or the nearest folder name that tells the paths apart"""
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(set(names)) == len(names):
+        return names
+    parts = [os.path.abspath(path).replace("\\", "/").split("/")[::-1] for path in paths]
+    for depth in range(1, max(len(p) for p in parts)):
+        column = [p[depth] if depth < len(p) else "" for p in parts]
+        if len(set(column)) == len(column):
+            return column
+    return [f"{name}#{index}" for index, name in enumerate(names, 1)]
+
+
+def local_instance_logs(game_path):
+    """LogOutput.log plus the numbered files BepInEx writes when several instances run at once"""
+    folder = os.path.join(game_path, "BepInEx")
+    found = glob.glob(os.path.join(folder, "LogOutput*.log")) + glob.glob(os.path.join(folder, "LogOutput.log.*"))
+    return sorted(set(found))
+
+
+def sync_offsets(sources, pattern):
+    """Set each source's offset so the first line matching pattern happens at the same time in all.
+
+    The first source that matches is the reference. Returns the labels that never matched.
+    """
+    reference = None
+    unmatched = []
+    for source in sources:
+        time = source.first_match(pattern)
+        if time is None:
+            unmatched.append(source.label)
+        elif reference is None:
+            reference = time + source.offset
+        else:
+            source.offset = reference - time
+    return unmatched
+
+
+def merge(sources):
+    """k-way merge of every source's entries by corrected time; ties keep file order"""
+    return heapq.merge(*(source.entries() for source in sources), key=lambda entry: entry.time)
+
+
+def select(entries, min_level=None, packets_only=False, start=None, end=None):
+    """Filter merged entries; stops reading as soon as the window has passed"""
+    threshold = LEVELS[normalize_level(min_level)] if min_level else 0
+    for entry in entries:
+        if end is not None and entry.time > end:
+            return
+        if start is not None and entry.time < start:
+            continue
+        if LEVELS[entry.level] < threshold or (packets_only and not entry.packet):
+            continue
+        yield entry
+
+
+def resolve_time(text, sources):
+    """Seconds since the epoch for --at: an ISO time, or a time of day on the date the logs start"""
+    text = text.strip().replace(",", ".")
+    if not re.fullmatch(r"\d\d?:\d\d:\d\d(\.\d+)?|\d{4}-\d\d-\d\d[T ].+", text):
+        raise ValueError(f"Unrecognized time {text!r}; use HH:MM:SS[.fff] or an ISO date and time")
+    if len(text) > 15:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    first = next((entry.time for entry in merge(sources) if entry.time != UNKNOWN_TIME), None)
+    if first is None:
+        raise ValueError("None of the logs have timestamps")
+    clock = datetime.strptime(text.split(".")[0], "%H:%M:%S")
+    fraction = float("0." + text.split(".")[1]) if "." in text else 0.0
+    start = datetime.fromtimestamp(first)
+    stamp = start.replace(hour=clock.hour, minute=clock.minute, second=clock.second, microsecond=0)
+    if stamp.timestamp() + fraction < first - 12 * 3600:
+        stamp += timedelta(days=1)
+    return stamp.timestamp() + fraction
+
+
+def window(sources, at, seconds, min_level=None, packets_only=False, limit=None):
+    """Entries within `seconds` of `at` across every source (the jump-to-time view)"""
+    entries = select(merge(sources), min_level, packets_only, at - seconds, at + seconds)
+    return list(itertools.islice(entries, limit)) if limit else list(entries)
+
+
+def format_time(time):
+    if time is None or time == UNKNOWN_TIME:
+        return "??:??:??.???"
+    stamp = datetime.fromtimestamp(time)
+    return stamp.strftime("%H:%M:%S.") + f"{stamp.microsecond // 1000:03d}"
+
+
+def format_entry(entry, label_width=10):
+    return f"{format_time(entry.time)} {entry.source:<{label_width}} {entry.level[:4].upper():<4} {entry.text}"
@@ -0,0 +1,272 @@
+"""
+Round-trip editor for the mod's BepInEx config (com.megabonk.multiplayer.cfg).
+Parses the file into lines, changes only the values the launcher manages and
+writes it back atomically, and only when the content actually changed.
+Comments, ordering, unknown sections and keys the launcher doesn't know are
+kept as they are.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+import jobprofile
+
+CONFIG_FILE = "com.megabonk.multiplayer.cfg"
+PLUGIN_GUID = "com.megabonk.multiplayer"
+
+Setting = namedtuple("Setting", "section key type default description range")
+
+# Mirrors src/Core/Config.cs; BepInEx type names as written in "# Setting type:"
+SCHEMA = [
+    Setting("Network", "ServerAddress", "String", "127.0.0.1", "IP address to connect to or host on", None),
+    Setting("Network", "ServerPort", "Int32", 7777, "Port for multiplayer connections", (1024, 65535)),
+    Setting("Network", "MaxPlayers", "Int32", 4, "Maximum players in a session", (2, 6)),
+    Setting("Network", "TickRate", "Int32", 60, "Network updates per second", (20, 128)),
+    Setting("Gameplay", "FriendlyFire", "Boolean", False, "Allow players to damage each other", None),
+    Setting("Gameplay", "SharedLoot", "Boolean", True, "Share loot drops among all players", None),
+    Setting("Gameplay", "XpMultiplier", "Single", 2.0,
+            "XP multiplier for multiplayer (2x for 2-4 players recommended)", (1.0, 5.0)),
+    Setting("Gameplay", "CreditTimerMultiplier", "Single", 1.5, "Credit timer scaling for multiplayer", (1.0, 3.0)),
+    Setting("UI", "ShowPlayerNameplates", "Boolean", True, "Display nameplates above other players", None),
+    Setting("UI", "ShowPlayerHealth", "Boolean", True, "Show health bars on player nameplates", None),
+    Setting("UI", "NameplateDistance", "Single", 50.0, "Maximum distance to show nameplates", (10.0, 100.0)),
+    Setting("Debug", "DebugMode", "Boolean", False, "Enable debug logging and features", None),
+    Setting("Debug", "LogNetworkPackets", "Boolean", False, "Log all network packets (verbose)", None),
+    Setting("Debug", "ShowNetworkStats", "Boolean", False, "Display network statistics overlay", None),
+]
+SETTINGS = {(setting.section, setting.key): setting for setting in SCHEMA}
+TYPE_NAMES = {"String": "text", "Int32": "a whole number", "Single": "a number", "Boolean": "true or false"}
+
+# Launcher config keys and the cfg entries they drive
+LAUNCHER_KEYS = {
+    "server_address": ("Network", "ServerAddress"),
+    "server_port": ("Network", "ServerPort"),
+    "max_players": ("Network", "MaxPlayers"),
+    "friendly_fire": ("Gameplay", "FriendlyFire"),
+    "shared_loot": ("Gameplay", "SharedLoot"),
+    "xp_multiplier": ("Gameplay", "XpMultiplier"),
+    "show_nameplates": ("UI", "ShowPlayerNameplates"),
+    "show_network_stats": ("Debug", "ShowNetworkStats"),
+    "debug_mode": ("Debug", "DebugMode"),
+}
+
+SECTION_LINE = re.compile(r"^\s*\[(?P<name>[^\]]+)\]\s*$")
+ENTRY_LINE = re.compile(r"^(?P<key>\s*[^#=\s][^=]*?)(?P<equals>\s*=\s*)(?P<value>.*?)(?P<end>[\r\n]*)$")
+
+
+class ConfigError(Exception):
+    """A value the mod would reject"""
+
+
+def format_value(setting, value):
+    """Write a value the way BepInEx's TomlTypeConverter does"""
+    if setting.type == "Boolean":
+        return "true" if value else "false"
+    if setting.type == "Int32":
+        return str(int(value))
+    if setting.type == "Single":
+        return format(float(value), ".9g")
+    return str(value)
+
+
+def parse_value(setting, text):
+    """Convert a cfg value to Python; raises ValueError for malformed values"""
+    text = text.strip()
+    if setting.type == "Boolean":
+        if text.lower() not in ("true", "false"):
+            raise ValueError(f"expected true or false, got {text!r}")
+        return text.lower() == "true"
+    if setting.type == "Int32":
+        return int(text)
+    if setting.type == "Single":
+        return float(text)
+    return text
+
+
+def coerce_value(setting, value):
+    """Convert a launcher or JSON value to the setting's type (numbers may arrive as strings).
+
+    Raises ValueError, TypeError or OverflowError when it cannot be converted.
+    """
+    if setting.type == "Boolean":
+        if not isinstance(value, bool):
+            raise ValueError
+        return value
+    if setting.type == "Int32":
+        if isinstance(value, bool):
+            raise ValueError
+        number = float(value)
+        if number != int(number):
+            raise ValueError
+        return int(number)
+    if setting.type == "Single":
+        return float(value)
+    return value
+
+
+def validate(values):
+    """Check {(section, key): value} against the schema; returns a list of messages"""
+    errors = []
+    for (section, key), value in values.items():
+        setting = SETTINGS.get((section, key))
+        if setting is None:
+            continue
+        name = f"{section}.{key}"
+        try:
+            value = coerce_value(setting, value)
+        except (TypeError, ValueError, OverflowError):
+            errors.append(f"{name} must be {TYPE_NAMES[setting.type]}")
+            continue
+        if setting.type == "String" and not str(value).strip():
+            errors.append(f"{name} must not be empty")
+        if setting.range and not setting.range[0] <= value <= setting.range[1]:
+            low, high = setting.range
+            errors.append(f"{name} must be between {format_value(setting, low)} and {format_value(setting, high)}")
+    return errors
+
+
+def values_from_launcher(config):
+    """Map launcher settings to {(section, key): value}"""
+    return {LAUNCHER_KEYS[name]: value for name, value in config.items() if name in LAUNCHER_KEYS}
+
+
+class ConfigDocument:
+    """A BepInEx .cfg file as a list of lines that can be edited in place"""
+
+    def __init__(self, text=""):
+        self.bom = text.startswith("\ufeff")
+        text = text[1:] if self.bom else text
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        self.lines = text.splitlines(keepends=True)
+        self._index()
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return cls(f.read())
+
+    def _index(self):
+        """Map (section, key) to line numbers and each section to its last line"""
+        self.entries = {}
+        self.section_ends = {}
+        section = None
+        for number, line in enumerate(self.lines):
+            match = SECTION_LINE.match(line)
+            if match:
+                section = match.group("name").strip()
+                self.section_ends[section] = number
+                continue
+            if section is None:
+                continue
+            if line.strip():
+                self.section_ends[section] = number
+            match = ENTRY_LINE.match(line)
+            if match and not line.lstrip().startswith("#"):
+                self.entries[(section, match.group("key").strip())] = number
+
+    def get(self, section, key):
+        """Raw value text, or None when the key is absent"""
+        number = self.entries.get((section, key))
+        if number is None:
+            return None
+        return ENTRY_LINE.match(self.lines[number]).group("value")
+
+    def values(self):
+        """Parsed values of every schema entry in the file; malformed ones are skipped"""
+        result = {}
+        for section, key in self.entries:
+            setting = SETTINGS.get((section, key))
+            if setting:
+                try:
+                    result[(section, key)] = parse_value(setting, self.get(section, key))
+                except ValueError:
+                    pass
+        return result
+
+    def set(self, section, key, value_text):
+        """Set a value, keeping the line's own spacing; adds the entry if missing"""
+        number = self.entries.get((section, key))
+        if number is not None:
+            match = ENTRY_LINE.match(self.lines[number])
+            end = match.group("end") or self.newline
+            self.lines[number] = f"{match.group('key')}{match.group('equals')}{value_text}{end}"
+            return
+        self._insert(section, self._entry_block(section, key, value_text))
+
+    def _entry_block(self, section, key, value_text):
+        """An entry with the comments BepInEx itself writes"""
+        setting = SETTINGS.get((section, key))
+        lines = [""]
+        if setting:
+            lines.append(f"## {setting.description}")
+            lines.append(f"# Setting type: {setting.type}")
+            lines.append(f"# Default value: {format_value(setting, setting.default)}")
+            if setting.range:
+                lines.append(f"# Acceptable value range: From {format_value(setting, setting.range[0])} "
+                             f"to {format_value(setting, setting.range[1])}")
+        lines.append(f"{key} = {value_text}")
+        return lines
+
+    def _insert(self, section, block):
+        if self.lines and not self.lines[-1].endswith(("\n", "\r")):
+            self.lines[-1] += self.newline
+        if section in self.section_ends:
+            at = self.section_ends[section] + 1
+        else:
+            if self.lines and self.lines[-1].strip():
+                self.lines.append(self.newline)
+            self.lines.append(f"[{section}]{self.newline}")
+            at = len(self.lines)
+        self.lines[at:at] = [line + self.newline for line in block]
+        self._index()
+
+    def render(self):
+        return ("\ufeff" if self.bom else "") + "".join(self.lines)
+
+
+def new_document():
+    """An empty file with the header BepInEx writes for the plugin"""
+    return ConfigDocument(f"## Settings file was created by plugin MegabonkMP\n## Plugin GUID: {PLUGIN_GUID}\n")
+
+
+def update_config(path, values, fill_defaults=True):
+    """Apply {(section, key): value} to the cfg at path.
+
+    Validates first (raises ConfigError), fills in any schema entries the file
+    lacks with their defaults, and writes atomically only if the text changed.
+    Returns the list of "Section.Key" entries whose value changed.
+    """
+    errors = validate(values)
+    if errors:
+        raise ConfigError("; ".join(errors))
+
+    exists = os.path.exists(path)
+    document = ConfigDocument.load(path) if exists else new_document()
+    before = document.render()
+    changed = []
+    for setting in SCHEMA:
+        pair = (setting.section, setting.key)
+        if pair in values:
+            text = format_value(setting, coerce_value(setting, values[pair]))
+        elif fill_defaults and document.get(*pair) is None:
+            text = format_value(setting, setting.default)
+        else:
+            continue
+        current = document.get(*pair)
+        if current is None or current.strip() != text:
+            document.set(setting.section, setting.key, text)
+            changed.append(f"{setting.section}.{setting.key}")
+
+    after = document.render()
+    if exists and after == before:
+        return []
+    with jobprofile.span("write cfg", changed=len(changed)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(after)
+        os.replace(tmp_path, path)
+    return changed
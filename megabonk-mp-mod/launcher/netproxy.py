@@ -0,0 +1,430 @@
+"""
+Network impairment proxy for the Megabonk MP Launcher.
+Relays UDP between game clients and a MegabonkMP server while injecting latency,
+jitter, loss bursts, duplication, reordering and bandwidth limits.
+
+Scenarios are JSON files made of timed phases, for example:
+
+    {
+      "name": "flaky wifi",
+      "seed": 42,
+      "loop": false,
+      "phases": [
+        {"duration": 20, "both": {"latency_ms": 60, "jitter_ms": 15, "loss": 0.02}},
+        {"duration": 12, "both": {"loss": 1.0}},
+        {"duration": 30,
+         "to_server": {"latency_ms": 120, "latency_dist": "pareto", "latency_spread_ms": 40},
+         "to_client": {"bandwidth_kbps": 256, "reorder": 0.05},
+         "packet_types": {"PlayerPosition": {"to_server": {"duplicate": 0.1}}}}
+      ]
+    }
+
+Directions are "to_server", "to_client" or "both"; "packet_types" overrides the
+direction settings for individual PacketType names, including packets inside a Batch.
+"""
+
+import csv
+import json
+import time
+import random
+import asyncio
+from collections import defaultdict
+
+import wire
+
+DIRECTIONS = {"to_server": wire.TO_SERVER, "to_client": wire.TO_CLIENT}
+DIRECTION_NAMES = {value: name for name, value in DIRECTIONS.items()}
+
+SESSION_IDLE_TIMEOUT = 60.0
+MAX_QUEUE_DELAY = 1.0  # seconds of bandwidth backlog before tail drop
+
+
+class Impairment:
+    """Impairment settings for one direction (and optionally one packet type)"""
+
+    FIELDS = {
+        "latency_ms": 0.0,           # base one-way delay
+        "latency_dist": "constant",  # constant, uniform, normal, pareto
+        "latency_spread_ms": 0.0,    # uniform half-width, normal stddev or pareto scale
+        "jitter_ms": 0.0,            # extra uniform +/- jitter
+        "loss": 0.0,                 # loss probability outside bursts
+        "burst_start": 0.0,          # probability per packet of entering a loss burst
+        "burst_length": 10.0,        # mean burst length in packets
+        "burst_loss": 1.0,           # loss probability inside a burst
+        "duplicate": 0.0,            # probability of sending a second copy
+        "reorder": 0.0,              # probability of holding a packet back
+        "reorder_ms": 30.0,          # how long reordered packets are held back
+        "bandwidth_kbps": 0.0,       # 0 = unlimited
+    }
+
+    def __init__(self, **settings):
+        unknown = set(settings) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown impairment setting(s): {', '.join(sorted(unknown))}")
+        for name, default in self.FIELDS.items():
+            setattr(self, name, settings.get(name, default))
+        if self.latency_dist not in ("constant", "uniform", "normal", "pareto"):
+            raise ValueError(f"Unknown latency distribution: {self.latency_dist}")
+
+    def merged(self, overrides):
+        settings = {name: getattr(self, name) for name in self.FIELDS}
+        settings.update(overrides)
+        return Impairment(**settings)
+
+    def sample_latency(self, rng):
+        """One-way delay in seconds"""
+        base = self.latency_ms
+        spread = self.latency_spread_ms
+        if self.latency_dist == "uniform":
+            delay = rng.uniform(base - spread, base + spread)
+        elif self.latency_dist == "normal":
+            delay = rng.gauss(base, spread)
+        elif self.latency_dist == "pareto":
+            delay = base + spread * (rng.paretovariate(2.5) - 1.0)
+        else:
+            delay = base
+        if self.jitter_ms:
+            delay += rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(delay, 0.0) / 1000.0
+
+
+class Phase:
+    """A timed section of a scenario"""
+
+    def __init__(self, duration=None, both=None, to_server=None, to_client=None, packet_types=None):
+        self.duration = duration
+        base = Impairment(**(both or {}))
+        self.directions = {
+            wire.TO_SERVER: base.merged(to_server or {}),
+            wire.TO_CLIENT: base.merged(to_client or {}),
+        }
+        self.overrides = {}
+        for type_name, settings in (packet_types or {}).items():
+            ptype = int(wire.parse_packet_type(type_name))
+            shared = settings.get("both", {})
+            for direction_name, direction in DIRECTIONS.items():
+                specific = settings.get(direction_name, {})
+                if shared or specific:
+                    self.overrides[(direction, ptype)] = self.directions[direction].merged({**shared, **specific})
+
+    def impairment(self, direction, ptype):
+        return self.overrides.get((direction, ptype), self.directions[direction])
+
+
+class Scenario:
+    """Sequence of phases; the last phase lasts forever unless the scenario loops"""
+
+    def __init__(self, phases, name="custom", loop=False, seed=None):
+        self.phases = phases or [Phase()]
+        self.name = name
+        self.loop = loop
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, data):
+        phases = [Phase(**phase) for phase in data.get("phases", [])]
+        return cls(phases, data.get("name", "custom"), data.get("loop", False), data.get("seed"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def cycle_length(self):
+        if any(p.duration is None for p in self.phases):
+            return None
+        return sum(p.duration for p in self.phases)
+
+    def phase_at(self, elapsed):
+        """Return (index, phase) active `elapsed` seconds after start"""
+        cycle = self.cycle_length
+        if self.loop and cycle:
+            elapsed %= cycle
+        for index, phase in enumerate(self.phases):
+            if phase.duration is None or elapsed < phase.duration:
+                return index, phase
+            elapsed -= phase.duration
+        return len(self.phases) - 1, self.phases[-1]
+
+
+class ProxyStats:
+    """Per-direction, per-packet-type counters plus an optional per-packet CSV log"""
+
+    COLUMNS = ("time", "direction", "packet_type", "size", "action", "delay_ms", "phase")
+
+    def __init__(self, packet_log_path=None):
+        self.counters = defaultdict(lambda: defaultdict(float))
+        self.packet_log = None
+        self._log_file = None
+        if packet_log_path:
+            self._log_file = open(packet_log_path, "w", newline="", encoding="utf-8")
+            self.packet_log = csv.writer(self._log_file)
+            self.packet_log.writerow(self.COLUMNS)
+
+    def record(self, elapsed, direction, ptype, size, action, delay, phase):
+        key = (DIRECTION_NAMES[direction], wire.packet_type_name(ptype) if ptype is not None else "Invalid")
+        counters = self.counters[key]
+        counters[action] += 1
+        if action not in ("dropped", "duplicate_dropped"):
+            counters["bytes"] += size
+            counters["delay_total"] += delay
+            counters["delay_max"] = max(counters["delay_max"], delay)
+        else:
+            counters["bytes_dropped"] += size
+        if self.packet_log:
+            self.packet_log.writerow((f"{elapsed:.6f}", key[0], key[1], size, action,
+                                      f"{delay * 1000:.2f}", phase))
+
+    def summary(self):
+        result = {}
+        for (direction, type_name), counters in sorted(self.counters.items()):
+            # Reordered packets are forwarded too, just late; duplicate copies are counted
+            # apart so forwarded + dropped is the number of packets the sender sent
+            forwarded = counters["forwarded"] + counters["reordered"]
+            duplicated = counters["duplicated"] + counters["duplicate_reordered"]
+            sent = forwarded + duplicated
+            result.setdefault(direction, {})[type_name] = {
+                "forwarded": int(forwarded),
+                "dropped": int(counters["dropped"]),
+                "duplicated": int(duplicated),
+                "duplicates_dropped": int(counters["duplicate_dropped"]),
+                "reordered": int(counters["reordered"]),
+                "duplicates_reordered": int(counters["duplicate_reordered"]),
+                "loss_rate": counters["dropped"] / max(forwarded + counters["dropped"], 1),
+                "bytes": int(counters["bytes"]),
+                "mean_delay_ms": counters["delay_total"] / max(sent, 1) * 1000,
+                "max_delay_ms": counters["delay_max"] * 1000,
+            }
+        return result
+
+    def close(self):
+        if self._log_file:
+            self._log_file.close()
+
+
+class _Link:
+    """Shapes one direction: impairment decisions, bandwidth queue and ordering"""
+
+    def __init__(self, proxy, direction):
+        self.proxy = proxy
+        self.direction = direction
+        self.next_free = 0.0
+        self.last_departure = 0.0
+        self.in_burst = defaultdict(bool)
+
+    def submit(self, datagram, send):
+        proxy = self.proxy
+        elapsed = time.monotonic() - proxy.started
+        phase_index, phase = proxy.scenario.phase_at(elapsed)
+        delivery, sequence, packet = wire.unwrap(datagram)
+        if not packet or packet[0] != wire.PacketType.Batch:
+            ptype = wire.packet_type(datagram)
+            self._shape(datagram, [(ptype, len(datagram))], ptype, phase.impairment(self.direction, ptype),
+                        phase_index, send)
+            return
+
+        # A relay with a tick rate batches its packets, so per-type rules apply to the records:
+        # records that get the same impairment stay together and are shaped as one batch
+        groups = {}
+        for inner in wire.unbatch(packet):
+            ptype = inner[0] if inner else None
+            impairment = phase.impairment(self.direction, ptype)
+            groups.setdefault(id(impairment), (ptype, impairment, []))[2].append(inner)
+        for ptype, impairment, records in groups.values():
+            if len(groups) > 1:
+                datagram = wire.wrap(wire.batch_packet(records), delivery, sequence)
+            self._shape(datagram, [(inner[0] if inner else None, len(inner)) for inner in records],
+                        ptype, impairment, phase_index, send)
+
+    def _shape(self, datagram, packets, burst_key, impairment, phase_index, send):
+        """Drop, duplicate, delay or reorder one datagram carrying packets, a list of (type, size)"""
+        proxy = self.proxy
+        now = time.monotonic()
+        elapsed = now - proxy.started
+        rng = proxy.rng
+
+        def record(action, delay):
+            for ptype, size in packets:
+                proxy.stats.record(elapsed, self.direction, ptype, size, action, delay, phase_index)
+
+        # Gilbert-Elliott loss: bursts are tracked per packet type
+        if self.in_burst[burst_key]:
+            if rng.random() < 1.0 / max(impairment.burst_length, 1.0):
+                self.in_burst[burst_key] = False
+        elif impairment.burst_start and rng.random() < impairment.burst_start:
+            self.in_burst[burst_key] = True
+        loss = impairment.burst_loss if self.in_burst[burst_key] else impairment.loss
+        if loss and rng.random() < loss:
+            record("dropped", 0.0)
+            return
+
+        copies = 2 if impairment.duplicate and rng.random() < impairment.duplicate else 1
+        for copy in range(copies):
+            departure = now + impairment.sample_latency(rng)
+
+            if impairment.bandwidth_kbps:
+                serialization = len(datagram) * 8 / (impairment.bandwidth_kbps * 1000)
+                start = max(now, self.next_free)
+                if start - now > MAX_QUEUE_DELAY:
+                    record("duplicate_dropped" if copy else "dropped", 0.0)
+                    return
+                self.next_free = start + serialization
+                departure += self.next_free - now
+
+            action = "duplicated" if copy else "forwarded"
+            if impairment.reorder and rng.random() < impairment.reorder:
+                departure += impairment.reorder_ms / 1000.0
+                action = "duplicate_reordered" if copy else "reordered"
+            else:
+                # Keep FIFO order unless this packet was chosen for reordering
+                departure = max(departure, self.last_departure)
+                self.last_departure = departure
+
+            delay = departure - now
+            record(action, delay)
+            if proxy.capture:
+                proxy.capture.write(elapsed + delay, self.direction, datagram)
+            if delay <= 0:
+                send(datagram)
+            else:
+                proxy.loop.call_later(delay, send, datagram)
+
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    """Listening socket facing the game clients"""
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+
+    def connection_made(self, transport):
+        self.proxy.listen_transport = transport
+
+    def datagram_received(self, data, addr):
+        self.proxy.from_client(data, addr)
+
+
+class _UpstreamProtocol(asyncio.DatagramProtocol):
+    """Per-client socket facing the server, so the server sees one endpoint per client"""
+
+    def __init__(self, proxy, client_addr):
+        self.proxy = proxy
+        self.client_addr = client_addr
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.proxy.from_server(data, self.client_addr)
+
+
+class ImpairmentProxy:
+    """UDP proxy between game clients and `upstream` with scenario-driven impairments"""
+
+    def __init__(self, upstream, listen=("127.0.0.1", 7778), scenario=None, stats=None, capture=None):
+        self.upstream = upstream
+        self.listen = listen
+        self.scenario = scenario or Scenario([Phase()])
+        self.stats = stats or ProxyStats()
+        self.capture = capture
+        self.rng = random.Random(self.scenario.seed)
+        self.loop = None
+        self.listen_transport = None
+        self.started = time.monotonic()
+        self.sessions = {}
+        self.links = {direction: _Link(self, direction) for direction in DIRECTION_NAMES}
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.started = time.monotonic()
+        await self.loop.create_datagram_endpoint(lambda: _ClientProtocol(self), local_addr=self.listen)
+        self.loop.create_task(self._expire_sessions())
+
+    def from_client(self, data, addr):
+        session = self.sessions.get(addr)
+        if session is None:
+            session = {"protocol": None, "pending": [], "last_seen": time.monotonic()}
+            self.sessions[addr] = session
+            self.loop.create_task(self._open_upstream(addr, session))
+        session["last_seen"] = time.monotonic()
+        self.links[wire.TO_SERVER].submit(data, lambda d: self._send_upstream(session, d))
+
+    def from_server(self, data, client_addr):
+        if client_addr in self.sessions:
+            self.sessions[client_addr]["last_seen"] = time.monotonic()
+        self.links[wire.TO_CLIENT].submit(data, lambda d: self._send_client(client_addr, d))
+
+    async def _open_upstream(self, addr, session):
+        _, protocol = await self.loop.create_datagram_endpoint(
+            lambda: _UpstreamProtocol(self, addr), remote_addr=self.upstream)
+        session["protocol"] = protocol
+        for data in session.pop("pending"):
+            protocol.transport.sendto(data)
+
+    def _send_upstream(self, session, data):
+        protocol = session.get("protocol")
+        if protocol is None:
+            session.setdefault("pending", []).append(data)
+        elif protocol.transport is not None:
+            protocol.transport.sendto(data)
+
+    def _send_client(self, addr, data):
+        if self.listen_transport is not None:
+            self.listen_transport.sendto(data, addr)
+
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(5)
+            now = time.monotonic()
+            for addr, session in list(self.sessions.items()):
+                if now - session["last_seen"] > SESSION_IDLE_TIMEOUT:
+                    protocol = session.get("protocol")
+                    if protocol is not None and protocol.transport is not None:
+                        protocol.transport.close()
+                    del self.sessions[addr]
+
+    def close(self):
+        if self.listen_transport is not None:
+            self.listen_transport.close()
+        for session in self.sessions.values():
+            protocol = session.get("protocol")
+            if protocol is not None and protocol.transport is not None:
+                protocol.transport.close()
+        self.sessions.clear()
+
+
+def run_proxy(upstream, listen, scenario=None, duration=None, stats_path=None, packet_log_path=None,
+              capture_path=None, log=print):
+    """Run the proxy until interrupted (or for `duration` seconds); returns the stats summary"""
+    stats = ProxyStats(packet_log_path)
+    capture = wire.CaptureWriter(capture_path) if capture_path else None
+    proxy = ImpairmentProxy(upstream, listen, scenario, stats, capture)
+
+    async def main():
+        await proxy.start()
+        log(f"Proxy listening on {listen[0]}:{listen[1]} -> {upstream[0]}:{upstream[1]} "
+            f"(scenario: {proxy.scenario.name})")
+        try:
+            if duration:
+                await asyncio.sleep(duration)
+            else:
+                await asyncio.Event().wait()
+        finally:
+            proxy.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats.close()
+        if capture:
+            capture.close()
+
+    summary = stats.summary()
+    if stats_path:
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump({"scenario": proxy.scenario.name, "directions": summary}, f, indent=2)
+        log(f"Stats written to {stats_path}")
+    return summary
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Packet-stream compression and quantization analyzer for MegabonkMP.
+Estimates the bandwidth and precision of candidate encodings for PlayerPosition
+and EnemyPosition traffic, using a capture file or synthetic movement.
+
+Usage:
+    python packetlab.py synthetic --players 4 --enemies 300 --seconds 30
+    python packetlab.py capture session.mbcap --json report.json
+"""
+
+import sys
+import json
+import zlib
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not available. Install it with: pip install numpy")
+    sys.exit(1)
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None  # LZ4 results are skipped
+
+import wire
+
+PLAYER_DTYPE = np.dtype([("type", "u1"), ("id", "<i4"), ("pos", "<f4", (3,)), ("vel", "<f4", (3,)),
+                         ("rot", "<f4"), ("ts", "<u4")])
+ENEMY_DTYPE = np.dtype([("type", "u1"), ("id", "<i4"), ("pos", "<f4", (3,)), ("vel", "<f4", (3,)),
+                        ("state", "u1")])
+
+# Quantized layouts: position int24 x3, velocity int16 x3, rotation uint16, timestamp uint16
+QUANT_POS_BYTES = 9
+QUANT_VEL_BYTES = 6
+QUANT_ROT_BYTES = 2
+QUANT_TS_BYTES = 2
+
+
+class Stream:
+    """Position updates of one packet kind, sorted by entity then time"""
+
+    def __init__(self, kind, t, ids, pos, vel, rot=None, ts=None, state=None, rate=None):
+        order = np.lexsort((t, ids))
+        self.kind = kind
+        self.t = np.asarray(t, dtype=np.float64)[order]
+        self.ids = np.asarray(ids, dtype=np.int32)[order]
+        self.pos = np.asarray(pos, dtype=np.float32)[order]
+        self.vel = np.asarray(vel, dtype=np.float32)[order]
+        self.rot = None if rot is None else np.asarray(rot, dtype=np.float32)[order]
+        self.ts = None if ts is None else np.asarray(ts, dtype=np.uint32)[order]
+        self.state = None if state is None else np.asarray(state, dtype=np.uint8)[order]
+        self.rate = rate or self._estimate_rate()
+
+    def __len__(self):
+        return len(self.t)
+
+    @property
+    def dtype(self):
+        return PLAYER_DTYPE if self.kind == "player" else ENEMY_DTYPE
+
+    @property
+    def duration(self):
+        return max(float(self.t.max() - self.t.min()), 1.0 / self.rate) if len(self) else 0.0
+
+    @property
+    def entities(self):
+        return len(np.unique(self.ids))
+
+    @property
+    def same_entity(self):
+        """Mask of samples whose previous sample belongs to the same entity"""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[1:] = self.ids[1:] == self.ids[:-1]
+        return mask
+
+    @property
+    def ticks(self):
+        return np.round(self.t * self.rate).astype(np.int64)
+
+    def _estimate_rate(self):
+        gaps = np.diff(self.t)[self.same_entity[1:]] if len(self) > 1 else np.array([])
+        gaps = gaps[gaps > 0]
+        return float(1.0 / np.median(gaps)) if len(gaps) else 60.0
+
+    def raw_packets(self):
+        """Serialize every update exactly as PacketSerializer would (type byte included)"""
+        records = np.zeros(len(self), dtype=self.dtype)
+        records["type"] = wire.PacketType.PlayerPosition if self.kind == "player" else wire.PacketType.EnemyPosition
+        records["id"] = self.ids
+        records["pos"] = self.pos
+        records["vel"] = self.vel
+        if self.kind == "player":
+            records["rot"] = self.rot
+            records["ts"] = self.ts
+        else:
+            records["state"] = self.state
+        return records
+
+
+def _smooth_noise(rng, count, ticks, rate, components=4, max_hz=0.5):
+    """Sum of random sinusoids, shape (count, ticks), roughly in [-1, 1]"""
+    t = np.arange(ticks) / rate
+    freq = rng.uniform(0.02, max_hz, size=(count, components, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(count, components, 1))
+    weight = rng.uniform(0.5, 1.0, size=(count, components, 1))
+    signal = (weight * np.sin(2 * np.pi * freq * t + phase)).sum(axis=1)
+    return signal / weight.sum(axis=1)
+
+
+def synthetic_players(players=4, seconds=30.0, rate=60, speed=8.0, seed=1, spread=200.0):
+    """Generate smooth player movement sampled at `rate` Hz, starting up to `spread` units apart"""
+    rng = np.random.default_rng(seed)
+    ticks = int(seconds * rate)
+    vel = np.stack([
+        speed * _smooth_noise(rng, players, ticks, rate),
+        2.0 * _smooth_noise(rng, players, ticks, rate, max_hz=2.0),
+        speed * _smooth_noise(rng, players, ticks, rate),
+    ], axis=-1)
+    start = rng.uniform(-spread, spread, size=(players, 1, 3)) * np.array([1, 0.05, 1])
+    pos = start + np.cumsum(vel / rate, axis=1)
+    rot = np.degrees(np.arctan2(vel[..., 0], vel[..., 2])) % 360.0
+
+    t = np.broadcast_to(np.arange(ticks) / rate, (players, ticks))
+    ids = np.broadcast_to(np.arange(players)[:, None], (players, ticks))
+    ts = (t * 1000).astype(np.uint32)
+    return Stream("player", t.ravel(), ids.ravel(), pos.reshape(-1, 3), vel.reshape(-1, 3),
+                  rot=rot.ravel(), ts=ts.ravel(), rate=rate)
+
+
+def synthetic_enemies(enemies=200, seconds=30.0, rate=30, speed=3.5, seed=2):
+    """Generate enemy movement (slower, mostly planar) sampled at `rate` Hz"""
+    rng = np.random.default_rng(seed)
+    ticks = int(seconds * rate)
+    vel = np.stack([
+        speed * _smooth_noise(rng, enemies, ticks, rate, components=3),
+        np.zeros((enemies, ticks)),
+        speed * _smooth_noise(rng, enemies, ticks, rate, components=3),
+    ], axis=-1)
+    start = rng.uniform(-250, 250, size=(enemies, 1, 3)) * np.array([1, 0, 1])
+    pos = start + np.cumsum(vel / rate, axis=1)
+    state = np.where(np.linalg.norm(vel, axis=-1) > speed * 0.3, 2, 1).astype(np.uint8)
+
+    t = np.broadcast_to(np.arange(ticks) / rate, (enemies, ticks))
+    ids = np.broadcast_to(1000 + np.arange(enemies)[:, None], (enemies, ticks))
+    return Stream("enemy", t.ravel(), ids.ravel(), pos.reshape(-1, 3), vel.reshape(-1, 3),
+                  state=state.ravel(), rate=rate)
+
+
+def streams_from_capture(path):
+    """Extract PlayerPosition and EnemyPosition streams from a capture file"""
+    wanted = {
+        wire.PacketType.PlayerPosition: PLAYER_DTYPE,
+        wire.PacketType.EnemyPosition: ENEMY_DTYPE,
+    }
+    payloads = {ptype: [] for ptype in wanted}
+    times = {ptype: [] for ptype in wanted}
+
+    for timestamp, _, datagram in wire.read_capture(path):
+        _, _, packet = wire.unwrap(datagram)
+        if not packet:
+            continue
+        # A relay with a tick rate sends the positions inside Batch datagrams
+        for inner in wire.unbatch(packet):
+            if not inner or inner[0] not in wanted or len(inner) != wanted[inner[0]].itemsize:
+                continue
+            payloads[inner[0]].append(inner)
+            times[inner[0]].append(timestamp)
+
+    streams = []
+    for ptype, dtype in wanted.items():
+        if not payloads[ptype]:
+            continue
+        records = np.frombuffer(b"".join(payloads[ptype]), dtype=dtype)
+        t = np.asarray(times[ptype])
+        if ptype == wire.PacketType.PlayerPosition:
+            streams.append(Stream("player", t, records["id"], records["pos"], records["vel"],
+                                  rot=records["rot"], ts=records["ts"]))
+        else:
+            streams.append(Stream("enemy", t, records["id"], records["pos"], records["vel"],
+                                  state=records["state"]))
+    return streams
+
+
+def varint_size(values):
+    """Bytes needed to store signed integers as zigzag varints"""
+    values = np.asarray(values, dtype=np.int64)
+    zigzag = (values << 1) ^ (values >> 63)
+    size = np.ones(values.shape, dtype=np.int64)
+    for bits in (7, 14, 21, 28, 35):
+        size += zigzag >= (1 << bits)
+    return size
+
+
+class Quantizer:
+    """Fixed-point quantization of position, velocity and rotation"""
+
+    def __init__(self, pos_step=1 / 128, vel_step=1 / 256, rot_bits=16):
+        self.pos_step = pos_step
+        self.vel_step = vel_step
+        self.rot_bits = rot_bits
+
+    def encode(self, stream):
+        q = {
+            "pos": np.round(stream.pos / self.pos_step).astype(np.int64),
+            "vel": np.round(stream.vel / self.vel_step).astype(np.int64),
+        }
+        # Clamp to the wire widths (int24 position, int16 velocity)
+        q["pos"] = np.clip(q["pos"], -(1 << 23), (1 << 23) - 1)
+        q["vel"] = np.clip(q["vel"], -(1 << 15), (1 << 15) - 1)
+        if stream.rot is not None:
+            steps = 1 << self.rot_bits
+            q["rot"] = np.round((stream.rot % 360.0) / 360.0 * steps).astype(np.int64) % steps
+        if stream.ts is not None:
+            q["ts"] = stream.ts.astype(np.int64) & 0xFFFF
+        return q
+
+    def decode(self, q):
+        decoded = {
+            "pos": q["pos"] * self.pos_step,
+            "vel": q["vel"] * self.vel_step,
+        }
+        if "rot" in q:
+            decoded["rot"] = q["rot"] * 360.0 / (1 << self.rot_bits)
+        return decoded
+
+
+def _errors(stream, pos=None, vel=None, rot=None):
+    """Reconstruction error (max and RMS) against the original float32 values"""
+    result = {}
+    for name, original, approx in (("pos", stream.pos, pos), ("vel", stream.vel, vel)):
+        if approx is None:
+            result[name] = (0.0, 0.0)
+            continue
+        err = np.linalg.norm(approx - original, axis=-1)
+        result[name] = (float(err.max()), float(np.sqrt(np.mean(err ** 2))))
+    if stream.rot is not None:
+        if rot is None:
+            result["rot"] = (0.0, 0.0)
+        else:
+            err = np.abs((rot - stream.rot + 180.0) % 360.0 - 180.0)
+            result["rot"] = (float(err.max()), float(np.sqrt(np.mean(err ** 2))))
+    return result
+
+
+def _estimate_velocity(stream, pos):
+    """Velocity the receiver would derive from consecutive positions"""
+    vel = np.zeros_like(stream.vel, dtype=np.float64)
+    same = stream.same_entity
+    dt = np.diff(stream.t)
+    dt[dt <= 0] = 1.0 / stream.rate
+    vel[1:][same[1:]] = ((pos[1:] - pos[:-1]) / dt[:, None])[same[1:]]
+    # First sample of an entity has no history; reuse the next estimate
+    first = np.flatnonzero(~same)
+    following = np.minimum(first + 1, len(stream) - 1)
+    vel[first] = np.where(same[following][:, None], vel[following], 0.0)
+    return vel
+
+
+def _fixed_bytes(stream):
+    """Wrapper + type + entity id bytes of every packet"""
+    return wire.HEADER_SIZE + 1 + varint_size(stream.ids)
+
+
+def _quantized_bytes(stream, elide_velocity=False):
+    size = _fixed_bytes(stream) + QUANT_POS_BYTES
+    if not elide_velocity:
+        size = size + QUANT_VEL_BYTES
+    if stream.kind == "player":
+        size = size + QUANT_ROT_BYTES + QUANT_TS_BYTES
+    else:
+        size = size + 1  # state
+    return size
+
+
+def _delta_bytes(stream, q, ack_delay, elide_velocity=False):
+    """Size of deltas against the last acknowledged update of the same entity"""
+    n = len(stream)
+    idx = np.arange(n)
+    ref = idx - ack_delay
+    # Keyframe when the acked update belongs to another entity (or does not exist)
+    has_ref = ref >= 0
+    has_ref[has_ref] = stream.ids[ref[has_ref]] == stream.ids[idx[has_ref]]
+    ref = np.where(has_ref, ref, idx)
+
+    fields = [q["pos"]]
+    if not elide_velocity:
+        fields.append(q["vel"])
+    if "rot" in q:
+        fields.append(q["rot"][:, None])
+    if "ts" in q:
+        fields.append(q["ts"][:, None])
+    values = np.concatenate(fields, axis=1)
+    deltas = values - values[ref]
+
+    # One change-mask byte, then only the non-zero component deltas as varints
+    delta_size = np.where(deltas != 0, varint_size(deltas), 0).sum(axis=1) + 1
+    if stream.kind == "enemy":
+        delta_size += 1  # state
+    keyframe_size = _quantized_bytes(stream, elide_velocity) - _fixed_bytes(stream) + 1
+    payload = np.where(has_ref, delta_size, keyframe_size)
+    return _fixed_bytes(stream) + payload
+
+
+def _quantized_packets(stream, q, elide_velocity=False):
+    """Serialize quantized updates so batch compression sees realistic bytes"""
+    ptype = wire.PacketType.PlayerPosition if stream.kind == "player" else wire.PacketType.EnemyPosition
+    parts = [np.full((len(stream), 1), ptype, dtype=np.uint8)]
+    parts.append(stream.ids.astype("<i4").view(np.uint8).reshape(-1, 4))
+    parts.append(q["pos"].astype("<i4").view(np.uint8).reshape(-1, 3, 4)[:, :, :3].reshape(-1, 9))
+    if not elide_velocity:
+        parts.append(q["vel"].astype("<i2").view(np.uint8).reshape(-1, 6))
+    if "rot" in q:
+        parts.append(q["rot"].astype("<u2").view(np.uint8).reshape(-1, 2))
+        parts.append(q["ts"].astype("<u2").view(np.uint8).reshape(-1, 2))
+    else:
+        parts.append(stream.state.reshape(-1, 1))
+    return np.ascontiguousarray(np.concatenate(parts, axis=1))
+
+
+def _batched_bytes(stream, packets, compress):
+    """Total bytes when every tick's updates are sent as one compressed datagram"""
+    ticks = stream.ticks
+    order = np.argsort(ticks, kind="stable")
+    ticks = ticks[order]
+    packets = packets[order]
+    boundaries = np.flatnonzero(np.diff(ticks)) + 1
+    total = 0
+    for batch in np.split(packets, boundaries):
+        total += wire.HEADER_SIZE + len(compress(batch.tobytes()))
+    return total
+
+
+def analyze(stream, quantizer, ack_delay=6):
+    """Evaluate every candidate encoding; returns a list of result dicts"""
+    q = quantizer.encode(stream)
+    decoded = quantizer.decode(q)
+    estimated_vel = _estimate_velocity(stream, decoded["pos"])
+    raw_packets = stream.raw_packets()
+    quant_packets = _quantized_packets(stream, q)
+    quant_packets_novel = _quantized_packets(stream, q, elide_velocity=True)
+
+    baseline_total = len(stream) * (wire.HEADER_SIZE + stream.dtype.itemsize)
+    candidates = [
+        ("baseline (float32)", baseline_total, _errors(stream)),
+        ("fixed-point", int(_quantized_bytes(stream).sum()),
+         _errors(stream, decoded["pos"], decoded["vel"], decoded.get("rot"))),
+        ("fixed-point, no velocity", int(_quantized_bytes(stream, elide_velocity=True).sum()),
+         _errors(stream, decoded["pos"], estimated_vel, decoded.get("rot"))),
+        (f"delta vs acked (-{ack_delay} ticks)", int(_delta_bytes(stream, q, ack_delay).sum()),
+         _errors(stream, decoded["pos"], decoded["vel"], decoded.get("rot"))),
+        ("delta, no velocity", int(_delta_bytes(stream, q, ack_delay, elide_velocity=True).sum()),
+         _errors(stream, decoded["pos"], estimated_vel, decoded.get("rot"))),
+        ("zlib batch (float32)", _batched_bytes(stream, raw_packets.view(np.uint8).reshape(len(stream), -1),
+                                               lambda b: zlib.compress(b, 6)), _errors(stream)),
+        ("zlib batch (fixed-point)", _batched_bytes(stream, quant_packets, lambda b: zlib.compress(b, 6)),
+         _errors(stream, decoded["pos"], decoded["vel"], decoded.get("rot"))),
+        ("zlib batch (fixed-point, no velocity)",
+         _batched_bytes(stream, quant_packets_novel, lambda b: zlib.compress(b, 6)),
+         _errors(stream, decoded["pos"], estimated_vel, decoded.get("rot"))),
+    ]
+    if lz4_frame is not None:
+        candidates.append(("lz4 batch (fixed-point)", _batched_bytes(stream, quant_packets, lz4_frame.compress),
+                           _errors(stream, decoded["pos"], decoded["vel"], decoded.get("rot"))))
+
+    duration = stream.duration
+    results = []
+    for name, total, errors in candidates:
+        results.append({
+            "encoding": name,
+            "bytes_per_update": total / len(stream),
+            # Player streams are sent by each player; enemy streams are received by each client
+            "bytes_per_second_per_player": total / duration / (stream.entities if stream.kind == "player" else 1),
+            "savings": 1.0 - total / baseline_total,
+            "error": errors,
+        })
+    return results
+
+
+def format_results(stream, results):
+    """Render results as a text table"""
+    header = (f"{stream.kind.capitalize()}Position: {len(stream)} updates, {stream.entities} entities, "
+              f"{stream.duration:.1f}s at {stream.rate:.0f}Hz")
+    lines = [header, "-" * len(header),
+             f"{'encoding':<40} {'B/upd':>6} {'B/s/player':>11} {'saved':>6} "
+             f"{'pos max/rms':>15} {'vel max/rms':>15} {'rot max (deg)':>13}"]
+    for r in results:
+        err = r["error"]
+        rot = f"{err['rot'][0]:.3f}" if "rot" in err else "-"
+        lines.append(f"{r['encoding']:<40} {r['bytes_per_update']:>6.1f} {r['bytes_per_second_per_player']:>11.0f} "
+                     f"{r['savings']:>6.0%} {err['pos'][0]:>7.4f}/{err['pos'][1]:<7.4f} "
+                     f"{err['vel'][0]:>7.3f}/{err['vel'][1]:<7.3f} {rot:>13}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate bandwidth and precision of position packet encodings")
+    sub = parser.add_subparsers(dest="source", required=True)
+
+    synth = sub.add_parser("synthetic", help="Analyze generated movement")
+    synth.add_argument("--players", type=int, default=4)
+    synth.add_argument("--enemies", type=int, default=200)
+    synth.add_argument("--seconds", type=float, default=30.0)
+    synth.add_argument("--rate", type=int, default=60, help="PlayerPosition send rate (Hz)")
+    synth.add_argument("--enemy-rate", type=int, default=30, help="EnemyPosition send rate (Hz)")
+    synth.add_argument("--seed", type=int, default=1)
+
+    cap = sub.add_parser("capture", help="Analyze a capture file written by the launcher's network proxy")
+    cap.add_argument("path")
+
+    for p in (synth, cap):
+        p.add_argument("--pos-step", type=float, default=1 / 128, help="Position resolution in world units")
+        p.add_argument("--vel-step", type=float, default=1 / 256, help="Velocity resolution in units/s")
+        p.add_argument("--rot-bits", type=int, default=16, help="Bits for RotationY")
+        p.add_argument("--ack-delay", type=int, default=6, help="Updates between a send and its ack")
+        p.add_argument("--json", help="Also write the results to this JSON file")
+
+    args = parser.parse_args(argv)
+
+    if args.source == "synthetic":
+        streams = [synthetic_players(args.players, args.seconds, args.rate, seed=args.seed)]
+        if args.enemies:
+            streams.append(synthetic_enemies(args.enemies, args.seconds, args.enemy_rate, seed=args.seed + 1))
+    else:
+        streams = streams_from_capture(args.path)
+        if not streams:
+            print("No PlayerPosition or EnemyPosition packets found in capture")
+            return 1
+
+    quantizer = Quantizer(args.pos_step, args.vel_step, args.rot_bits)
+    report = {}
+    for stream in streams:
+        results = analyze(stream, quantizer, args.ack_delay)
+        report[stream.kind] = results
+        print(format_results(stream, results))
+        print()
+
+    if lz4_frame is None:
+        print("(lz4 not installed; LZ4 batching skipped. pip install lz4)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
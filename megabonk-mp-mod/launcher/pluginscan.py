@@ -0,0 +1,547 @@
+"""
+BepInEx plugin folder scanner for the Megabonk MP Launcher.
+Reads assembly identity, references and BepInEx plugin attributes straight from
+the PE/CLI metadata tables (ECMA-335 partition II) of every DLL, using mmap and
+no .NET runtime, then reports duplicate plugins and version clashes. Results are
+cached per (path, size, mtime) so rescans only stat the folder.
+"""
+
+import os
+import json
+import mmap
+import struct
+import threading
+
+CACHE_FILE = "plugin_scan_cache.json"
+CACHE_VERSION = 1
+
+CLI_HEADER_DIRECTORY = 14
+METADATA_SIGNATURE = 0x424A5342
+
+BEPINEX_NAMESPACE = "BepInEx"
+PLUGIN_ATTRIBUTES = ("BepInPlugin", "BepInDependency", "BepInIncompatibility", "BepInProcess")
+HARD_DEPENDENCY = 1
+ELEMENT_TYPE_STRING = 0x0E
+
+# Column kinds: fixed-size values and heap indexes
+U2, U4 = "u2", "u4"
+STRING, GUID, BLOB = "s", "g", "b"
+
+# Coded indexes: (tag bits, tables)
+TYPE_DEF_OR_REF = (2, (0x02, 0x01, 0x1B))
+HAS_CONSTANT = (2, (0x04, 0x08, 0x17))
+HAS_CUSTOM_ATTRIBUTE = (5, (0x06, 0x04, 0x01, 0x02, 0x08, 0x09, 0x0A, 0x00, 0x0E, 0x17, 0x14, 0x11,
+                            0x1A, 0x1B, 0x20, 0x23, 0x26, 0x27, 0x28, 0x2A, 0x2C, 0x2B))
+HAS_FIELD_MARSHAL = (1, (0x04, 0x08))
+HAS_DECL_SECURITY = (2, (0x02, 0x06, 0x20))
+MEMBER_REF_PARENT = (3, (0x02, 0x01, 0x1A, 0x06, 0x1B))
+HAS_SEMANTICS = (1, (0x14, 0x17))
+METHOD_DEF_OR_REF = (1, (0x06, 0x0A))
+MEMBER_FORWARDED = (1, (0x04, 0x06))
+IMPLEMENTATION = (2, (0x26, 0x23, 0x27))
+CUSTOM_ATTRIBUTE_TYPE = (3, (None, None, 0x06, 0x0A, None))
+RESOLUTION_SCOPE = (2, (0x00, 0x1A, 0x23, 0x01))
+TYPE_OR_METHOD_DEF = (1, (0x02, 0x06))
+
+# Column layouts of every table up to GenericParamConstraint: U2/U4 are fixed-size
+# values, STRING/GUID/BLOB heap indexes, int a table index, tuple a coded index
+TABLE_SCHEMA = {
+    0x00: (U2, STRING, GUID, GUID, GUID),                        # Module
+    0x01: (RESOLUTION_SCOPE, STRING, STRING),                    # TypeRef
+    0x02: (U4, STRING, STRING, TYPE_DEF_OR_REF, 0x04, 0x06),     # TypeDef
+    0x03: (0x04,),                                               # FieldPtr
+    0x04: (U2, STRING, BLOB),                                    # Field
+    0x05: (0x06,),                                               # MethodPtr
+    0x06: (U4, U2, U2, STRING, BLOB, 0x08),                      # MethodDef
+    0x07: (0x08,),                                               # ParamPtr
+    0x08: (U2, U2, STRING),                                      # Param
+    0x09: (0x02, TYPE_DEF_OR_REF),                               # InterfaceImpl
+    0x0A: (MEMBER_REF_PARENT, STRING, BLOB),                     # MemberRef
+    0x0B: (U2, HAS_CONSTANT, BLOB),                              # Constant
+    0x0C: (HAS_CUSTOM_ATTRIBUTE, CUSTOM_ATTRIBUTE_TYPE, BLOB),   # CustomAttribute
+    0x0D: (HAS_FIELD_MARSHAL, BLOB),                             # FieldMarshal
+    0x0E: (U2, HAS_DECL_SECURITY, BLOB),                         # DeclSecurity
+    0x0F: (U2, U4, 0x02),                                        # ClassLayout
+    0x10: (U4, 0x04),                                            # FieldLayout
+    0x11: (BLOB,),                                               # StandAloneSig
+    0x12: (0x02, 0x14),                                          # EventMap
+    0x13: (0x14,),                                               # EventPtr
+    0x14: (U2, STRING, TYPE_DEF_OR_REF),                         # Event
+    0x15: (0x02, 0x17),                                          # PropertyMap
+    0x16: (0x17,),                                               # PropertyPtr
+    0x17: (U2, STRING, BLOB),                                    # Property
+    0x18: (U2, 0x06, HAS_SEMANTICS),                             # MethodSemantics
+    0x19: (0x02, METHOD_DEF_OR_REF, METHOD_DEF_OR_REF),          # MethodImpl
+    0x1A: (STRING,),                                             # ModuleRef
+    0x1B: (BLOB,),                                               # TypeSpec
+    0x1C: (U2, MEMBER_FORWARDED, STRING, 0x1A),                  # ImplMap
+    0x1D: (U4, 0x04),                                            # FieldRVA
+    0x1E: (U4, U4),                                              # EncLog
+    0x1F: (U4,),                                                 # EncMap
+    0x20: (U4, U2, U2, U2, U2, U4, BLOB, STRING, STRING),        # Assembly
+    0x21: (U4,),                                                 # AssemblyProcessor
+    0x22: (U4, U4, U4),                                          # AssemblyOS
+    0x23: (U2, U2, U2, U2, U4, BLOB, STRING, STRING, BLOB),      # AssemblyRef
+    0x24: (U4, 0x23),                                            # AssemblyRefProcessor
+    0x25: (U4, U4, U4, 0x23),                                    # AssemblyRefOS
+    0x26: (U4, STRING, BLOB),                                    # File
+    0x27: (U4, U4, STRING, STRING, IMPLEMENTATION),              # ExportedType
+    0x28: (U4, U4, STRING, IMPLEMENTATION),                      # ManifestResource
+    0x29: (0x02, 0x02),                                          # NestedClass
+    0x2A: (U2, U2, TYPE_OR_METHOD_DEF, STRING),                  # GenericParam
+    0x2B: (METHOD_DEF_OR_REF, BLOB),                             # MethodSpec
+    0x2C: (0x2A, TYPE_DEF_OR_REF),                               # GenericParamConstraint
+}
+
+TYPE_REF, TYPE_DEF, METHOD_DEF, MEMBER_REF, ASSEMBLY, ASSEMBLY_REF, CUSTOM_ATTRIBUTE = (
+    0x01, 0x02, 0x06, 0x0A, 0x20, 0x23, 0x0C)
+
+
+class MetadataError(Exception):
+    """Raised when a file is a .NET assembly but its metadata can't be read"""
+
+
+class _Metadata:
+    """Table and heap access over a memory-mapped assembly"""
+
+    def __init__(self, data):
+        self.data = data
+        self.sections, cli_rva = self._read_pe()
+        if not cli_rva:
+            raise ValueError("not a .NET assembly")
+        cli = self.offset(cli_rva)
+        metadata_rva, metadata_size = struct.unpack_from("<II", data, cli + 8)
+        self._read_streams(self.offset(metadata_rva), metadata_size)
+        self._read_tables()
+
+    def _read_pe(self):
+        data = self.data
+        if data[:2] != b"MZ":
+            raise ValueError("not a PE file")
+        pe = struct.unpack_from("<I", data, 0x3C)[0]
+        if data[pe:pe + 4] != b"PE\0\0":
+            raise ValueError("not a PE file")
+        section_count, = struct.unpack_from("<H", data, pe + 6)
+        optional_size, = struct.unpack_from("<H", data, pe + 20)
+        optional = pe + 24
+        magic, = struct.unpack_from("<H", data, optional)
+        directories = optional + (96 if magic == 0x10B else 112)
+        directory_count, = struct.unpack_from("<I", data, directories - 4)
+        cli_rva = 0
+        if directory_count > CLI_HEADER_DIRECTORY:
+            cli_rva, = struct.unpack_from("<I", data, directories + CLI_HEADER_DIRECTORY * 8)
+
+        sections = []
+        table = optional + optional_size
+        for i in range(section_count):
+            virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from(
+                "<IIII", data, table + i * 40 + 8)
+            sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+        return sections, cli_rva
+
+    def offset(self, rva):
+        for virtual_address, size, raw_pointer in self.sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise MetadataError(f"RVA {rva:#x} outside all sections")
+
+    def _read_streams(self, root, size):
+        data = self.data
+        if struct.unpack_from("<I", data, root)[0] != METADATA_SIGNATURE:
+            raise MetadataError("bad metadata signature")
+        version_length, = struct.unpack_from("<I", data, root + 12)
+        position = root + 16 + version_length
+        stream_count, = struct.unpack_from("<H", data, position + 2)
+        position += 4
+        self.streams = {}
+        for _ in range(stream_count):
+            offset, length = struct.unpack_from("<II", data, position)
+            end = data.find(b"\0", position + 8)
+            name = bytes(data[position + 8:end]).decode("ascii")
+            self.streams[name] = (root + offset, length)
+            position = (end + 4) & ~3
+        if "#~" not in self.streams and "#-" not in self.streams:
+            raise MetadataError("no metadata tables stream")
+
+    def _read_tables(self):
+        data = self.data
+        start, _ = self.streams.get("#~") or self.streams["#-"]
+        heap_sizes = data[start + 6]
+        valid, = struct.unpack_from("<Q", data, start + 8)
+        if valid >> (max(TABLE_SCHEMA) + 1):
+            raise MetadataError("unsupported metadata tables present")
+
+        present = [t for t in range(64) if valid >> t & 1]
+        counts = struct.unpack_from(f"<{len(present)}I", data, start + 24)
+        self.rows = dict.fromkeys(TABLE_SCHEMA, 0)
+        self.rows.update(zip(present, counts))
+        position = start + 24 + 4 * len(present)
+        if heap_sizes & 0x20:
+            position += 4  # Extra data in uncompressed (#-) streams
+
+        heap_width = {U2: 2, U4: 4, STRING: 4 if heap_sizes & 1 else 2, GUID: 4 if heap_sizes & 2 else 2,
+                      BLOB: 4 if heap_sizes & 4 else 2}
+
+        def width(column):
+            if isinstance(column, str):
+                return heap_width[column]
+            if isinstance(column, int):
+                return 2 if self.rows[column] < 1 << 16 else 4
+            bits, tables = column
+            largest = max(self.rows[t] for t in tables if t is not None)
+            return 2 if largest < 1 << (16 - bits) else 4
+
+        self.tables = {}
+        for table in sorted(TABLE_SCHEMA):
+            layout = struct.Struct("<" + "".join("H" if width(c) == 2 else "I" for c in TABLE_SCHEMA[table]))
+            self.tables[table] = (position, layout)
+            position += layout.size * self.rows[table]
+
+    def row(self, table, index):
+        """Columns of a 1-based row"""
+        position, layout = self.tables[table]
+        return layout.unpack_from(self.data, position + (index - 1) * layout.size)
+
+    def rows_of(self, table):
+        position, layout = self.tables[table]
+        for i in range(self.rows[table]):
+            yield layout.unpack_from(self.data, position + i * layout.size)
+
+    def string(self, index):
+        start, _ = self.streams["#Strings"]
+        end = self.data.find(b"\0", start + index)
+        return bytes(self.data[start + index:end]).decode("utf-8", errors="replace")
+
+    def blob(self, index):
+        start, _ = self.streams["#Blob"]
+        length, header = _compressed_uint(self.data, start + index)
+        return bytes(self.data[start + index + header:start + index + header + length])
+
+
+def _compressed_uint(data, position):
+    """ECMA-335 II.23.2 compressed integer; returns (value, bytes used)"""
+    first = data[position]
+    if first & 0x80 == 0:
+        return first, 1
+    if first & 0xC0 == 0x80:
+        return (first & 0x3F) << 8 | data[position + 1], 2
+    return struct.unpack_from(">I", data, position)[0] & 0x1FFFFFFF, 4
+
+
+def _ser_string(blob, position):
+    """Read a custom attribute SerString; returns (value or None, next position)"""
+    if blob[position] == 0xFF:
+        return None, position + 1
+    length, header = _compressed_uint(blob, position)
+    start = position + header
+    return blob[start:start + length].decode("utf-8", errors="replace"), start + length
+
+
+def _decode(coded, value):
+    bits, tables = coded
+    return tables[value & ((1 << bits) - 1)], value >> bits
+
+
+def _version(major, minor, build, revision):
+    return f"{major}.{minor}.{build}.{revision}"
+
+
+def _encode(coded, table, index):
+    bits, tables = coded
+    return index << bits | tables.index(table)
+
+
+def _plugin_attribute_constructors(md):
+    """Map CustomAttribute Type values of BepInEx plugin attribute constructors to (name, signature)"""
+    namespaces = {}
+
+    def is_bepinex(namespace):
+        if namespace not in namespaces:
+            namespaces[namespace] = md.string(namespace) == BEPINEX_NAMESPACE
+        return namespaces[namespace]
+
+    wanted = {}
+    for index, (_, name, namespace) in enumerate(md.rows_of(TYPE_REF), 1):
+        if is_bepinex(namespace) and md.string(name) in PLUGIN_ATTRIBUTES:
+            wanted[(TYPE_REF, index)] = md.string(name)
+
+    # The attributes themselves are defined in BepInEx.Core
+    constructors = {}
+    type_defs = list(md.rows_of(TYPE_DEF))
+    for index, row in enumerate(type_defs, 1):
+        if is_bepinex(row[2]) and md.string(row[1]) in PLUGIN_ATTRIBUTES:
+            name = md.string(row[1])
+            wanted[(TYPE_DEF, index)] = name
+            end = type_defs[index][5] if index < len(type_defs) else md.rows[METHOD_DEF] + 1
+            for method in range(row[5], end):
+                constructors[_encode(CUSTOM_ATTRIBUTE_TYPE, METHOD_DEF, method)] = (
+                    name, md.blob(md.row(METHOD_DEF, method)[4]))
+
+    if wanted:
+        for index, (parent, _, signature) in enumerate(md.rows_of(MEMBER_REF), 1):
+            name = wanted.get(_decode(MEMBER_REF_PARENT, parent))
+            if name:
+                constructors[_encode(CUSTOM_ATTRIBUTE_TYPE, MEMBER_REF, index)] = (name, md.blob(signature))
+    return constructors
+
+
+def read_assembly(path):
+    """Read identity, references and BepInEx attributes of one DLL; None if it isn't a .NET assembly"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                md = _Metadata(data)
+            except ValueError:
+                return None
+            except (struct.error, IndexError, KeyError, UnicodeDecodeError) as e:
+                raise MetadataError(f"{os.path.basename(path)}: corrupt metadata ({e})") from e
+            try:
+                return _read_assembly(md)
+            except (struct.error, IndexError, KeyError) as e:
+                raise MetadataError(f"{os.path.basename(path)}: corrupt metadata ({e})") from e
+
+
+def _read_assembly(md):
+    info = {"name": None, "version": None, "culture": None, "references": [], "plugins": [],
+            "dependencies": [], "incompatibilities": [], "processes": []}
+
+    if md.rows[ASSEMBLY]:
+        _, major, minor, build, revision, _, _, name, culture = md.row(ASSEMBLY, 1)
+        info["name"] = md.string(name)
+        info["version"] = _version(major, minor, build, revision)
+        info["culture"] = md.string(culture) or None
+
+    for major, minor, build, revision, _, _, name, _, _ in md.rows_of(ASSEMBLY_REF):
+        info["references"].append({"name": md.string(name), "version": _version(major, minor, build, revision)})
+
+    constructors = _plugin_attribute_constructors(md)
+    if not constructors:
+        return info
+
+    for parent, type_value, value in md.rows_of(CUSTOM_ATTRIBUTE):
+        if type_value not in constructors:
+            continue
+        name, signature = constructors[type_value]
+        blob = md.blob(value)
+        if blob[:2] != b"\x01\x00":
+            continue
+
+        parent_table, parent_index = _decode(HAS_CUSTOM_ATTRIBUTE, parent)
+        type_name = None
+        if parent_table == TYPE_DEF:
+            _, type_name_index, type_namespace = md.row(TYPE_DEF, parent_index)[:3]
+            type_name = ".".join(filter(None, (md.string(type_namespace), md.string(type_name_index))))
+
+        first, position = _ser_string(blob, 2)
+        if name == "BepInPlugin":
+            plugin_name, position = _ser_string(blob, position)
+            plugin_version, _ = _ser_string(blob, position)
+            info["plugins"].append({"guid": first, "name": plugin_name, "version": plugin_version,
+                                    "type": type_name})
+        elif name == "BepInDependency":
+            # (guid, DependencyFlags) or (guid, version range), which is always a hard dependency;
+            # the constructor signature is [HASTHIS, param count, void, string, second param...]
+            hard, version_range = True, None
+            if len(signature) > 4 and signature[4] == ELEMENT_TYPE_STRING:
+                version_range, _ = _ser_string(blob, position)
+            elif len(signature) > 4:
+                hard = bool(struct.unpack_from("<i", blob, position)[0] & HARD_DEPENDENCY)
+            info["dependencies"].append({"guid": first, "hard": hard, "version": version_range,
+                                         "type": type_name})
+        elif name == "BepInIncompatibility":
+            info["incompatibilities"].append({"guid": first, "type": type_name})
+        else:
+            info["processes"].append(first)
+    return info
+
+
+def _version_tuple(version):
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except (AttributeError, ValueError):
+        return ()
+
+
+class PluginScanner:
+    """Scans folders of DLLs, reusing cached results for files whose size and mtime are unchanged"""
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.cache = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache.get("version") == CACHE_VERSION:
+                    return cache["files"]
+            except (OSError, ValueError, KeyError):
+                pass
+        return {}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.cache}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _walk(self, folder):
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._walk(entry.path)
+            elif entry.name.lower().endswith(".dll"):
+                yield entry
+
+    def scan(self, folder):
+        """Return {path: assembly info} for every DLL under folder (info has an 'error' key if unreadable)"""
+        with self._lock:
+            results = {}
+            changed = False
+            for entry in self._walk(folder):
+                stat = entry.stat()
+                key = [stat.st_size, stat.st_mtime_ns]
+                cached = self.cache.get(entry.path)
+                if cached and cached["key"] == key:
+                    info = cached["info"]
+                else:
+                    try:
+                        info = read_assembly(entry.path)
+                    except (OSError, MetadataError) as e:
+                        info = {"error": str(e)}
+                    self.cache[entry.path] = {"key": key, "info": info}
+                    changed = True
+                results[entry.path] = info
+
+            # Forget files that disappeared from this folder
+            prefix = os.path.join(folder, "")
+            for path in [p for p in self.cache if p.startswith(prefix) and p not in results]:
+                del self.cache[path]
+                changed = True
+            if changed:
+                self.save()
+            return results
+
+
+def _short(path):
+    """Plugin folder and file name, which is how players recognise a mod"""
+    return os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+
+
+def find_conflicts(plugins, provided=None):
+    """Check scanned plugin assemblies for clashes.
+
+    plugins and provided map path -> assembly info; provided holds assemblies that
+    are loaded anyway (BepInEx/core). Returns a list of issues, each a dict with
+    severity ('error' or 'warning'), message and paths.
+    """
+    issues = {}
+    provided = provided or {}
+
+    def add(severity, message, paths):
+        # A copied plugin folder repeats every issue of the original; report each once
+        issue = issues.setdefault(message, {"severity": severity, "message": message, "paths": []})
+        issue["paths"] = sorted(set(issue["paths"]) | set(paths))
+
+    for path, info in plugins.items():
+        if info and info.get("error"):
+            add("warning", f"Could not read {_short(path)}: {info['error']}", [path])
+
+    assemblies = {path: info for path, info in plugins.items() if info and info.get("name")}
+
+    # Same plugin GUID declared more than once: BepInEx loads only one of them
+    by_guid = {}
+    for path, info in assemblies.items():
+        for plugin in info["plugins"]:
+            by_guid.setdefault(plugin["guid"], []).append((path, plugin))
+    for guid, declared in sorted(by_guid.items(), key=lambda item: str(item[0])):
+        if len(declared) > 1:
+            versions = ", ".join(f"{p['version']} in {_short(path)}" for path, p in declared)
+            add("error", f"Plugin {guid} is installed {len(declared)} times ({versions})",
+                [path for path, _ in declared])
+
+    # Same assembly in several files: the first one loaded wins
+    by_name = {}
+    for path, info in assemblies.items():
+        by_name.setdefault(info["name"], []).append((path, info))
+    for name, copies in sorted(by_name.items()):
+        if len(copies) < 2:
+            continue
+        versions = sorted({info["version"] for _, info in copies}, key=_version_tuple)
+        if len(versions) > 1:
+            add("error", f"Version clash: {name} present as {', '.join(versions)}", [path for path, _ in copies])
+        else:
+            add("warning", f"Duplicate assembly: {name} {versions[0]} in {len(copies)} files",
+                [path for path, _ in copies])
+
+    # Plugins shipping their own copy of a BepInEx core assembly
+    core = {info["name"]: info["version"] for info in provided.values() if info and info.get("name")}
+    for path, info in assemblies.items():
+        if info["name"] in core:
+            add("warning", f"{_short(path)} is a copy of {info['name']} {info['version']}, which BepInEx "
+                           f"already loads from BepInEx/core ({core[info['name']]})", [path])
+
+    # References to a newer version than the one that will be loaded
+    available = {}
+    for info in list(provided.values()) + [info for _, info in assemblies.items()]:
+        if info and info.get("name"):
+            current = available.get(info["name"])
+            if current is None or _version_tuple(info["version"]) > _version_tuple(current):
+                available[info["name"]] = info["version"]
+    for path, info in assemblies.items():
+        for reference in info["references"]:
+            have = available.get(reference["name"])
+            if have and _version_tuple(reference["version"]) > _version_tuple(have):
+                add("error", f"{info['name']} needs {reference['name']} {reference['version']} "
+                             f"but only {have} is installed", [path])
+
+    # BepInDependency / BepInIncompatibility between plugins
+    for path, info in assemblies.items():
+        for dependency in info["dependencies"]:
+            if dependency["hard"] and dependency["guid"] not in by_guid:
+                add("error", f"{dependency['type'] or info['name']} requires plugin {dependency['guid']}, "
+                             "which is not installed", [path])
+        for incompatible in info["incompatibilities"]:
+            if incompatible["guid"] in by_guid:
+                others = [p for p, _ in by_guid[incompatible["guid"]]]
+                add("error", f"{incompatible['type'] or info['name']} is incompatible with installed plugin "
+                             f"{incompatible['guid']}", [path] + others)
+
+    return sorted(issues.values(), key=lambda issue: issue["severity"] != "error")
+
+
+def scan_game(game_path, scanner=None):
+    """Scan BepInEx/plugins of a game folder; returns (plugins, issues)"""
+    scanner = scanner or PluginScanner()
+    plugins = scanner.scan(os.path.join(game_path, "BepInEx", "plugins"))
+    provided = scanner.scan(os.path.join(game_path, "BepInEx", "core"))
+    return plugins, find_conflicts(plugins, provided)
+
+
+def format_report(plugins, issues):
+    """Human readable listing of plugins followed by the issues found"""
+    lines = []
+    for path, info in sorted(plugins.items()):
+        if not info or not info.get("name"):
+            continue
+        declared = ", ".join(f"{p['guid']} {p['version']}" for p in info["plugins"])
+        lines.append(f"{_short(path)}: {info['name']} {info['version']}" + (f"  [{declared}]" if declared else ""))
+    if not lines:
+        lines.append("No plugin assemblies found")
+    lines.append("")
+    if issues:
+        for issue in issues:
+            lines.append(f"{issue['severity'].upper()}: {issue['message']}")
+    else:
+        lines.append("No conflicts found")
+    return "\n".join(lines)
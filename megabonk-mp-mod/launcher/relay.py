@@ -0,0 +1,544 @@
+"""
+Multi-lobby relay host for MegabonkMP community servers.
+Speaks the Server.cs protocol to every player: a ConnectRequest from a new
+endpoint is answered with ConnectAccept, everything a member sends afterwards
+goes out unchanged to the other members of its lobby (Server.Broadcast with
+the sender excluded), and members silent for 10 seconds are dropped. With a
+tick rate, relayed packets go through a per-member sendqueue.SendQueue and
+leave once per tick, coalesced and packed into Batch datagrams. Joins and
+leaves are announced with PlayerJoin/PlayerLeave the way NetworkManager does
+on a host.
+
+The lobby is an optional third string in ConnectRequest after PlayerName and
+ModVersion; Server.cs ignores trailing bytes, so the same request also works
+against a normal host. Requests without it join DEFAULT_LOBBY. The first
+member of a lobby gets player id 0 (the host id), later members 1, 2, ...
+
+Scaling: one worker process per core, each with its own UDP socket bound to
+the same port with SO_REUSEPORT. The kernel spreads endpoints over those
+sockets by address hash, so members of one lobby arrive on different workers.
+Each lobby is owned by worker crc32(lobby) % workers and the other workers hand
+its datagrams to the owner over loopback, so all state of a lobby lives in one
+process. Workers share only a stats block in shared memory, in which each
+worker writes nothing but its own slots.
+"""
+
+import os
+import json
+import time
+import zlib
+import random
+import socket
+import struct
+import selectors
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+import wire
+import sendqueue
+
+CLIENT_TIMEOUT = 10.0  # Server.CheckClientTimeouts
+DEFAULT_LOBBY = "default"
+DEFAULT_MAX_PLAYERS = 6
+LOBBY_SLOTS = 256  # lobbies per worker
+LOBBY_NAME_BYTES = 32  # longer names are truncated in the stats block only
+
+SWEEP_INTERVAL = 0.5
+PUBLISH_INTERVAL = 0.1  # how often workers copy their counters into the stats block
+DRAIN_BATCH = 512  # datagrams read from one socket before the other gets a turn
+RECV_SIZE = 65535
+SOCKET_BUFFER = 4 << 20
+
+RELIABLE = wire.DeliveryMethod.ReliableOrdered
+
+# Worker-to-owner hand-off over loopback: [IPv4 address][port] + the client's datagram
+HANDOFF = struct.Struct("!4sH")
+
+# Stats block: WORKER_STATS for every worker, then LOBBY_SLOTS x LOBBY_STATS for every worker
+WORKER_STATS = struct.Struct("<5Q")
+WORKER_FIELDS = ("received", "handed_off", "sent", "dropped", "scheduled")
+LOBBY_STATS = struct.Struct(f"<{LOBBY_NAME_BYTES}sI4Q")
+LOBBY_FIELDS = ("packets_in", "bytes_in", "packets_out", "bytes_out")
+
+
+def lobby_owner(lobby, workers):
+    """Index of the worker that owns a lobby; the same in every process, unlike hash()"""
+    return zlib.crc32(lobby.encode("utf-8")) % workers
+
+
+def parse_connect_request(packet):
+    """(player_name, mod_version, lobby) from a ConnectRequest, type byte included"""
+    name, offset = wire.read_string(packet, 1)
+    version, offset = wire.read_string(packet, offset)
+    lobby = ""
+    if offset < len(packet):
+        lobby, _ = wire.read_string(packet, offset)
+    return name, version, lobby.strip() or DEFAULT_LOBBY
+
+
+class StatsBlock:
+    """Per-worker and per-lobby counters in shared memory.
+
+    Counters only grow while a slot holds the same lobby; readers take two
+    snapshots and divide the difference by the time between them.
+    """
+
+    def __init__(self, workers, slots=LOBBY_SLOTS):
+        self.workers = workers
+        self.slots = slots
+        size = workers * (WORKER_STATS.size + slots * LOBBY_STATS.size)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.shm.buf[:size] = bytes(size)
+
+    def _lobby_offset(self, worker, slot):
+        return self.workers * WORKER_STATS.size + (worker * self.slots + slot) * LOBBY_STATS.size
+
+    def write_worker(self, worker, counters):
+        WORKER_STATS.pack_into(self.shm.buf, worker * WORKER_STATS.size, *counters)
+
+    def write_lobby(self, worker, slot, name, members, counters):
+        LOBBY_STATS.pack_into(self.shm.buf, self._lobby_offset(worker, slot), name.encode("utf-8"), members,
+                              *counters)
+
+    def clear_lobby(self, worker, slot):
+        offset = self._lobby_offset(worker, slot)
+        self.shm.buf[offset:offset + LOBBY_STATS.size] = bytes(LOBBY_STATS.size)
+
+    def snapshot(self):
+        """Current counters of every worker and every open lobby"""
+        buf = self.shm.buf
+        workers = [dict(zip(WORKER_FIELDS, WORKER_STATS.unpack_from(buf, index * WORKER_STATS.size)))
+                   for index in range(self.workers)]
+        lobbies = []
+        for worker in range(self.workers):
+            for slot in range(self.slots):
+                name, members, *counters = LOBBY_STATS.unpack_from(buf, self._lobby_offset(worker, slot))
+                name = name.rstrip(b"\0")
+                if name:
+                    lobbies.append({"lobby": name.decode("utf-8", "replace"), "worker": worker, "members": members,
+                                    **dict(zip(LOBBY_FIELDS, counters))})
+        return {"time": time.monotonic(), "workers": workers, "lobbies": lobbies}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def rates(previous, current):
+    """Per-lobby packets and bytes per second between two snapshots"""
+    elapsed = max(current["time"] - previous["time"], 1e-9)
+    before = {(lobby["worker"], lobby["lobby"]): lobby for lobby in previous["lobbies"]}
+    result = []
+    for lobby in current["lobbies"]:
+        old = before.get((lobby["worker"], lobby["lobby"]), {})
+        entry = {"lobby": lobby["lobby"], "worker": lobby["worker"], "members": lobby["members"]}
+        for field in LOBBY_FIELDS:
+            # A slot reused by a lobby of the same name restarts from zero
+            entry[field + "_per_s"] = max(lobby[field] - old.get(field, 0), 0) / elapsed
+        result.append(entry)
+    return result
+
+
+def format_rates(previous, current):
+    """Text table of lobby rates and worker totals"""
+    lines = [f"{'lobby':<24} {'worker':>6} {'players':>7} {'pkt/s in':>10} {'pkt/s out':>10} "
+             f"{'KB/s in':>9} {'KB/s out':>9}"]
+    for r in sorted(rates(previous, current), key=lambda r: -r["packets_out_per_s"]):
+        lines.append(f"{r['lobby'][:24]:<24} {r['worker']:>6} {r['members']:>7} {r['packets_in_per_s']:>10.0f} "
+                     f"{r['packets_out_per_s']:>10.0f} {r['bytes_in_per_s'] / 1024:>9.1f} "
+                     f"{r['bytes_out_per_s'] / 1024:>9.1f}")
+    elapsed = max(current["time"] - previous["time"], 1e-9)
+    for index, (old, new) in enumerate(zip(previous["workers"], current["workers"])):
+        lines.append(f"worker {index}: " + ", ".join(f"{(new[field] - old[field]) / elapsed:.0f} {field}/s"
+                                                      for field in WORKER_FIELDS))
+    return "\n".join(lines)
+
+
+class _Member:
+    __slots__ = ("player_id", "name", "addr", "lobby", "last_seen", "queue")
+
+    def __init__(self, player_id, name, addr, lobby, now, queue=None):
+        self.player_id = player_id
+        self.name = name
+        self.addr = addr
+        self.lobby = lobby
+        self.last_seen = now
+        self.queue = queue
+
+
+class _Lobby:
+    __slots__ = ("name", "slot", "seed", "members", "next_id", "packets_in", "bytes_in", "packets_out",
+                 "bytes_out")
+
+    def __init__(self, name, slot, seed):
+        self.name = name
+        self.slot = slot
+        self.seed = seed
+        self.members = {}  # endpoint -> _Member
+        self.next_id = 0
+        self.packets_in = self.bytes_in = self.packets_out = self.bytes_out = 0
+
+
+class _Worker:
+    """Reads its share of the port and owns the lobbies that hash to it"""
+
+    def __init__(self, index, count, public, handoff, peers, stats, max_players, tick_rate=None):
+        self.index = index
+        self.count = count
+        self.public = public
+        self.handoff = handoff
+        self.peers = peers  # hand-off address of every worker
+        self.stats = stats
+        self.max_players = max_players
+        self.tick = 1.0 / tick_rate if tick_rate else None
+        self.routes = {}  # endpoint -> [owner, last_seen] for datagrams arriving here
+        self.members = {}  # endpoint -> _Member of the lobbies owned here
+        self.lobbies = {}
+        self.free_slots = list(range(stats.slots - 1, -1, -1))
+        self.dirty = set()
+        self.received = self.handed_off = self.sent = self.dropped = self.scheduled = 0
+        self.rng = random.Random()
+        self.now = time.monotonic()
+
+    def run(self, stop):
+        self.public.setblocking(False)
+        self.handoff.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(self.public, selectors.EVENT_READ, self._read_public)
+        selector.register(self.handoff, selectors.EVENT_READ, self._read_handoff)
+        next_publish = next_sweep = 0.0
+        next_tick = time.monotonic() + (self.tick or 0.0)
+        try:
+            while not stop.is_set():
+                timeout = min(SWEEP_INTERVAL, max(next_tick - self.now, 0.0)) if self.tick else SWEEP_INTERVAL
+                for key, _ in selector.select(timeout):
+                    key.data()
+                now = self.now = time.monotonic()
+                if self.tick and now >= next_tick:
+                    self._flush()
+                    next_tick = max(next_tick + self.tick, now)
+                if now >= next_publish:
+                    self._publish()
+                    next_publish = now + PUBLISH_INTERVAL
+                if now >= next_sweep:
+                    self._sweep(now)
+                    next_sweep = now + SWEEP_INTERVAL
+        finally:
+            # Server.Stop
+            goodbye = wire.wrap(wire.disconnect_packet("Server shutting down"), RELIABLE)
+            for member in list(self.members.values()):
+                self._send(member.lobby, member.addr, goodbye)
+            self._publish()
+            selector.close()
+
+    def _read_public(self):
+        recvfrom = self.public.recvfrom
+        self.now = time.monotonic()
+        for _ in range(DRAIN_BATCH):
+            try:
+                data, addr = recvfrom(RECV_SIZE)
+            except BlockingIOError:
+                return
+            except OSError:
+                continue  # ICMP port unreachable from a client that went away
+            self.received += 1
+            if len(data) < wire.HEADER_SIZE:
+                self.dropped += 1
+                continue
+            route = self.routes.get(addr)
+            if route is None or wire.packet_type(data) == wire.PacketType.ConnectRequest:
+                route = self._route(addr, data)
+                if route is None:
+                    self.dropped += 1
+                    continue
+            route[1] = self.now
+            if route[0] == self.index:
+                self._handle(addr, data)
+            else:
+                self._hand_off(route[0], addr, data)
+
+    def _route(self, addr, data):
+        """Pick the owner for a new endpoint from the lobby in its ConnectRequest"""
+        if wire.packet_type(data) != wire.PacketType.ConnectRequest:
+            return None
+        try:
+            _, _, lobby = parse_connect_request(data[wire.HEADER_SIZE:])
+        except ValueError:
+            return None
+        route = self.routes[addr] = [lobby_owner(lobby, self.count), self.now]
+        return route
+
+    def _hand_off(self, owner, addr, data):
+        try:
+            self.handoff.sendto(HANDOFF.pack(socket.inet_aton(addr[0]), addr[1]) + data, self.peers[owner])
+            self.handed_off += 1
+        except OSError:
+            self.dropped += 1
+
+    def _read_handoff(self):
+        recv = self.handoff.recv
+        self.now = time.monotonic()
+        for _ in range(DRAIN_BATCH):
+            try:
+                data = recv(RECV_SIZE)
+            except BlockingIOError:
+                return
+            except OSError:
+                continue
+            ip, port = HANDOFF.unpack_from(data)
+            self._handle((socket.inet_ntoa(ip), port), data[HANDOFF.size:])
+
+    def _handle(self, addr, data):
+        """Server.cs receive path for a datagram of a lobby owned by this worker"""
+        member = self.members.get(addr)
+        ptype = wire.packet_type(data)
+        if member is None:
+            if ptype == wire.PacketType.ConnectRequest:
+                self._join(addr, data)
+            else:
+                self.dropped += 1
+            return
+
+        member.last_seen = self.now
+        lobby = member.lobby
+        lobby.packets_in += 1
+        lobby.bytes_in += len(data)
+        self.dirty.add(lobby)
+        if ptype == wire.PacketType.ConnectRequest:
+            # The accept was lost and the client asked again
+            self._send(lobby, addr, wire.wrap(wire.connect_accept_packet(member.player_id, lobby.seed), RELIABLE))
+        elif ptype == wire.PacketType.Disconnect:
+            self._leave(member, "Disconnected")
+        else:
+            for other in lobby.members.values():
+                if other is member:
+                    continue
+                if other.queue is None:
+                    self._send(lobby, other.addr, data)
+                else:
+                    other.queue.push(data)
+                    self.scheduled += 1
+
+    def _join(self, addr, data):
+        try:
+            name, _, lobby_name = parse_connect_request(data[wire.HEADER_SIZE:])
+        except ValueError:
+            self.dropped += 1
+            return
+        lobby = self.lobbies.get(lobby_name)
+        if lobby is None:
+            if not self.free_slots:
+                self.dropped += 1
+                return
+            lobby = self.lobbies[lobby_name] = _Lobby(lobby_name, self.free_slots.pop(), self.rng.getrandbits(31))
+        elif len(lobby.members) >= self.max_players:
+            # Like a full Server.cs: no answer, the client times out
+            self.dropped += 1
+            return
+
+        member = _Member(lobby.next_id, name, addr, lobby, self.now, sendqueue.SendQueue() if self.tick else None)
+        lobby.next_id += 1
+        lobby.members[addr] = member
+        self.members[addr] = member
+        lobby.packets_in += 1
+        lobby.bytes_in += len(data)
+        self.dirty.add(lobby)
+
+        # NetworkManager.HandleClientConnected
+        self._send(lobby, addr, wire.wrap(wire.connect_accept_packet(member.player_id, lobby.seed), RELIABLE))
+        joined = wire.wrap(wire.player_join_packet(member.player_id, name), RELIABLE)
+        for other in lobby.members.values():
+            if other is not member:
+                self._send(lobby, other.addr, joined)
+                self._send(lobby, addr, wire.wrap(wire.player_join_packet(other.player_id, other.name), RELIABLE))
+
+    def _leave(self, member, reason):
+        """NetworkManager.HandleClientDisconnected"""
+        lobby = member.lobby
+        del lobby.members[member.addr]
+        del self.members[member.addr]
+        left = wire.wrap(wire.player_leave_packet(member.player_id, reason), RELIABLE)
+        for other in lobby.members.values():
+            self._send(lobby, other.addr, left)
+        if lobby.members:
+            self.dirty.add(lobby)
+            return
+        del self.lobbies[lobby.name]
+        self.dirty.discard(lobby)
+        self.stats.clear_lobby(self.index, lobby.slot)
+        self.free_slots.append(lobby.slot)
+
+    def _send(self, lobby, addr, datagram):
+        try:
+            self.public.sendto(datagram, addr)
+        except OSError:
+            self.dropped += 1
+            return
+        self.sent += 1
+        lobby.packets_out += 1
+        lobby.bytes_out += len(datagram)
+
+    def _flush(self):
+        for member in self.members.values():
+            if member.queue:
+                for datagram in member.queue.flush():
+                    self._send(member.lobby, member.addr, datagram)
+
+    def _sweep(self, now):
+        for member in [m for m in self.members.values() if now - m.last_seen > CLIENT_TIMEOUT]:
+            self._leave(member, "Timed out")
+        for addr in [a for a, route in self.routes.items() if now - route[1] > CLIENT_TIMEOUT]:
+            del self.routes[addr]
+
+    def _publish(self):
+        self.stats.write_worker(self.index, (self.received, self.handed_off, self.sent, self.dropped, self.scheduled))
+        for lobby in self.dirty:
+            self.stats.write_lobby(self.index, lobby.slot, lobby.name, len(lobby.members),
+                                   (lobby.packets_in, lobby.bytes_in, lobby.packets_out, lobby.bytes_out))
+        self.dirty.clear()
+
+
+def _worker_main(index, count, public, handoff, peers, stats, max_players, tick_rate, stop):
+    try:
+        _Worker(index, count, public, handoff, peers, stats, max_players, tick_rate).run(stop)
+    except KeyboardInterrupt:
+        pass
+
+
+class RelayHost:
+    """Pool of relay workers sharing one UDP port.
+
+    Workers are forked processes where the platform has SO_REUSEPORT and fork;
+    elsewhere a single worker runs in a thread of this process.
+    """
+
+    def __init__(self, listen=("0.0.0.0", 7777), workers=None, max_players=DEFAULT_MAX_PLAYERS,
+                 slots=LOBBY_SLOTS, tick_rate=None, log=print):
+        self.listen = listen
+        self.max_players = max_players
+        self.tick_rate = tick_rate
+        self.slots = slots
+        self.log = log
+        self.processes = hasattr(socket, "SO_REUSEPORT") and "fork" in multiprocessing.get_all_start_methods()
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers > 1 and not self.processes:
+            log("SO_REUSEPORT worker processes are not available on this platform; running one worker",
+                "WARNING")
+            self.workers = 1
+        self.address = None
+        self.stats = None
+        self._stop = None
+        self._runners = []
+        self._sockets = []
+
+    def start(self):
+        host, port = self.listen
+        publics = []
+        handoffs = []
+        try:
+            for _ in range(self.workers):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                publics.append(sock)
+                if self.processes:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                for option in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+                    try:
+                        sock.setsockopt(socket.SOL_SOCKET, option, SOCKET_BUFFER)
+                    except OSError:
+                        pass
+                sock.bind((host, port))
+                port = sock.getsockname()[1]  # port 0 picks one for the first socket, the rest share it
+                handoff = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                handoffs.append(handoff)
+                handoff.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+                handoff.bind(("127.0.0.1", 0))
+        except OSError:
+            for sock in publics + handoffs:
+                sock.close()
+            raise
+        self.address = (host, port)
+        self.stats = StatsBlock(self.workers, self.slots)
+        peers = [sock.getsockname() for sock in handoffs]
+
+        if self.processes:
+            context = multiprocessing.get_context("fork")
+            self._stop = context.Event()
+            for index in range(self.workers):
+                process = context.Process(target=_worker_main, name=f"relay-worker-{index}", daemon=True,
+                                          args=(index, self.workers, publics[index], handoffs[index], peers,
+                                                self.stats, self.max_players, self.tick_rate, self._stop))
+                process.start()
+                self._runners.append(process)
+            # The workers hold their own copies now
+            for sock in publics + handoffs:
+                sock.close()
+        else:
+            self._stop = threading.Event()
+            thread = threading.Thread(target=_worker_main, name="relay-worker-0", daemon=True,
+                                      args=(0, 1, publics[0], handoffs[0], peers, self.stats, self.max_players,
+                                            self.tick_rate, self._stop))
+            thread.start()
+            self._runners.append(thread)
+            self._sockets = publics + handoffs
+        scheduling = f", sending every {1000 / self.tick_rate:.0f} ms" if self.tick_rate else ""
+        self.log(f"Relay listening on {host}:{port} with {self.workers} worker(s), "
+                 f"up to {self.max_players} players per lobby{scheduling}")
+
+    def dead_workers(self):
+        return [index for index, runner in enumerate(self._runners) if not runner.is_alive()]
+
+    def snapshot(self):
+        return self.stats.snapshot()
+
+    def stop(self):
+        if self._stop is None:
+            return
+        self._stop.set()
+        for runner in self._runners:
+            runner.join(SWEEP_INTERVAL * 4)
+            if self.processes and runner.is_alive():
+                runner.terminate()
+        if not self.processes:
+            for sock in self._sockets:
+                sock.close()
+        self._runners = []
+        self._stop = None
+        self.stats.close()
+
+
+def write_snapshot(path, previous, current):
+    """Write counters and rates as JSON for dashboards"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"workers": current["workers"], "lobbies": rates(previous, current)}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_relay(listen, workers=None, max_players=DEFAULT_MAX_PLAYERS, duration=None, report_interval=10.0,
+              stats_path=None, tick_rate=None, log=print):
+    """Run the relay until interrupted (or for `duration` seconds); returns the last snapshot"""
+    host = RelayHost(listen, workers, max_players, tick_rate=tick_rate, log=log)
+    host.start()
+    started = previous = host.snapshot()
+    reported = set()
+    try:
+        while duration is None or time.monotonic() - started["time"] < duration:
+            wait = report_interval if duration is None else min(report_interval,
+                                                                duration - (time.monotonic() - started["time"]))
+            time.sleep(max(wait, 0.0))
+            current = host.snapshot()
+            if current["lobbies"]:
+                log(format_rates(previous, current))
+            if stats_path:
+                write_snapshot(stats_path, previous, current)
+            for index in set(host.dead_workers()) - reported:
+                log(f"Relay worker {index} exited; lobbies it owned are gone until the relay restarts", "ERROR")
+                reported.add(index)
+            previous = current
+    except KeyboardInterrupt:
+        pass
+    finally:
+        last = host.snapshot()
+        host.stop()
+    return last
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Per-tick send scheduling for MegabonkMP relays and host tooling.
+Server.Broadcast and SendTo send every packet as its own datagram the moment
+it is produced, so stale positions queue up in front of each other and in
+front of deaths and pickups. A SendQueue collects one destination's packets
+for a tick instead, and when the tick ends it:
+
+    - keeps only the newest PlayerPosition/EnemyPosition of each entity
+    - sends reliable and critical packets first, then other events, then positions
+    - packs consecutive packets into Batch datagrams of at most MTU bytes
+
+A Batch is the usual reliability header, type byte PacketType.Batch and
+[u16 length][type byte + payload] records (Client.cs unpacks it). A datagram
+holding a single packet goes out exactly as it came in.
+
+The command line replays synthetic host traffic or a one-client capture from
+the impairment proxy through a queue and reports the datagram and byte
+reduction.
+
+Usage:
+    python sendqueue.py synthetic --players 4 --enemies 300 --seconds 20
+    python sendqueue.py capture session.mbcap --tick-rate 30 --json report.json
+"""
+
+import sys
+import json
+import random
+import argparse
+
+import wire
+
+TICK_RATE = 30  # EnemySync.PositionSendRate; PlayerPosition runs at twice this
+UDP_IP_OVERHEAD = 28  # IPv4 + UDP headers per datagram
+
+# Only the newest of these per entity (the int32 id right after the type byte) is worth sending
+POSITION_TYPES = frozenset({wire.PacketType.PlayerPosition, wire.PacketType.EnemyPosition})
+
+# Sent ahead of everything else, like reliable packets
+CRITICAL_TYPES = frozenset({
+    wire.PacketType.ConnectAccept, wire.PacketType.Disconnect, wire.PacketType.PlayerJoin,
+    wire.PacketType.PlayerLeave, wire.PacketType.SessionStart, wire.PacketType.SessionEnd,
+    wire.PacketType.PlayerDeath, wire.PacketType.PlayerRespawn, wire.PacketType.EnemyDeath,
+    wire.PacketType.ItemPickup, wire.PacketType.ChestOpen, wire.PacketType.Extraction,
+})
+
+BATCH_OVERHEAD = wire.HEADER_SIZE + 1
+RECORD_OVERHEAD = wire.BATCH_RECORD.size
+
+STAT_FIELDS = ("packets", "bytes", "superseded", "deferred", "dropped", "datagrams", "sent_bytes")
+
+
+def is_critical(delivery, ptype):
+    return delivery != wire.DeliveryMethod.Unreliable or ptype in CRITICAL_TYPES
+
+
+class SendQueue:
+    """One destination's outgoing packets, flushed once per tick.
+
+    budget caps the bytes sent per tick: events that do not fit wait for the
+    next tick, positions that do not fit are dropped (a newer one follows).
+    """
+
+    def __init__(self, mtu=wire.MTU, budget=None):
+        self.mtu = mtu
+        self.budget = budget
+        self.critical = []  # (delivery, packet) in arrival order
+        self.events = []
+        self.positions = {}  # (type, entity id) -> (delivery, packet); replacing keeps the first slot
+        self.stats = dict.fromkeys(STAT_FIELDS, 0)
+
+    def __len__(self):
+        return len(self.critical) + len(self.events) + len(self.positions)
+
+    def push(self, datagram):
+        """Queue one wrapped datagram as it would have been sent immediately"""
+        delivery, _, packet = wire.unwrap(datagram)
+        if not packet:
+            return
+        self.stats["packets"] += 1
+        self.stats["bytes"] += len(datagram)
+        ptype = packet[0]
+        if ptype == wire.PacketType.Batch:
+            for inner in wire.unbatch(packet):
+                self._queue(delivery, inner)
+        else:
+            self._queue(delivery, packet)
+
+    def _queue(self, delivery, packet):
+        ptype = packet[0]
+        if ptype in POSITION_TYPES and delivery == wire.DeliveryMethod.Unreliable and len(packet) >= 5:
+            key = (ptype, packet[1:5])
+            if key in self.positions:
+                self.stats["superseded"] += 1
+            self.positions[key] = (delivery, packet)
+        elif is_critical(delivery, ptype):
+            self.critical.append((delivery, packet))
+        else:
+            self.events.append((delivery, packet))
+
+    def flush(self):
+        """Datagrams for this tick, most important first"""
+        pending = self.critical + self.events + list(self.positions.values())
+        self.critical, self.events, self.positions = [], [], {}
+        groups = []
+        size = self.mtu
+        used = 0
+        for index, (delivery, packet) in enumerate(pending):
+            cost = RECORD_OVERHEAD + len(packet)
+            new_group = size + cost > self.mtu
+            if self.budget is not None and used + cost + BATCH_OVERHEAD * new_group > self.budget and groups:
+                self._defer(pending[index:])
+                break
+            if new_group:
+                groups.append([])
+                size = BATCH_OVERHEAD
+                used += BATCH_OVERHEAD
+            groups[-1].append((delivery, packet))
+            size += cost
+            used += cost
+
+        datagrams = []
+        for group in groups:
+            delivery = group[0][0]  # the most important record comes first
+            if len(group) == 1:
+                datagram = wire.wrap(group[0][1], delivery)
+            else:
+                datagram = wire.wrap(wire.batch_packet([packet for _, packet in group]), delivery)
+            datagrams.append(datagram)
+            self.stats["datagrams"] += 1
+            self.stats["sent_bytes"] += len(datagram)
+        return datagrams
+
+    def _defer(self, leftover):
+        for delivery, packet in leftover:
+            ptype = packet[0]
+            if ptype in POSITION_TYPES and delivery == wire.DeliveryMethod.Unreliable:
+                self.stats["dropped"] += 1
+            else:
+                self.stats["deferred"] += 1
+                (self.critical if is_critical(delivery, ptype) else self.events).append((delivery, packet))
+
+
+def reduction(stats):
+    """Datagram and byte savings of queued sending over one datagram per packet"""
+    packets = max(stats["packets"], 1)
+    wire_before = stats["bytes"] + stats["packets"] * UDP_IP_OVERHEAD
+    wire_after = stats["sent_bytes"] + stats["datagrams"] * UDP_IP_OVERHEAD
+    return {
+        "datagrams_before": stats["packets"],
+        "datagrams_after": stats["datagrams"],
+        "datagram_reduction": 1.0 - stats["datagrams"] / packets,
+        "bytes_before": stats["bytes"],
+        "bytes_after": stats["sent_bytes"],
+        "byte_reduction": 1.0 - stats["sent_bytes"] / max(stats["bytes"], 1),
+        "wire_byte_reduction": 1.0 - wire_after / max(wire_before, 1),
+        "superseded_positions": stats["superseded"],
+    }
+
+
+def synthetic_ticks(players=4, enemies=300, seconds=20.0, tick_rate=TICK_RATE, events_per_second=4.0, seed=1):
+    """What a host sends one client per tick: datagrams in the order the game produces them.
+
+    The host's PlayerPosition goes out twice per tick and every enemy's
+    EnemyPosition once, the other players' positions are relayed once per
+    tick, and reliable events (pickups, deaths, damage) arrive at random.
+    """
+    rng = random.Random(seed)
+    for tick in range(int(seconds * tick_rate)):
+        datagrams = []
+        for _ in range(2):
+            datagrams.append(wire.wrap(wire.player_position_packet(
+                0, (rng.uniform(-50, 50), 0.0, rng.uniform(-50, 50)), (1.0, 0.0, 0.0), 90.0, tick)))
+        for player in range(2, players):
+            datagrams.append(wire.wrap(wire.player_position_packet(
+                player, (rng.uniform(-50, 50), 0.0, rng.uniform(-50, 50)), (0.0, 0.0, 1.0), 0.0, tick)))
+        for enemy in range(enemies):
+            datagrams.append(wire.wrap(wire.enemy_position_packet(
+                enemy, (rng.uniform(-80, 80), 0.0, rng.uniform(-80, 80)), (0.5, 0.0, 0.5))))
+        for _ in range(_poisson(rng, events_per_second / tick_rate)):
+            ptype = rng.choice((wire.PacketType.ItemPickup, wire.PacketType.EnemyDeath, wire.PacketType.DamageDealt,
+                                wire.PacketType.PlayerDeath))
+            event = wire.wrap(bytes([ptype]) + rng.randbytes(rng.randint(8, 24)), wire.DeliveryMethod.ReliableOrdered)
+            datagrams.insert(rng.randint(0, len(datagrams)), event)
+        yield datagrams
+
+
+def _poisson(rng, mean):
+    count = 0
+    total = rng.expovariate(1.0) if mean else float("inf")
+    while total < mean:
+        count += 1
+        total += rng.expovariate(1.0)
+    return count
+
+
+def capture_ticks(path, tick_rate=TICK_RATE):
+    """Server-to-client datagrams of a capture grouped into ticks (empty ticks included)"""
+    tick = None
+    datagrams = []
+    for timestamp, direction, datagram in wire.read_capture(path):
+        if direction != wire.TO_CLIENT:
+            continue
+        index = int(timestamp * tick_rate)
+        if tick is None:
+            tick = index
+        while index > tick:
+            yield datagrams
+            datagrams = []
+            tick += 1
+        datagrams.append(datagram)
+    if datagrams:
+        yield datagrams
+
+
+def _bytes_ahead_of_critical(datagrams):
+    """Bytes that go out before each critical packet of a tick, in send order"""
+    ahead = []
+    sent = 0
+    for datagram in datagrams:
+        offset = BATCH_OVERHEAD
+        for inner in wire.unbatch(datagram[wire.HEADER_SIZE:]):
+            if inner and inner[0] in CRITICAL_TYPES:
+                ahead.append(sent + offset)
+            offset += RECORD_OVERHEAD + len(inner)
+        sent += len(datagram)
+    return ahead
+
+
+def simulate(ticks, tick_rate=TICK_RATE, mtu=wire.MTU, budget=None):
+    """Run every tick through a SendQueue; returns a report dict"""
+    queue = SendQueue(mtu, budget)
+    fifo_ahead = []
+    queued_ahead = []
+    count = 0
+    for datagrams in ticks:
+        count += 1
+        for datagram in datagrams:
+            queue.push(datagram)
+        fifo_ahead += _bytes_ahead_of_critical(datagrams)
+        queued_ahead += _bytes_ahead_of_critical(queue.flush())
+    seconds = max(count / tick_rate, 1e-9)
+    report = reduction(queue.stats)
+    report.update({
+        "ticks": count, "seconds": seconds, "tick_rate": tick_rate, "mtu": mtu, "budget": budget,
+        "datagrams_per_second_before": queue.stats["packets"] / seconds,
+        "datagrams_per_second_after": queue.stats["datagrams"] / seconds,
+        "bytes_per_second_before": queue.stats["bytes"] / seconds,
+        "bytes_per_second_after": queue.stats["sent_bytes"] / seconds,
+        "critical_packets": len(fifo_ahead),
+        "critical_bytes_ahead_fifo": sum(fifo_ahead) / max(len(fifo_ahead), 1),
+        "critical_bytes_ahead_queued": sum(queued_ahead) / max(len(queued_ahead), 1),
+        "deferred": queue.stats["deferred"],
+        "dropped_positions": queue.stats["dropped"],
+    })
+    return report
+
+
+def format_report(report):
+    """Render a report as text"""
+    per_second = lambda stage: (report[f"datagrams_per_second_{stage}"], report[f"bytes_per_second_{stage}"])
+    (datagrams_before, bytes_before), (datagrams_after, bytes_after) = per_second("before"), per_second("after")
+    header = f"{report['ticks']} ticks at {report['tick_rate']} Hz ({report['seconds']:.1f}s), MTU {report['mtu']}"
+    if report["budget"]:
+        header += f", budget {report['budget']} B/tick"
+    lines = [header,
+             f"{'':<24} {'immediate':>10} {'per tick':>10} {'saved':>7}",
+             f"{'datagrams/s':<24} {datagrams_before:>10.0f} {datagrams_after:>10.0f} "
+             f"{report['datagram_reduction']:>7.1%}",
+             f"{'KB/s':<24} {bytes_before / 1024:>10.1f} {bytes_after / 1024:>10.1f} {report['byte_reduction']:>7.1%}",
+             f"{'KB/s incl. UDP/IP':<24} {(bytes_before + datagrams_before * UDP_IP_OVERHEAD) / 1024:>10.1f} "
+             f"{(bytes_after + datagrams_after * UDP_IP_OVERHEAD) / 1024:>10.1f} {report['wire_byte_reduction']:>7.1%}",
+             f"{'bytes ahead of critical':<24} {report['critical_bytes_ahead_fifo']:>10.0f} "
+             f"{report['critical_bytes_ahead_queued']:>10.0f}",
+             "",
+             f"{report['superseded_positions']} stale positions replaced by newer ones, "
+             f"{report['critical_packets']} critical packets"]
+    if report["budget"]:
+        lines.append(f"{report['deferred']} events waited for a later tick, "
+                     f"{report['dropped_positions']} positions dropped over budget")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Datagram and byte reduction of per-tick send scheduling")
+    sources = parser.add_subparsers(dest="source", required=True)
+    synthetic = sources.add_parser("synthetic", help="Generated host-to-client traffic")
+    synthetic.add_argument("--players", type=int, default=4, help="Players including the host")
+    synthetic.add_argument("--enemies", type=int, default=300)
+    synthetic.add_argument("--seconds", type=float, default=20.0)
+    synthetic.add_argument("--events", type=float, default=4.0, help="Reliable events per second")
+    synthetic.add_argument("--seed", type=int, default=1)
+    capture = sources.add_parser("capture", help="Server-to-client datagrams of a one-client proxy capture")
+    capture.add_argument("path", help="Capture file from `launcher.py proxy --capture`")
+    for sub in (synthetic, capture):
+        sub.add_argument("--tick-rate", type=float, default=TICK_RATE,
+                         help=f"Flushes per second (default: {TICK_RATE})")
+        sub.add_argument("--mtu", type=int, default=wire.MTU)
+        sub.add_argument("--budget", type=int, help="Bytes per tick; positions over it are dropped")
+        sub.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.source == "synthetic":
+        ticks = synthetic_ticks(args.players, args.enemies, args.seconds, args.tick_rate, args.events, args.seed)
+    else:
+        ticks = capture_ticks(args.path, args.tick_rate)
+    try:
+        report = simulate(ticks, args.tick_rate, args.mtu, args.budget)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    print(format_report(report))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Reproducible Thunderstore packages for MegabonkMP.
+Builds <name>-<version>.zip from thunderstore/manifest.json, README.md, an
+optional icon.png and the built MegabonkMP.dll. Entries are sorted, carry a
+fixed timestamp and permissions and use a fixed compression level, so the same
+inputs always give the same bytes. A sidecar hash manifest records the input
+key and every entry's SHA-256; it lets the builder skip unchanged packages and
+lets installs verify the archive before writing anything.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+
+import bundle
+
+PACKAGE_FORMAT = 2  # 2: entries really use COMPRESS_LEVEL (1 wrote zlib's default level)
+HASHES_SUFFIX = ".hashes.json"
+CHUNK_SIZE = 1 << 20
+
+# Fixed metadata for every entry; 1980-01-01 is the earliest time a zip can store
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o100644
+COMPRESS_LEVEL = 9
+
+# Paths inside the package (BepInEx pack layout understood by r2modman)
+MANIFEST = "manifest.json"
+README = "README.md"
+ICON = "icon.png"
+PLUGIN_DLL = "plugins/MegabonkMP/MegabonkMP.dll"
+
+REQUIRED_FIELDS = ("name", "version_number", "website_url", "description", "dependencies")
+
+
+class PackageError(Exception):
+    """Raised when package inputs are invalid or a package fails verification"""
+
+
+def read_manifest(path):
+    """Load and check a Thunderstore manifest.json"""
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PackageError(f"Cannot read {path}: {e}")
+    missing = [field for field in REQUIRED_FIELDS if field not in manifest]
+    if missing:
+        raise PackageError(f"{path} is missing {', '.join(missing)}")
+    return manifest
+
+
+def package_name(manifest):
+    return f"{manifest['name']}-{manifest['version_number']}.zip"
+
+
+def inputs_key(entries):
+    """Hash of the format, compression settings and every (arcname, content hash)"""
+    digest = hashlib.sha256(f"format:{PACKAGE_FORMAT};level:{COMPRESS_LEVEL}\0".encode("ascii"))
+    for arcname, entry in sorted(entries.items()):
+        digest.update(f"{arcname}\0{entry['sha256']}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _zip_info(arcname):
+    info = zipfile.ZipInfo(arcname, ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    # ZipFile.open ignores the archive's compresslevel for a ZipInfo it did not create
+    if hasattr(info, "compress_level"):  # Python 3.13+
+        info.compress_level = COMPRESS_LEVEL
+    else:
+        info._compresslevel = COMPRESS_LEVEL
+    info.create_system = 3  # Unix, so the mode below is what extractors see on every OS
+    info.external_attr = ZIP_FILE_MODE << 16
+    return info
+
+
+def _load_hashes(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            hashes = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return hashes if hashes.get("format") == PACKAGE_FORMAT else None
+
+
+def build_package(output_dir, manifest_path, readme_path, dll_path, icon_path=None, force=False, log=print):
+    """Write <name>-<version>.zip and its hash manifest into output_dir.
+
+    Inputs are hashed first; when the existing package was built from the same
+    content and is itself intact, nothing is rewritten. Returns (zip_path, built).
+    """
+    manifest = read_manifest(manifest_path)
+    sources = {MANIFEST: manifest_path, README: readme_path, PLUGIN_DLL: dll_path}
+    if icon_path:
+        sources[ICON] = icon_path
+    else:
+        log("No icon.png; Thunderstore requires a 256x256 icon for uploads", "WARNING")
+    for path in sources.values():
+        if not os.path.isfile(path):
+            raise PackageError(f"Missing package input: {path}")
+
+    entries = {arcname: {"sha256": bundle.file_sha256(path), "size": os.path.getsize(path)}
+               for arcname, path in sources.items()}
+    key = inputs_key(entries)
+    zip_path = os.path.join(output_dir, package_name(manifest))
+    hashes_path = zip_path + HASHES_SUFFIX
+
+    previous = _load_hashes(hashes_path)
+    if (not force and previous and previous.get("inputs") == key and os.path.isfile(zip_path)
+            and bundle.file_sha256(zip_path) == previous["archive"]["sha256"]):
+        log(f"{os.path.basename(zip_path)} is up to date")
+        return zip_path, False
+
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path = zip_path + ".part"
+    with zipfile.ZipFile(tmp_path, "w", compresslevel=COMPRESS_LEVEL) as zf:
+        for arcname in sorted(sources):
+            with open(sources[arcname], "rb") as src, zf.open(_zip_info(arcname), "w") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            log(f"Added {arcname} ({entries[arcname]['size']:,} bytes)")
+    os.replace(tmp_path, zip_path)
+
+    hashes = {
+        "format": PACKAGE_FORMAT,
+        "package": {"name": manifest["name"], "version": manifest["version_number"]},
+        "inputs": key,
+        "archive": {"name": os.path.basename(zip_path), "sha256": bundle.file_sha256(zip_path),
+                    "size": os.path.getsize(zip_path)},
+        "files": entries,
+    }
+    tmp_path = hashes_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, hashes_path)
+    log(f"Wrote {os.path.basename(zip_path)} (sha256 {hashes['archive']['sha256'][:16]})")
+    return zip_path, True
+
+
+def verify_package(zip_path, hashes_path=None, log=print):
+    """Check the archive hash and every entry against the hash manifest; returns the manifest"""
+    hashes_path = hashes_path or zip_path + HASHES_SUFFIX
+    hashes = _load_hashes(hashes_path)
+    if hashes is None:
+        raise PackageError(f"No usable hash manifest at {hashes_path}")
+    if bundle.file_sha256(zip_path) != hashes["archive"]["sha256"]:
+        raise PackageError(f"{os.path.basename(zip_path)} does not match {os.path.basename(hashes_path)}")
+
+    with zipfile.ZipFile(zip_path) as zf:
+        names = set(zf.namelist())
+        for arcname, expected in hashes["files"].items():
+            if arcname not in names:
+                raise PackageError(f"Package is missing {arcname}")
+            digest = hashlib.sha256()
+            size = 0
+            with zf.open(arcname) as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+            if size != expected["size"] or digest.hexdigest() != expected["sha256"]:
+                raise PackageError(f"Checksum mismatch for {arcname}")
+    log(f"Verified {len(hashes['files'])} files in {os.path.basename(zip_path)}")
+    return hashes
+
+
+def install_package(zip_path, game_path, hashes_path=None, log=print):
+    """Verify a package and install its plugin DLL into game_path, skipping it if already identical"""
+    if not os.path.isdir(game_path):
+        raise PackageError(f"Game folder not found: {game_path}")
+    hashes = verify_package(zip_path, hashes_path, log)
+    dest_path = os.path.join(game_path, "BepInEx", "plugins", "MegabonkMP", "MegabonkMP.dll")
+    if os.path.isfile(dest_path) and bundle.file_sha256(dest_path) == hashes["files"][PLUGIN_DLL]["sha256"]:
+        log("MegabonkMP.dll: unchanged")
+        return hashes
+    with zipfile.ZipFile(zip_path) as zf, zf.open(PLUGIN_DLL) as src:
+        bundle.write_atomic(src, dest_path)
+    log("MegabonkMP.dll: written")
+    return hashes
@@ -0,0 +1,297 @@
+"""
+Build prerequisite probe for the Megabonk MP Launcher.
+Finds the installed .NET SDKs, checks that BepInEx has generated the interop
+assemblies the mod references and reads the game's build identity. Results are
+cached per section, keyed by the paths and mtimes they were derived from, so
+repeated probes only stat a handful of files.
+"""
+
+import os
+import re
+import json
+import shutil
+import threading
+import subprocess
+from datetime import datetime
+
+CACHE_FILE = "toolchain_cache.json"
+
+# The mod targets net6.0, so any SDK from 6.0 up can build it
+MIN_SDK_MAJOR = 6
+
+# Interop assemblies referenced by MegabonkMP.csproj, used if the project can't be read
+REQUIRED_INTEROP = [
+    "Il2Cppmscorlib", "UnityEngine", "UnityEngine.CoreModule", "UnityEngine.UIModule",
+    "UnityEngine.IMGUIModule", "UnityEngine.TextRenderingModule", "UnityEngine.PhysicsModule",
+    "UnityEngine.InputLegacyModule", "Assembly-CSharp",
+]
+
+INTEROP_HINT = re.compile(r"BepInEx[\\/]interop[\\/]([^\\/<]+)\.dll")
+SDK_VERSION = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:-[\w.]+)?$")
+UNITY_VERSION = re.compile(rb"(20\d\d|[56])\.\d+\.\d+[abfp]\d+")
+ACF_FIELD = re.compile(r'^\s*"(\w+)"\s+"([^"]*)"', re.MULTILINE)
+
+
+def _mtime(path):
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _version_key(version):
+    match = SDK_VERSION.match(version)
+    return tuple(int(part) for part in match.groups()) if match else (0, 0, 0)
+
+
+def find_dotnet():
+    """Locate the dotnet host executable, following symlinks to the real install"""
+    path = shutil.which("dotnet")
+    if not path and os.name == "nt":
+        default = os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "dotnet", "dotnet.exe")
+        path = default if os.path.exists(default) else None
+    return os.path.realpath(path) if path else None
+
+
+def required_interop(csproj_path=None):
+    """Interop assembly names the project references (from its HintPaths when available)"""
+    if csproj_path and os.path.exists(csproj_path):
+        with open(csproj_path, "r", encoding="utf-8-sig") as f:
+            names = list(dict.fromkeys(INTEROP_HINT.findall(f.read())))
+        if names:
+            return names
+    return list(REQUIRED_INTEROP)
+
+
+def probe_dotnet(dotnet_path):
+    """List installed SDKs; reads the sdk folder directly and only runs dotnet if that fails"""
+    result = {"path": dotnet_path, "sdks": [], "version": None, "ok": False, "error": None}
+    if not dotnet_path:
+        result["error"] = ".NET SDK not found"
+        return result
+
+    sdk_dir = os.path.join(os.path.dirname(dotnet_path), "sdk")
+    if os.path.isdir(sdk_dir):
+        sdks = [name for name in os.listdir(sdk_dir)
+                if SDK_VERSION.match(name) and os.path.exists(os.path.join(sdk_dir, name, "dotnet.dll"))]
+    else:
+        try:
+            output = subprocess.run([dotnet_path, "--list-sdks"], capture_output=True, text=True,
+                                    timeout=30).stdout
+        except (OSError, subprocess.TimeoutExpired) as e:
+            result["error"] = f"Could not run dotnet: {e}"
+            return result
+        sdks = [line.split()[0] for line in output.splitlines() if line.strip()]
+
+    result["sdks"] = sorted(sdks, key=_version_key)
+    usable = [sdk for sdk in result["sdks"] if _version_key(sdk)[0] >= MIN_SDK_MAJOR]
+    if usable:
+        result["version"] = usable[-1]
+        result["ok"] = True
+    elif result["sdks"]:
+        result["error"] = f".NET SDK {MIN_SDK_MAJOR}.0 or newer required (found {', '.join(result['sdks'])})"
+    else:
+        result["error"] = ".NET runtime found but no SDK installed"
+    return result
+
+
+def probe_interop(game_path, required):
+    """Check BepInEx/interop for every referenced assembly and whether it predates the game binary"""
+    interop_dir = os.path.join(game_path, "BepInEx", "interop")
+    result = {"path": interop_dir, "exists": bool(game_path) and os.path.isdir(interop_dir), "missing": [],
+              "stale": False, "ok": False}
+    if not result["exists"]:
+        result["missing"] = list(required)
+        return result
+
+    present = {os.path.splitext(name)[0] for name in os.listdir(interop_dir) if name.endswith(".dll")}
+    result["missing"] = [name for name in required if name not in present]
+
+    # BepInEx regenerates interop on the first launch after a game update
+    game_assembly = _mtime(os.path.join(game_path, "GameAssembly.dll"))
+    newest_interop = max((_mtime(os.path.join(interop_dir, name + ".dll")) or 0) for name in required)
+    result["stale"] = bool(game_assembly and newest_interop and game_assembly > newest_interop)
+    result["ok"] = not result["missing"]
+    return result
+
+
+def _steam_manifest(game_path):
+    """Find the Steam appmanifest whose installdir is this game folder"""
+    steamapps = os.path.dirname(os.path.dirname(os.path.abspath(game_path)))
+    folder = os.path.basename(os.path.abspath(game_path))
+    try:
+        names = os.listdir(steamapps)
+    except OSError:
+        return None
+    for name in names:
+        if name.startswith("appmanifest_") and name.endswith(".acf"):
+            path = os.path.join(steamapps, name)
+            try:
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    fields = dict(ACF_FIELD.findall(f.read()))
+            except OSError:
+                continue
+            if fields.get("installdir", "").lower() == folder.lower():
+                return path, fields
+    return None
+
+
+def probe_game(game_path):
+    """Read what identifies the installed game build"""
+    result = {"exe": bool(game_path) and os.path.exists(os.path.join(game_path, "Megabonk.exe")),
+              "steam_buildid": None, "unity_version": None, "game_assembly": None}
+    if not result["exe"]:
+        return result
+
+    manifest = _steam_manifest(game_path)
+    if manifest:
+        result["steam_buildid"] = manifest[1].get("buildid")
+
+    managers = os.path.join(game_path, "Megabonk_Data", "globalgamemanagers")
+    if os.path.exists(managers):
+        with open(managers, "rb") as f:
+            match = UNITY_VERSION.search(f.read(4096))
+        if match:
+            result["unity_version"] = match.group(0).decode("ascii")
+
+    game_assembly = os.path.join(game_path, "GameAssembly.dll")
+    if os.path.exists(game_assembly):
+        stat = os.stat(game_assembly)
+        result["game_assembly"] = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+    return result
+
+
+def describe_game(game):
+    """Short label for a game build"""
+    if game.get("steam_buildid"):
+        return f"build {game['steam_buildid']}"
+    if game.get("game_assembly"):
+        stamp = datetime.fromtimestamp(game["game_assembly"]["mtime"] / 1e9)
+        return f"GameAssembly.dll from {stamp:%Y-%m-%d %H:%M}"
+    return "unknown build"
+
+
+class ToolchainProbe:
+    """Cached probe of the build prerequisites, safe to refresh from a worker thread"""
+
+    def __init__(self, cache_path, csproj_path=None):
+        self.cache_path = cache_path
+        self.csproj_path = csproj_path
+        self.cache = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def _section(self, name, key, compute):
+        """Return the cached section if its key still matches, otherwise recompute it"""
+        entry = self.cache.get(name)
+        if entry and entry.get("key") == key:
+            return entry["value"], False
+        value = compute()
+        self.cache[name] = {"key": key, "value": value}
+        return value, True
+
+    def cached(self, game_path):
+        """Last known result without touching the disk, or None if never probed for this game"""
+        result = self.cache.get("result")
+        if result and result.get("game_path") == game_path:
+            return result
+        return None
+
+    def probe(self, game_path, needs_regen=False):
+        """Re-validate each section against current paths and mtimes and return the full result.
+
+        needs_regen marks the interop as outdated even when its mtimes look fine, e.g. when
+        gamefingerprint saw the game binaries change since BepInEx last generated it.
+        """
+        with self._lock:
+            return self._probe(game_path, needs_regen)
+
+    def _probe(self, game_path, needs_regen):
+        dotnet_path = find_dotnet()
+        dotnet, changed_dotnet = self._section(
+            "dotnet", [dotnet_path, _mtime(dotnet_path),
+                       _mtime(dotnet_path and os.path.join(os.path.dirname(dotnet_path), "sdk"))],
+            lambda: probe_dotnet(dotnet_path))
+
+        game_path = game_path or ""
+        required = required_interop(self.csproj_path)
+        interop_dir = os.path.join(game_path, "BepInEx", "interop")
+        interop, changed_interop = self._section(
+            "interop", [game_path, required, _mtime(interop_dir), _mtime(os.path.join(game_path, "GameAssembly.dll"))]
+            + [_mtime(os.path.join(interop_dir, name + ".dll")) for name in required],
+            lambda: probe_interop(game_path, required))
+        if interop.get("outdated", False) != needs_regen:
+            interop = dict(interop, outdated=needs_regen)
+            self.cache["interop"]["value"] = interop
+            changed_interop = True
+
+        game, changed_game = self._section(
+            "game", [game_path, _mtime(os.path.join(game_path, "GameAssembly.dll")),
+                     _mtime(os.path.join(game_path, "Megabonk_Data", "globalgamemanagers")),
+                     _mtime(game_path and os.path.dirname(os.path.dirname(os.path.abspath(game_path))))],
+            lambda: probe_game(game_path))
+
+        previous = self.cache.get("result")
+        if changed_dotnet or changed_interop or changed_game or not previous or previous["game_path"] != game_path:
+            self.cache["result"] = {"game_path": game_path, "dotnet": dotnet, "interop": interop, "game": game,
+                                    "probed": datetime.now().isoformat(timespec="seconds")}
+            self._save()
+        return self.cache["result"]
+
+
+def build_problems(result):
+    """Reasons a build would fail, as (kind, message) pairs; empty when ready"""
+    problems = []
+    if not result["dotnet"]["ok"]:
+        problems.append(("dotnet", result["dotnet"]["error"]))
+    interop = result["interop"]
+    if not interop["exists"]:
+        problems.append(("interop", "BepInEx interop assemblies have not been generated yet.\n"
+                                    "Run the game once with BepInEx installed, then build again."))
+    elif interop["missing"]:
+        problems.append(("interop", f"BepInEx/interop is incomplete, missing: {', '.join(interop['missing'])}.\n"
+                                    "Run the game once with BepInEx installed to regenerate it."))
+    elif interop.get("outdated"):
+        problems.append(("interop", "Megabonk was updated since BepInEx generated the interop assemblies.\n"
+                                    "Run the game once with BepInEx installed to regenerate them, then build again."))
+    return problems
+
+
+def format_status(result):
+    """One-line readiness summary for the UI"""
+    parts = []
+    dotnet = result["dotnet"]
+    parts.append(f".NET SDK {dotnet['version']}" if dotnet["ok"] else (dotnet["error"] or ".NET SDK missing"))
+
+    interop = result["interop"]
+    if not interop["exists"]:
+        parts.append("interop not generated")
+    elif interop["missing"]:
+        parts.append(f"interop missing {len(interop['missing'])} assemblies")
+    elif interop.get("outdated"):
+        parts.append("game updated, interop needs regenerating (run the game once)")
+    elif interop["stale"]:
+        parts.append("interop older than game (run the game once)")
+    else:
+        parts.append("interop complete")
+
+    parts.append(describe_game(result["game"]))
+    icon = "❌" if build_problems(result) else ("⚠️" if interop["stale"] else "✅")
+    return f"{icon} " + ", ".join(parts)
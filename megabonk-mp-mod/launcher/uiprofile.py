@@ -0,0 +1,336 @@
+"""
+Tk main-loop responsiveness instrumentation for the Megabonk MP Launcher.
+A root.after heartbeat measures event-loop lag; every Tk callback (commands,
+bindings, after jobs) and worker job is timed, and each stall is attributed to
+the slowest callback that ran since the previous heartbeat. Opt-in: nothing is
+patched until UiMonitor.install() is called, which has to happen before any
+widget exists (see install).
+"""
+
+import os
+import json
+import time
+import inspect
+import tkinter
+import threading
+import functools
+import statistics
+from collections import deque
+from datetime import datetime
+from tkinter import commondialog
+
+REPORT_FILE = "ui_monitor.json"
+
+HEARTBEAT_MS = 50
+STALL_MS = 50  # lag above which a user notices the window hitch
+STALL_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+LAG_SAMPLES = 6000  # about five minutes of heartbeats
+RECENT_STALLS = 200
+
+UNTRACKED = "event loop (redraw, geometry or untracked work)"
+
+
+def _unwrap(func):
+    """The user function behind after()'s callit closure and functools.partial"""
+    while True:
+        if isinstance(func, functools.partial):
+            func = func.func
+            continue
+        code = getattr(func, "__code__", None)
+        if code and code.co_name == "callit" and "func" in code.co_freevars and func.__closure__:
+            func = func.__closure__[code.co_freevars.index("func")].cell_contents
+            continue
+        return func
+
+
+def describe(func):
+    """Readable name for a callback: Class.method, or qualname plus file:line for lambdas"""
+    func = _unwrap(func)
+    if inspect.ismethod(func):
+        return f"{type(func.__self__).__name__}.{func.__func__.__name__}"
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return type(func).__qualname__
+    name = func.__qualname__.replace(".<locals>", "")
+    if "<lambda>" in name:
+        name += f" ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name
+
+
+def _bucket_label(index):
+    if index == len(STALL_BUCKETS_MS) - 1:
+        return f">={STALL_BUCKETS_MS[-1]} ms"
+    return f"{STALL_BUCKETS_MS[index]}-{STALL_BUCKETS_MS[index + 1]} ms"
+
+
+def _bucket(ms):
+    index = 0
+    for i, bound in enumerate(STALL_BUCKETS_MS):
+        if ms >= bound:
+            index = i
+    return index
+
+
+class _Timings:
+    """calls / total / max per name"""
+
+    def __init__(self):
+        self.stats = {}
+
+    def add(self, name, ms):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+        entry["calls"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+
+
+class UiMonitor:
+    """Heartbeat, callback/job timings and a stall histogram for one Tk root"""
+
+    def __init__(self, root, heartbeat_ms=HEARTBEAT_MS, stall_ms=STALL_MS):
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_ms = stall_ms
+        self.installed = False
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._originals = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.heartbeats = 0
+            self.lag_samples = deque(maxlen=LAG_SAMPLES)
+            self.max_lag_ms = 0.0
+            self.stall_counts = [0] * len(STALL_BUCKETS_MS)
+            self.culprits = {}
+            self.recent_stalls = deque(maxlen=RECENT_STALLS)
+            self.callbacks = _Timings()
+            self.jobs = _Timings()
+            self.spans = _Timings()
+            self.off_thread = {}
+            self._slowest = (0.0, None)  # slowest callback since the last heartbeat
+            self._modal_ms = 0.0
+            self._last_beat = None
+
+    # Installation
+
+    def install(self):
+        """Patch Tk's callback dispatch and dialogs and start the heartbeat.
+
+        Misc._register keeps the bound CallWrapper.__call__ of every command it creates, so
+        only commands, bindings and after jobs registered from here on are timed.
+        """
+        if self.installed:
+            return
+        self._originals = (tkinter.CallWrapper.__call__, commondialog.Dialog.show)
+        call, show = self._originals
+        monitor = self
+
+        def timed_call(wrapper, *args):
+            if not monitor.installed:
+                return call(wrapper, *args)  # Registered while installed; uninstall cannot unpatch it
+            return monitor._time_callback(call, wrapper, args)
+
+        def timed_show(dialog, **options):
+            return monitor._time_dialog(show, dialog, options)
+
+        tkinter.CallWrapper.__call__ = timed_call
+        commondialog.Dialog.show = timed_show
+        self.installed = True
+        self._last_beat = time.perf_counter()
+        self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        tkinter.CallWrapper.__call__, commondialog.Dialog.show = self._originals
+        self.installed = False
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tkinter.TclError:
+                pass
+            self._after_id = None
+
+    # Measurement
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = max(0.0, (now - self._last_beat) * 1000 - self.heartbeat_ms)
+        with self._lock:
+            self.heartbeats += 1
+            self.lag_samples.append(lag)
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+            if lag >= self.stall_ms:
+                slowest_ms, slowest = self._slowest
+                culprit = slowest if slowest and slowest_ms >= lag / 2 else UNTRACKED
+                self._record_stall(culprit, lag)
+            self._slowest = (0.0, None)
+        self._last_beat = now
+        if self.installed:
+            self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _record_stall(self, culprit, ms):
+        bucket = _bucket(ms)
+        self.stall_counts[bucket] += 1
+        entry = self.culprits.get(culprit)
+        if entry is None:
+            entry = self.culprits[culprit] = {"stalls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                              "buckets": [0] * len(STALL_BUCKETS_MS)}
+        entry["stalls"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["buckets"][bucket] += 1
+        self.recent_stalls.append({"time": datetime.now().isoformat(timespec="milliseconds"),
+                                   "lag_ms": round(ms, 1), "culprit": culprit})
+
+    def _time_callback(self, call, wrapper, args):
+        func = _unwrap(wrapper.func)
+        if func == self._beat:
+            return call(wrapper, *args)
+        started = time.perf_counter()
+        modal_before = self._modal_ms
+        try:
+            return call(wrapper, *args)
+        finally:
+            # Time spent waiting on a modal dialog is the dialog's, not the callback's
+            ms = (time.perf_counter() - started) * 1000 - (self._modal_ms - modal_before)
+            self._note(self.callbacks, describe(func), ms)
+
+    def _time_dialog(self, show, dialog, options):
+        title = options.get("title") or dialog.options.get("title") or type(dialog).__name__
+        name = f"{type(dialog).__name__} dialog '{title}'"
+        self._check_thread(name)
+        started = time.perf_counter()
+        try:
+            return show(dialog, **options)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self._modal_ms += ms
+            self._note(self.spans, name, ms)
+
+    def _note(self, timings, name, ms):
+        with self._lock:
+            timings.add(name, ms)
+            # Only main-thread work can hold up the event loop
+            if ms > self._slowest[0] and threading.current_thread() is threading.main_thread():
+                self._slowest = (ms, name)
+
+    def _check_thread(self, name):
+        """Count Tk use from worker threads, which Tk does not support"""
+        if threading.current_thread() is not threading.main_thread():
+            with self._lock:
+                self.off_thread[name] = self.off_thread.get(name, 0) + 1
+
+    def span(self, name):
+        """Context manager timing a block of UI work (flags use from worker threads)"""
+        return _Span(self, name)
+
+    def wrap_job(self, target, name=None):
+        """Wrap a worker-thread target so its duration is recorded"""
+        name = name or describe(target)
+
+        @functools.wraps(target)
+        def job(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.jobs.add(name, (time.perf_counter() - started) * 1000)
+        return job
+
+    # Reporting
+
+    def to_dict(self):
+        with self._lock:
+            lags = list(self.lag_samples)
+            return {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "duration_s": round(time.time() - self.started, 1),
+                "heartbeat_ms": self.heartbeat_ms,
+                "stall_ms": self.stall_ms,
+                "lag": {
+                    "heartbeats": self.heartbeats,
+                    "p50_ms": round(statistics.median(lags), 1) if lags else None,
+                    "p95_ms": (round(statistics.quantiles(lags, n=20, method="inclusive")[-1], 1)
+                               if len(lags) >= 2 else None),
+                    "max_ms": round(self.max_lag_ms, 1),
+                },
+                "stall_histogram": {_bucket_label(i): count for i, count in enumerate(self.stall_counts)},
+                "culprits": {name: dict(entry, total_ms=round(entry["total_ms"], 1),
+                                        max_ms=round(entry["max_ms"], 1))
+                             for name, entry in sorted(self.culprits.items(), key=lambda item: -item[1]["total_ms"])},
+                "recent_stalls": list(self.recent_stalls),
+                "callbacks": self._rounded(self.callbacks),
+                "spans": self._rounded(self.spans),
+                "jobs": self._rounded(self.jobs),
+                "off_thread_tk_calls": dict(self.off_thread),
+            }
+
+    @staticmethod
+    def _rounded(timings):
+        return {name: {"calls": entry["calls"], "total_ms": round(entry["total_ms"], 1),
+                       "max_ms": round(entry["max_ms"], 1)}
+                for name, entry in sorted(timings.stats.items(), key=lambda item: -item[1]["max_ms"])}
+
+    def dump(self, path):
+        """Write to_dict() as JSON, atomically"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class _Span:
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+
+    def __enter__(self):
+        self.monitor._check_thread(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor._note(self.monitor.spans, self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def format_report(report, top=10):
+    """Text report for the diagnostics panel"""
+    lag = report["lag"]
+    lines = [f"Monitoring for {report['duration_s']:.0f}s, heartbeat every {report['heartbeat_ms']} ms",
+             f"Event-loop lag: p50 {lag['p50_ms']} ms, p95 {lag['p95_ms']} ms, max {lag['max_ms']} ms "
+             f"({lag['heartbeats']} heartbeats)", ""]
+
+    stalls = sum(report["stall_histogram"].values())
+    lines.append(f"Stalls (lag >= {report['stall_ms']} ms): {stalls}")
+    for label, count in report["stall_histogram"].items():
+        if count:
+            lines.append(f"  {label:<14} {count:>5}  {'#' * min(count, 50)}")
+
+    if report["culprits"]:
+        lines += ["", "Culprits:"]
+        for name, entry in list(report["culprits"].items())[:top]:
+            lines.append(f"  {entry['stalls']:>4} stalls  max {entry['max_ms']:>8.0f} ms  "
+                         f"total {entry['total_ms']:>8.0f} ms  {name}")
+
+    for title, key in (("Slowest callbacks", "callbacks"), ("Dialogs and spans", "spans"),
+                       ("Background jobs", "jobs")):
+        if report[key]:
+            lines += ["", f"{title}:"]
+            for name, entry in list(report[key].items())[:top]:
+                lines.append(f"  {entry['calls']:>6} calls  max {entry['max_ms']:>8.1f} ms  "
+                             f"total {entry['total_ms']:>9.1f} ms  {name}")
+
+    if report["off_thread_tk_calls"]:
+        lines += ["", "Tk used from worker threads (should go through root.after):"]
+        for name, count in sorted(report["off_thread_tk_calls"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {count:>6}x  {name}")
+    return "\n".join(lines)
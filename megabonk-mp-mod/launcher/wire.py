@@ -0,0 +1,249 @@
+"""
+MegabonkMP wire format helpers shared by the launcher's network tools.
+Mirrors Network/Packets/PacketBase.cs and the reliability header in Server.cs/Client.cs.
+"""
+
+import struct
+from enum import IntEnum
+
+# [delivery(1)] [sequence(4)] [type(1)] [payload...]
+HEADER_SIZE = 5
+HEADER = struct.Struct("<BI")
+
+# Practical datagram size that avoids IP fragmentation on common paths
+MTU = 1200
+
+
+class DeliveryMethod(IntEnum):
+    Unreliable = 0
+    ReliableUnordered = 1
+    ReliableOrdered = 2
+    Sequenced = 3
+
+
+class PacketType(IntEnum):
+    # Connection packets (0-19)
+    ConnectRequest = 0
+    ConnectAccept = 1
+    Disconnect = 2
+    Heartbeat = 3
+    Batch = 4
+
+    # Session packets (20-39)
+    PlayerJoin = 20
+    PlayerLeave = 21
+    PlayerReady = 22
+    SessionStart = 23
+    SessionEnd = 24
+
+    # Player sync packets (40-59)
+    PlayerPosition = 40
+    PlayerAnimation = 41
+    PlayerHealth = 42
+    PlayerStats = 43
+    PlayerDeath = 44
+    PlayerRespawn = 45
+
+    # Combat packets (60-79)
+    WeaponFire = 60
+    ProjectileSpawn = 61
+    ProjectileHit = 62
+    MeleeAttack = 63
+    DamageDealt = 64
+
+    # Enemy packets (80-99)
+    EnemySpawn = 80
+    EnemyPosition = 81
+    EnemyDeath = 82
+    EnemyTarget = 83
+
+    # Item packets (100-119)
+    ItemSpawn = 100
+    ItemPickup = 101
+    ChestOpen = 102
+    WeaponDrop = 103
+
+    # Map packets (120-139)
+    MapSeed = 120
+    RoomTransition = 121
+    EventTrigger = 122
+    Extraction = 123
+
+    # Chat/social packets (140-159)
+    ChatMessage = 140
+    Ping = 141
+    Emote = 142
+
+
+# Batch payload: records of [length u16][type byte + payload]
+BATCH_RECORD = struct.Struct("<H")
+
+# Payload layouts (after the type byte) of the high-rate packets
+PLAYER_POSITION = struct.Struct("<i7fI")   # PlayerId, Pos xyz, Vel xyz, RotationY, Timestamp
+ENEMY_POSITION = struct.Struct("<i6fB")    # EnemyNetId, Pos xyz, Vel xyz, State
+
+
+def wrap(packet, delivery=DeliveryMethod.Unreliable, sequence=0):
+    """Prefix a serialized packet (type byte + payload) with the reliability header"""
+    return HEADER.pack(int(delivery), sequence) + packet
+
+
+def unwrap(datagram):
+    """Split a datagram into (delivery, sequence, packet); packet is None if too short"""
+    if len(datagram) < HEADER_SIZE:
+        return None, None, None
+    delivery, sequence = HEADER.unpack_from(datagram)
+    return delivery, sequence, datagram[HEADER_SIZE:]
+
+
+def packet_type(datagram):
+    """Return the PacketType value of a wrapped datagram, or None"""
+    if len(datagram) <= HEADER_SIZE:
+        return None
+    return datagram[HEADER_SIZE]
+
+
+def batch_packet(packets):
+    """Serialize a Batch carrying several packets (type byte + payload each)"""
+    return bytes([PacketType.Batch]) + b"".join(BATCH_RECORD.pack(len(packet)) + packet for packet in packets)
+
+
+def unbatch(packet):
+    """The packets inside a Batch, or the packet itself if it is not one"""
+    if not packet or packet[0] != PacketType.Batch:
+        return [packet]
+    packets = []
+    offset = 1
+    while offset + BATCH_RECORD.size <= len(packet):
+        length, = BATCH_RECORD.unpack_from(packet, offset)
+        offset += BATCH_RECORD.size
+        if length > len(packet) - offset:
+            break  # truncated record; PacketSerializer.Unbatch stops here too
+        packets.append(packet[offset:offset + length])
+        offset += length
+    return packets
+
+
+def packet_type_name(value):
+    """Readable name for a packet type value"""
+    try:
+        return PacketType(value).name
+    except ValueError:
+        return f"Unknown({value})"
+
+
+def parse_packet_type(name):
+    """Accept a PacketType name or number"""
+    if isinstance(name, int) or str(name).isdigit():
+        return PacketType(int(name))
+    return PacketType[name]
+
+
+def write_string(text):
+    """A string as BinaryWriter.Write(string) emits it: 7-bit encoded byte length, then UTF-8"""
+    data = text.encode("utf-8")
+    length = len(data)
+    prefix = bytearray()
+    while length >= 0x80:
+        prefix.append((length & 0x7F) | 0x80)
+        length >>= 7
+    prefix.append(length)
+    return bytes(prefix) + data
+
+
+def read_string(data, offset=0):
+    """Read a BinaryWriter string at offset; returns (text, offset after it)"""
+    length = 0
+    shift = 0
+    while True:
+        if offset >= len(data) or shift > 28:
+            raise ValueError("Truncated or invalid string length")
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    end = offset + length
+    if end > len(data):
+        raise ValueError("String runs past the end of the packet")
+    return bytes(data[offset:end]).decode("utf-8", "replace"), end
+
+
+def connect_request_packet(player_name, mod_version, lobby=None):
+    """Serialize a ConnectRequestPacket; lobby is the relay's optional trailing field"""
+    packet = bytes([PacketType.ConnectRequest]) + write_string(player_name) + write_string(mod_version)
+    return packet + write_string(lobby) if lobby is not None else packet
+
+
+def connect_accept_packet(player_id, map_seed=0):
+    return bytes([PacketType.ConnectAccept]) + struct.pack("<ii", player_id, map_seed)
+
+
+def disconnect_packet(reason=""):
+    return bytes([PacketType.Disconnect]) + write_string(reason)
+
+
+def player_join_packet(player_id, player_name, character_id=0, skin_id=0):
+    return (bytes([PacketType.PlayerJoin]) + struct.pack("<i", player_id) + write_string(player_name)
+            + struct.pack("<ii", character_id, skin_id))
+
+
+def player_leave_packet(player_id, reason=""):
+    return bytes([PacketType.PlayerLeave]) + struct.pack("<i", player_id) + write_string(reason)
+
+
+def player_position_packet(player_id, pos, vel, rotation_y, timestamp):
+    """Serialize a PlayerPositionPacket (type byte included)"""
+    return bytes([PacketType.PlayerPosition]) + PLAYER_POSITION.pack(
+        player_id, *pos, *vel, rotation_y, timestamp & 0xFFFFFFFF)
+
+
+def enemy_position_packet(enemy_id, pos, vel, state=0):
+    """Serialize an EnemyPositionPacket (type byte included)"""
+    return bytes([PacketType.EnemyPosition]) + ENEMY_POSITION.pack(enemy_id, *pos, *vel, state)
+
+
+# Capture files: magic, then records of [time f64][direction u8][length u16][datagram]
+CAPTURE_MAGIC = b"MBCAP1\n"
+CAPTURE_RECORD = struct.Struct("<dBH")
+
+TO_SERVER = 0
+TO_CLIENT = 1
+
+
+class CaptureWriter:
+    """Append datagrams to a capture file"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(CAPTURE_MAGIC)
+
+    def write(self, timestamp, direction, datagram):
+        self.file.write(CAPTURE_RECORD.pack(timestamp, direction, len(datagram)))
+        self.file.write(datagram)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_capture(path):
+    """Yield (time, direction, datagram) records from a capture file"""
+    with open(path, "rb") as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"Not a MegabonkMP capture file: {path}")
+        while True:
+            header = f.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+            timestamp, direction, length = CAPTURE_RECORD.unpack(header)
+            datagram = f.read(length)
+            if len(datagram) < length:
+                return
+            yield timestamp, direction, datagram
@@ -1,6 +1,7 @@
 using BepInEx.Logging;
 using System;
 using System.Collections.Generic;
+using System.Globalization;
 using System.Text;
 
 namespace MegabonkMP.Core
@@ -25,6 +26,16 @@ namespace MegabonkMP.Core
             _initialized = true;
         }
         
+        /// <summary>
+        /// Prefix a message with UTC time so logs from several machines can be merged
+        /// (BepInEx's LogOutput.log has no timestamps of its own).
+        /// </summary>
+        private static string Stamp(string message)
+        {
+            var timestamp = DateTime.UtcNow.ToString("yyyy-MM-dd'T'HH:mm:ss.fff'Z'", CultureInfo.InvariantCulture);
+            return $"[{timestamp}] {message}";
+        }
+        
         private static void AddToHistory(string level, string message)
         {
             lock (_logLock)
@@ -70,35 +81,35 @@ namespace MegabonkMP.Core
         public static void Info(string message)
         {
             if (!_initialized) return;
-            _logSource.LogInfo(message);
+            _logSource.LogInfo(Stamp(message));
             AddToHistory("INFO", message);
         }
         
         public static void Warning(string message)
         {
             if (!_initialized) return;
-            _logSource.LogWarning(message);
+            _logSource.LogWarning(Stamp(message));
             AddToHistory("WARN", message);
         }
         
         public static void Error(string message)
         {
             if (!_initialized) return;
-            _logSource.LogError(message);
+            _logSource.LogError(Stamp(message));
             AddToHistory("ERR", message);
         }
         
         public static void Error(string message, Exception ex)
         {
             if (!_initialized) return;
-            _logSource.LogError($"{message}: {ex}");
+            _logSource.LogError(Stamp($"{message}: {ex}"));
             AddToHistory("ERR", $"{message}: {ex.Message}");
         }
         
         public static void Debug(string message)
         {
             if (!_initialized) return;
-            _logSource.LogDebug(message);
+            _logSource.LogDebug(Stamp(message));
             AddToHistory("DBG", message);
         }
         
@@ -108,7 +119,7 @@ namespace MegabonkMP.Core
         public static void Network(string message)
         {
             if (!_initialized) return;
-            _logSource.LogDebug($"[NET] {message}");
+            _logSource.LogDebug(Stamp($"[NET] {message}"));
         }
         
         /// <summary>
@@ -117,7 +128,7 @@ namespace MegabonkMP.Core
         public static void Sync(string message)
         {
             if (!_initialized) return;
-            _logSource.LogDebug($"[SYNC] {message}");
+            _logSource.LogDebug(Stamp($"[SYNC] {message}"));
         }
     }
 }
@@ -146,6 +146,15 @@ namespace MegabonkMP.Network
         }
         
         private void ProcessReceivedData(byte[] data)
+        {
+            // Relays with a send scheduler pack several packets into one datagram
+            foreach (var packetData in PacketSerializer.Unbatch(data))
+            {
+                ProcessPacket(packetData);
+            }
+        }
+        
+        private void ProcessPacket(byte[] data)
         {
             try
             {
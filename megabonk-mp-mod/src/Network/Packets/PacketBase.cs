@@ -25,6 +25,7 @@ namespace MegabonkMP.Network.Packets
         ConnectAccept = 1,
         Disconnect = 2,
         Heartbeat = 3,
+        Batch = 4, // several packets in one datagram, see PacketSerializer.Unbatch
         
         // Session packets (20-39)
         PlayerJoin = 20,
@@ -173,6 +174,34 @@ namespace MegabonkMP.Network.Packets
             
             return packet;
         }
+        
+        /// <summary>
+        /// Splits a Batch datagram ([Batch][u16 length][packet]...) into its packets.
+        /// Anything else is returned as the only packet.
+        /// </summary>
+        public static List<byte[]> Unbatch(byte[] data)
+        {
+            var packets = new List<byte[]>();
+            if (data.Length == 0 || data[0] != (byte)PacketType.Batch)
+            {
+                packets.Add(data);
+                return packets;
+            }
+            
+            int offset = 1;
+            while (offset + 2 <= data.Length)
+            {
+                int length = data[offset] | (data[offset + 1] << 8);
+                offset += 2;
+                if (length > data.Length - offset) break;
+                
+                var packet = new byte[length];
+                Array.Copy(data, offset, packet, 0, length);
+                packets.Add(packet);
+                offset += length;
+            }
+            return packets;
+        }
     }
     
     /// <summary>